@@ -0,0 +1,381 @@
+# --- START OF FILE cli.py ---
+"""
+Headless command line for batch servers. No display, QApplication or widgets are needed.
+
+    python -m app.cli ocr chapter.mmtl [--workers N] [--engine easyocr|fake] [--cpu]
+    python -m app.cli serve ch1.mmtl ch2.mmtl [--host 0.0.0.0] [--port 6010] [--local-workers N]
+    python -m app.cli worker coordinator-host:6010 [--engine easyocr|fake] [--cpu]
+
+Runs the same OCR pipeline as MainWindow.start_ocr on every page of a project, writes the
+results back into the .mmtl and reports throughput in pages per second. Defaults come from
+the same QSettings as the GUI; the options below override them for this run.
+"""
+
+import os
+import sys
+import copy
+import time
+import argparse
+import tempfile
+import zipfile
+import secrets
+import traceback
+import multiprocessing
+from shutil import rmtree
+from PyQt5.QtCore import QSettings, QStandardPaths
+from app.core.project_model import ProjectModel
+from app.core.ocr_processor import run_ocr_pipeline
+from app.core.ocr_engine import create_engine
+from app.core.ocr_worker_pool import iter_pool_results
+from app.core.cross_page_ocr import iter_cross_page_results
+from app.core.image_prefetcher import ImagePrefetcher
+from app.core.ocr_cache import OCRResultCache
+from app.core.ocr_metrics import OCRRunReport, new_page_metrics
+from app.core.ocr_cluster import OCRCoordinator, run_worker
+from app.core.page_hashes import find_duplicate_pages
+from app.utils.data_processing import number_page_results
+
+# Same mapping as MainWindow.language_map
+LANGUAGE_CODES = {
+    "Korean": "ko",
+    "Chinese": "ch_sim",
+    "Japanese": "ja",
+}
+
+def extract_project(mmtl_path):
+    """Unpacks a .mmtl into a new temporary directory, as the GUI's project loader does."""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        with zipfile.ZipFile(mmtl_path, 'r') as zipf:
+            zipf.extractall(temp_dir)
+    except Exception:
+        rmtree(temp_dir, ignore_errors=True)
+        raise
+    return temp_dir
+
+def load_model(mmtl_path, temp_dir):
+    """Loads the extracted project into a ProjectModel; raises RuntimeError if that fails."""
+    model = ProjectModel()
+    errors = []
+    model.project_load_failed.connect(errors.append)
+    model.load_project(mmtl_path, temp_dir)
+    if errors:
+        raise RuntimeError(errors[0])
+    return model
+
+def build_ocr_settings(settings):
+    """Returns the run_ocr_pipeline settings dict, read from the GUI's QSettings."""
+    return {
+        "min_text_height": int(settings.value("min_text_height", 40)),
+        "max_text_height": int(settings.value("max_text_height", 100)),
+        "min_confidence": float(settings.value("min_confidence", 0.2)),
+        "distance_threshold": int(settings.value("distance_threshold", 100)),
+        "batch_size": int(settings.value("ocr_batch_size", 8)), "decoder": settings.value("ocr_decoder", "beamsearch"),
+        "adjust_contrast": float(settings.value("ocr_adjust_contrast", 0.5)), "resize_threshold": int(settings.value("ocr_resize_threshold", 1024)),
+        "detect_resize_threshold": int(settings.value("ocr_detect_resize_threshold", 0)),
+        "adaptive_threshold": float(settings.value("ocr_adaptive_threshold", 0.5)),
+        "tile_height": int(settings.value("ocr_tile_height", 0)), "tile_overlap": int(settings.value("ocr_tile_overlap", 200)),
+        "skip_blank_bands": settings.value("ocr_skip_blank_bands", "false").lower() == "true",
+    }
+
+def iter_page_results(image_paths, ocr_settings, args, lang_code, cache):
+    """
+    Runs OCR over `image_paths` with the mode picked by the options
+    (worker pool, cross-page batches or page by page).
+
+    :return: Generator of (index, merged_results, page_metrics) in page order.
+    """
+    if args.workers > 1 and len(image_paths) > 1:
+        pending = {}
+        next_index = 0
+        for index, results, metrics, error in iter_pool_results(
+                image_paths, ocr_settings, args.workers, lang_code, args.gpu,
+                torch_threads=args.torch_threads, cache=cache, engine_name=args.engine):
+            if error:
+                raise RuntimeError(error)
+            # Workers finish out of order; pages are committed in order like BatchOCRHandler does.
+            pending[index] = (results, metrics)
+            while next_index in pending:
+                results, metrics = pending.pop(next_index)
+                yield next_index, results, metrics
+                next_index += 1
+        return
+
+    print(f"CLI: Loading {args.engine} reader (Lang='{lang_code}', GPU={args.gpu})...")
+    reader = create_engine(args.engine, lang_code, args.gpu)
+    prefetcher = None
+    if args.prefetch > 0:
+        prefetcher = ImagePrefetcher(image_paths, adjust_contrast=ocr_settings['adjust_contrast'],
+                                     resize_threshold=ocr_settings['resize_threshold'], depth=args.prefetch)
+        prefetcher.start()
+    try:
+        if args.cross_page_batch > 1 and len(image_paths) > 1:
+            yield from iter_cross_page_results(image_paths, reader, args.cross_page_batch, ocr_settings,
+                                               cache=cache, prefetcher=prefetcher)
+            return
+        for index, image_path in enumerate(image_paths):
+            preprocessed = prefetcher.get(image_path) if prefetcher else None
+            metrics = new_page_metrics()
+            results = run_ocr_pipeline(image_path, reader, preprocessed=preprocessed, cache=cache,
+                                       metrics=metrics, **ocr_settings)
+            yield index, results, metrics
+    finally:
+        if prefetcher:
+            prefetcher.stop()
+
+def run_ocr(args):
+    """The `ocr` command. Returns the process exit code."""
+    mmtl_path = os.path.abspath(args.project)
+    if not os.path.isfile(mmtl_path):
+        print(f"CLI: Error - Project file not found: {mmtl_path}")
+        return 2
+
+    settings = QSettings("YourCompany", "MangaOCRTool")
+    if args.workers is None: args.workers = int(settings.value("ocr_worker_processes", 1))
+    if args.torch_threads is None: args.torch_threads = int(settings.value("ocr_torch_threads", 0))
+    if args.engine is None: args.engine = settings.value("ocr_engine", "easyocr")
+    if args.gpu is None: args.gpu = settings.value("use_gpu", "true").lower() == "true"
+    if args.cross_page_batch is None: args.cross_page_batch = int(settings.value("ocr_cross_page_batch", 0))
+    if args.prefetch is None: args.prefetch = int(settings.value("ocr_prefetch_depth", 2))
+    ocr_settings = build_ocr_settings(settings)
+
+    temp_dir = extract_project(mmtl_path)
+    try:
+        model = load_model(mmtl_path, temp_dir)
+        if args.output:
+            model.mmtl_path = os.path.abspath(args.output)
+        if not model.image_paths:
+            print("CLI: Error - The project has no images to process.")
+            return 2
+        lang_code = LANGUAGE_CODES.get(model.original_language, 'ko')
+
+        cache = None
+        if not args.no_cache and settings.value("ocr_cache_enabled", "true").lower() == "true":
+            cache_dir = args.cache_dir or os.path.join(
+                QStandardPaths.writableLocation(QStandardPaths.CacheLocation), "ocr_cache")
+            try:
+                cache = OCRResultCache(cache_dir, language=lang_code, engine_name=args.engine,
+                                       max_bytes=int(settings.value("ocr_cache_max_mb", 512)) * 1024 * 1024)
+            except OSError as e:
+                print(f"CLI: Warning - OCR cache unavailable, continuing without it: {e}")
+
+        image_paths = model.image_paths
+        duplicates = {}
+        duplicate_distance = int(settings.value("ocr_duplicate_max_distance", -1))
+        if duplicate_distance >= 0:
+            duplicates = find_duplicate_pages(image_paths, model.page_hashes(), duplicate_distance)
+        # Pages identical to an earlier page are not OCRed; they get a copy of its results
+        ocr_indices = [index for index in range(len(image_paths)) if index not in duplicates]
+        duplicate_sources = {source for source, _ in duplicates.values()}
+        if args.workers > 1 and len(ocr_indices) > 1:
+            mode = 'pool'
+        elif args.cross_page_batch > 1 and len(ocr_indices) > 1:
+            mode = 'cross-page'
+        else:
+            mode = 'single'
+        run_report = OCRRunReport(model.project_name, mode, ocr_settings)
+        print(f"CLI: OCR of '{model.project_name}': {len(image_paths)} pages ({len(duplicates)} duplicates), "
+              f"mode={mode}, workers={args.workers}, engine={args.engine}.")
+
+        model.clear_standard_results()
+        next_row_number = model.next_global_row_number
+        status = 'failed'
+        try:
+            source_results = {}
+            next_index = 0
+
+            def commit_page(index, results):
+                nonlocal next_row_number
+                filename = os.path.basename(image_paths[index])
+                numbered, next_row_number = number_page_results(results, filename, next_row_number)
+                model.add_new_ocr_results(numbered)
+                if index in duplicate_sources:
+                    source_results[index] = copy.deepcopy(numbered)
+                elapsed = time.time() - run_report.started_at
+                print(f"CLI: [{index + 1}/{len(image_paths)}] {filename}: {len(numbered)} blocks "
+                      f"({(index + 1) / max(elapsed, 1e-6):.2f} pages/s)")
+
+            def commit_duplicates():
+                nonlocal next_index
+                while next_index in duplicates:
+                    source_index, distance = duplicates[next_index]
+                    copied_results = copy.deepcopy(source_results.get(source_index, []))
+                    run_report.add_duplicate_page(os.path.basename(image_paths[next_index]),
+                                                  os.path.basename(image_paths[source_index]), distance, len(copied_results))
+                    commit_page(next_index, copied_results)
+                    next_index += 1
+
+            ocr_paths = [image_paths[index] for index in ocr_indices]
+            for ocr_index, results, metrics in iter_page_results(ocr_paths, ocr_settings, args, lang_code, cache):
+                commit_duplicates()
+                next_index = ocr_indices[ocr_index]
+                run_report.add_page(os.path.basename(image_paths[next_index]), metrics)
+                commit_page(next_index, results)
+                next_index += 1
+            commit_duplicates()
+            status = 'completed'
+        except KeyboardInterrupt:
+            status = 'stopped'
+            print("CLI: Interrupted, the project is left unchanged.")
+        except Exception as e:
+            print(f"CLI: Error - OCR failed: {e}")
+            traceback.print_exc()
+        finally:
+            run_report.finish(status)
+            print(f"CLI: Run {status}.\n" + run_report.summary_text())
+            run_report.save(OCRRunReport.path_for_project(model.mmtl_path))
+
+        if status != 'completed':
+            return 130 if status == 'stopped' else 1
+        model.next_global_row_number = next_row_number
+        if args.dry_run:
+            print("CLI: Dry run, results were not saved.")
+            return 0
+        print("CLI: " + model.save_project().replace("\n", " "))
+        return 0
+    finally:
+        rmtree(temp_dir, ignore_errors=True)
+
+# Shared secret between the coordinator and its workers, if not given with --authkey
+AUTHKEY_ENV = "MANHWAOCR_CLUSTER_KEY"
+
+def _resolve_authkey(args, generate=False):
+    authkey = args.authkey or os.environ.get(AUTHKEY_ENV)
+    if not authkey and generate:
+        authkey = secrets.token_hex(16)
+        print(f"CLI: No --authkey or {AUTHKEY_ENV} given; generated key for this run: {authkey}")
+    return authkey.encode('utf-8') if authkey else None
+
+def run_serve(args):
+    """The `serve` command: OCRs several projects with workers on any number of machines."""
+    settings = QSettings("YourCompany", "MangaOCRTool")
+    if args.engine is None: args.engine = settings.value("ocr_engine", "easyocr")
+    if args.gpu is None: args.gpu = settings.value("use_gpu", "true").lower() == "true"
+    ocr_settings = build_ocr_settings(settings)
+    authkey = _resolve_authkey(args, generate=True)
+
+    temp_dirs = []
+    projects = []
+    try:
+        for project_path in args.projects:
+            mmtl_path = os.path.abspath(project_path)
+            if not os.path.isfile(mmtl_path):
+                print(f"CLI: Error - Project file not found: {mmtl_path}")
+                return 2
+            temp_dirs.append(extract_project(mmtl_path))
+            model = load_model(mmtl_path, temp_dirs[-1])
+            projects.append((model.project_name, model, LANGUAGE_CODES.get(model.original_language, 'ko')))
+
+        def save_finished_project(project):
+            if project.status == 'completed':
+                if args.dry_run:
+                    print(f"CLI: Dry run, '{project.name}' was not saved.")
+                else:
+                    print("CLI: " + project.model.save_project().replace("\n", " "))
+            project.report.save(OCRRunReport.path_for_project(project.model.mmtl_path))
+
+        coordinator = OCRCoordinator(projects, ocr_settings, address=(args.host, args.port), authkey=authkey,
+                                     on_project_finished=save_finished_project, job_timeout=args.job_timeout)
+        coordinator.start()
+
+        local_workers = []
+        context = multiprocessing.get_context("spawn")
+        for worker_number in range(args.local_workers):
+            process = context.Process(target=run_worker, args=(('localhost', coordinator.address[1]), authkey,
+                                                               args.engine, args.gpu, f"local-{worker_number + 1}"))
+            process.start()
+            local_workers.append(process)
+
+        try:
+            statuses = coordinator.wait()
+        except KeyboardInterrupt:
+            print("CLI: Interrupted, unfinished projects are left unchanged.")
+            coordinator.stop()
+            statuses = {project.name: project.status for project in coordinator.projects}
+        for process in local_workers:
+            process.join(timeout=30)
+            if process.is_alive(): process.terminate()
+
+        elapsed = max(time.time() - coordinator.started_at, 1e-6)
+        print(f"CLI: {coordinator.pages_done} pages in {elapsed:.1f}s ({coordinator.pages_done / elapsed:.2f} pages/s).")
+        for name, status in statuses.items():
+            print(f"CLI:   {name}: {status}")
+        return 0 if all(status == 'completed' for status in statuses.values()) else 1
+    finally:
+        for temp_dir in temp_dirs:
+            rmtree(temp_dir, ignore_errors=True)
+
+def run_cluster_worker(args):
+    """The `worker` command: OCRs pages for a coordinator until its run is done."""
+    host, _, port = args.coordinator.rpartition(':')
+    if not host or not port.isdigit():
+        print("CLI: Error - The coordinator address must look like host:port.")
+        return 2
+    settings = QSettings("YourCompany", "MangaOCRTool")
+    if args.engine is None: args.engine = settings.value("ocr_engine", "easyocr")
+    if args.gpu is None: args.gpu = settings.value("use_gpu", "true").lower() == "true"
+    authkey = _resolve_authkey(args)
+    if authkey is None:
+        print(f"CLI: Error - Pass the coordinator's key with --authkey or {AUTHKEY_ENV}.")
+        return 2
+
+    # The coordinator may still be extracting its projects; keep knocking for a while.
+    deadline = time.time() + args.connect_timeout
+    while True:
+        try:
+            run_worker((host, int(port)), authkey, args.engine, args.gpu)
+            return 0
+        except ConnectionRefusedError:
+            if time.time() >= deadline:
+                print(f"CLI: Error - No coordinator at {host}:{port}.")
+                return 1
+            time.sleep(2)
+
+def _add_engine_arguments(parser):
+    parser.add_argument("--engine", choices=("easyocr", "fake"), help="OCR engine ('fake' benchmarks without models).")
+    gpu_group = parser.add_mutually_exclusive_group()
+    gpu_group.add_argument("--gpu", dest="gpu", action="store_true", default=None, help="Run the reader on the GPU.")
+    gpu_group.add_argument("--cpu", dest="gpu", action="store_false", help="Run the reader on the CPU.")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="ManhwaOCR headless tools.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ocr_parser = subparsers.add_parser("ocr", help="OCR every page of a .mmtl project and save the results into it.")
+    ocr_parser.add_argument("project", help="Path to the .mmtl project.")
+    ocr_parser.add_argument("--workers", type=int, help="OCR worker processes (1 = in-process reader).")
+    ocr_parser.add_argument("--torch-threads", type=int, help="Torch threads per worker process (0 = automatic).")
+    _add_engine_arguments(ocr_parser)
+    ocr_parser.add_argument("--cross-page-batch", type=int, help="Pages recognized together (0 = disabled).")
+    ocr_parser.add_argument("--prefetch", type=int, help="Pages decoded ahead of the reader (0 = disabled).")
+    ocr_parser.add_argument("--no-cache", action="store_true", help="Do not read or write the OCR result cache.")
+    ocr_parser.add_argument("--cache-dir", help="OCR result cache directory.")
+    ocr_parser.add_argument("--output", help="Save to this .mmtl instead of overwriting the project.")
+    ocr_parser.add_argument("--dry-run", action="store_true", help="Run OCR and report throughput without saving.")
+    ocr_parser.set_defaults(func=run_ocr)
+
+    serve_parser = subparsers.add_parser("serve", help="Coordinate OCR of several projects across worker machines.")
+    serve_parser.add_argument("projects", nargs="+", help="Paths to the .mmtl projects.")
+    serve_parser.add_argument("--host", default="localhost", help="Interface to listen on (0.0.0.0 for other machines).")
+    serve_parser.add_argument("--port", type=int, default=6010, help="TCP port workers connect to.")
+    serve_parser.add_argument("--authkey", help=f"Shared secret for workers (default: ${AUTHKEY_ENV}, else generated).")
+    serve_parser.add_argument("--local-workers", type=int, default=0, help="Worker processes to start on this machine.")
+    serve_parser.add_argument("--job-timeout", type=int, default=900, help="Seconds before a silent worker's page is re-queued.")
+    serve_parser.add_argument("--dry-run", action="store_true", help="Run OCR and report throughput without saving.")
+    _add_engine_arguments(serve_parser) # For --local-workers
+    serve_parser.set_defaults(func=run_serve)
+
+    worker_parser = subparsers.add_parser("worker", help="OCR pages for a coordinator started with 'serve'.")
+    worker_parser.add_argument("coordinator", help="Coordinator address as host:port.")
+    worker_parser.add_argument("--authkey", help=f"The coordinator's secret (default: ${AUTHKEY_ENV}).")
+    worker_parser.add_argument("--connect-timeout", type=int, default=60, help="Seconds to keep retrying the connection.")
+    _add_engine_arguments(worker_parser)
+    worker_parser.set_defaults(func=run_cluster_worker)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# --- END OF FILE cli.py ---
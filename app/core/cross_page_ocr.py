@@ -0,0 +1,281 @@
+# --- START OF FILE cross_page_ocr.py ---
+
+import os
+import time
+import bisect
+import traceback
+from collections import namedtuple
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+from app.core.ocr_processor import (preprocess_image, plan_page_bands, scale_to_page, prune_boxes_by_height,
+                                    detection_scale, detect_band, recognize_boxes, escalation_threshold, ADAPTIVE_DECODER,
+                                    filter_and_merge_results, ocr_cache_params)
+from app.core.ocr_metrics import new_page_metrics
+
+# One detected text region cut out of a preprocessed page.
+# polygon is None for axis-aligned boxes, else the free-form box in crop coordinates.
+# (x, y) is the crop's top-left corner in preprocessed-page space; tile is the band index.
+TextCrop = namedtuple('TextCrop', ['pixels', 'polygon', 'x', 'y', 'tile'])
+
+# Vertical gap between crops on the recognition canvas, so every region maps to exactly one slot.
+CANVAS_GAP = 8
+# Crops are stacked onto canvases of at most this many pixels to bound memory.
+MAX_CANVAS_PIXELS = 64 * 1024 * 1024
+
+def cut_text_crops(image_np, horizontal_list, free_list, top=0, tile=0):
+    """
+    Cuts the regions found by reader.detect() out of an image.
+
+    :param image_np: The detected image (a page band that starts at row `top` of its page).
+    :param horizontal_list: Axis-aligned boxes [x_min, x_max, y_min, y_max] for this image.
+    :param free_list: Free-form 4-point boxes for this image.
+    :return: List of TextCrop, with positions shifted down by `top`.
+    """
+    image_height, image_width = image_np.shape[:2]
+    crops = []
+    for x_min, x_max, y_min, y_max in horizontal_list:
+        x_min, y_min = max(0, int(x_min)), max(0, int(y_min))
+        x_max, y_max = min(image_width, int(x_max)), min(image_height, int(y_max))
+        if x_max <= x_min or y_max <= y_min: continue
+        # Copied so the page image can be released before recognition
+        crops.append(TextCrop(image_np[y_min:y_max, x_min:x_max].copy(), None, x_min, y_min + top, tile))
+    for box in free_list:
+        xs = [int(p[0]) for p in box]
+        ys = [int(p[1]) for p in box]
+        x_min, y_min = max(0, min(xs)), max(0, min(ys))
+        x_max, y_max = min(image_width, max(xs)), min(image_height, max(ys))
+        if x_max <= x_min or y_max <= y_min: continue
+        polygon = [[p[0] - x_min, p[1] - y_min] for p in box]
+        crops.append(TextCrop(image_np[y_min:y_max, x_min:x_max].copy(), polygon, x_min, y_min + top, tile))
+    return crops
+
+def detect_page_crops(reader, preprocessed, skip_blank_bands, tile_height, tile_overlap,
+                      min_text_height, max_text_height, detect_resize_threshold=0, metrics=None):
+    """
+    Phase 1: runs only the text detector over a page and cuts out the detected regions.
+    Uses the same blank-band skipping, tiling, detection scale and height pruning as the per-page pipeline.
+
+    :param metrics: Optional page metrics dict; the number of boxes pruned by height is added to it.
+    :return: (crops, tiled): list of TextCrop and whether the page was split into overlapping tiles.
+    """
+    img_np = np.array(preprocessed.image)
+    page_height = img_np.shape[0]
+    scale_y = preprocessed.original_height / page_height if page_height else 1.0
+    detect_scale = detection_scale(img_np.shape[1], detect_resize_threshold)
+    spans, bands = plan_page_bands(img_np, skip_blank_bands, tile_height, tile_overlap)
+    crops = []
+    for band_index, (top, bottom) in enumerate(bands):
+        band_np = img_np if (top, bottom) == (0, page_height) else img_np[top:bottom]
+        horizontal_list, free_list = detect_band(reader, band_np, detect_scale)
+        horizontal_list, free_list, pruned = prune_boxes_by_height(
+            horizontal_list, free_list, bottom - top, top, scale_y, min_text_height, max_text_height)
+        if metrics is not None:
+            metrics['regions_pruned'] = metrics.get('regions_pruned', 0) + pruned
+        crops.extend(cut_text_crops(band_np, horizontal_list, free_list, top=top, tile=band_index))
+    return crops, len(bands) > len(spans)
+
+def recognize_crops(reader, crops, batch_size, decoder, escalate_below=0.0, escalated=None, **recognize_kwargs):
+    """
+    Phase 2: recognizes text crops from any number of pages in shared batches.
+
+    The crops are stacked onto one tall canvas (one slot per crop) and handed to a single
+    reader.recognize() call, so its batches are filled across page boundaries. Each result is
+    routed back to its crop by the slot its box falls into.
+    Note that easyocr only batches recognition on GPU; on CPU it reads box by box either way.
+
+    :param decoder: Any reader decoder, or 'adaptive' (see ocr_processor.recognize_boxes).
+    :param escalate_below: With the adaptive decoder, the confidence below which a box is re-read with beam search.
+    :param escalated: Optional list parallel to `crops`; receives the number of each crop's boxes re-read.
+    :param recognize_kwargs: Extra reader.recognize() options (e.g. easyocr's adjust_contrast).
+
+    :return: List parallel to `crops`; each entry is a list of (coordinates, text, confidence)
+             with coordinates in preprocessed-page space.
+    """
+    recognized = [[] for _ in crops]
+    start = 0
+    while start < len(crops):
+        # Fill one canvas up to the pixel budget (always at least one crop)
+        end, height, width = start, 0, 0
+        while end < len(crops):
+            crop_height, crop_width = crops[end].pixels.shape[:2]
+            new_height, new_width = height + crop_height + CANVAS_GAP, max(width, crop_width)
+            if end > start and new_height * new_width > MAX_CANVAS_PIXELS: break
+            height, width, end = new_height, new_width, end + 1
+
+        canvas = np.full((height, width), 255, dtype=np.uint8)
+        horizontal_list, free_list, slot_tops = [], [], []
+        slot_top = 0
+        for crop in crops[start:end]:
+            crop_height, crop_width = crop.pixels.shape[:2]
+            canvas[slot_top:slot_top + crop_height, :crop_width] = crop.pixels
+            if crop.polygon is None:
+                horizontal_list.append([0, crop_width, slot_top, slot_top + crop_height])
+            else:
+                free_list.append([[p[0], p[1] + slot_top] for p in crop.polygon])
+            slot_tops.append(slot_top)
+            slot_top += crop_height + CANVAS_GAP
+
+        results, escalated_results = recognize_boxes(reader, canvas, horizontal_list, free_list, batch_size, decoder,
+                                                     escalate_below=escalate_below, **recognize_kwargs)
+        for result_index, (coords, text, confidence) in enumerate(results):
+            center_y = sum(p[1] for p in coords) / len(coords)
+            slot = max(0, bisect.bisect_right(slot_tops, center_y) - 1)
+            crop = crops[start + slot]
+            page_coords = [[p[0] + crop.x, p[1] - slot_tops[slot] + crop.y] for p in coords]
+            recognized[start + slot].append((page_coords, text, confidence))
+            if escalated is not None and result_index in escalated_results:
+                escalated[start + slot] += 1
+        del canvas
+        start = end
+    return recognized
+
+def iter_cross_page_results(image_paths, reader, pages_per_batch, settings, cache=None, prefetcher=None, stop_check=None):
+    """
+    Two-phase batch OCR: detects text on `pages_per_batch` pages, recognizes all their crops
+    together, then filters and merges every page on its own exactly like run_ocr_pipeline().
+
+    :param settings: The OCR settings dict used by run_ocr_pipeline (filters, merging, easyocr params...).
+    :param prefetcher: Optional ImagePrefetcher producing the pages in the same order.
+    :return: Generator of (index, merged_results, page_metrics) in page order; stops early if stop_check() is True.
+    """
+    is_stopped = stop_check or (lambda: False)
+    raw_params, final_params = ocr_cache_params(
+        settings['batch_size'], settings['decoder'], settings['adjust_contrast'], settings['resize_threshold'],
+        settings.get('tile_height', 0), settings.get('tile_overlap', 0), settings.get('skip_blank_bands', False),
+        settings['min_text_height'], settings['max_text_height'], settings['min_confidence'], settings['distance_threshold'],
+        settings.get('detect_resize_threshold', 0), settings.get('adaptive_threshold', 0.5)
+    )
+    escalate_below = escalation_threshold(settings.get('adaptive_threshold', 0.5), settings['min_confidence'])
+
+    for chunk_start in range(0, len(image_paths), pages_per_batch):
+        chunk = range(chunk_start, min(len(image_paths), chunk_start + pages_per_batch))
+        merged_by_page = {}
+        scaled_by_page = {}
+        metrics_by_page = {index: new_page_metrics() for index in chunk}
+        detected_pages = [] # (index, page dimensions, tiled)
+        image_hashes = {}
+        all_crops = []
+        crop_owner = []
+
+        # --- Phase 1: detection (cache hits skip it) ---
+        start_time_detect = time.time()
+        for index in chunk:
+            if is_stopped(): return
+            image_path = image_paths[index]
+            preprocessed = None
+            if prefetcher:
+                preprocessed = prefetcher.get(image_path, stop_check=is_stopped)
+                if preprocessed is None: return # Stopped
+
+            if cache:
+                image_hash = image_hashes[index] = cache.hash_image(image_path)
+                cached_final = cache.get(cache.FINAL, image_hash, final_params)
+                if cached_final is not None:
+                    print(f"OCR Batch: Cache hit (final) for {image_path}: {len(cached_final)} blocks.")
+                    merged_by_page[index] = cached_final
+                    metrics_by_page[index].update(cache=cache.FINAL, blocks=len(cached_final))
+                    continue
+                cached_raw = cache.get(cache.RAW, image_hash, raw_params)
+                if cached_raw is not None:
+                    print(f"OCR Batch: Cache hit (raw) for {image_path}: {len(cached_raw)} regions, re-filtering only.")
+                    scaled_by_page[index] = cached_raw
+                    metrics_by_page[index]['cache'] = cache.RAW
+                    continue
+
+            if preprocessed is None:
+                preprocessed = preprocess_image(image_path, settings['adjust_contrast'], settings['resize_threshold'])
+            page_timings = metrics_by_page[index]['timings']
+            page_timings.update(preprocessed.timings)
+            stage_start = time.perf_counter()
+            crops, tiled = detect_page_crops(reader, preprocessed, settings.get('skip_blank_bands', False),
+                                             settings.get('tile_height', 0), settings.get('tile_overlap', 0),
+                                             settings['min_text_height'], settings['max_text_height'],
+                                             settings.get('detect_resize_threshold', 0), metrics=metrics_by_page[index])
+            page_timings['detect'] = time.perf_counter() - stage_start
+            print(f"OCR Batch: Detected {len(crops)} regions in {os.path.basename(image_path)}.")
+            # Only the dimensions are needed from here on
+            detected_pages.append((index, preprocessed._replace(image=None), tiled))
+            crop_owner.extend([index] * len(crops))
+            all_crops.extend(crops)
+        detect_duration = time.time() - start_time_detect
+
+        # --- Phase 2: recognition of every crop in the chunk at once ---
+        if all_crops:
+            if is_stopped(): return
+            start_time_recognize = time.time()
+            escalated = [0] * len(all_crops)
+            recognized = recognize_crops(reader, all_crops, settings['batch_size'], settings['decoder'],
+                                         escalate_below=escalate_below, escalated=escalated)
+            recognize_duration = time.time() - start_time_recognize
+            print(f"OCR Batch: Pages {chunk.start + 1}-{chunk.stop}: detection {detect_duration:.2f}s, "
+                  f"recognized {len(all_crops)} regions from {len(detected_pages)} pages in {recognize_duration:.2f}s.")
+            if settings['decoder'] == ADAPTIVE_DECODER:
+                print(f"OCR Batch: Adaptive decoder re-read {sum(escalated)} regions below "
+                      f"confidence {escalate_below:.2f} with beam search.")
+            # Each page is charged its share of the shared recognition time, by number of crops
+            for owner, crop_escalated in zip(crop_owner, escalated):
+                page_metrics = metrics_by_page[owner]
+                page_metrics['timings']['recognize'] = page_metrics['timings'].get('recognize', 0.0) + recognize_duration / len(all_crops)
+                page_metrics['regions_escalated'] = page_metrics.get('regions_escalated', 0) + crop_escalated
+
+            raw_by_page = {index: [] for index, _, _ in detected_pages}
+            for crop, owner, crop_results in zip(all_crops, crop_owner, recognized):
+                for coords, text, confidence in crop_results:
+                    raw_by_page[owner].append((coords, text, confidence, crop.tile))
+            for index, dimensions, tiled in detected_pages:
+                stage_start = time.perf_counter()
+                scaled_by_page[index] = scale_to_page(raw_by_page[index], dimensions, tiled=tiled)
+                metrics_by_page[index]['timings']['scale'] = time.perf_counter() - stage_start
+                if cache:
+                    cache.put(cache.RAW, image_hashes[index], raw_params, scaled_by_page[index])
+        else:
+            # Pages without any detected region still need their (empty) result
+            for index, _, _ in detected_pages:
+                scaled_by_page[index] = []
+
+        # --- Per-page filtering and merging, then hand the pages out in order ---
+        for index in chunk:
+            if index not in merged_by_page:
+                merged = filter_and_merge_results(
+                    scaled_by_page[index], settings['min_text_height'], settings['max_text_height'],
+                    settings['min_confidence'], settings['distance_threshold'], stop_check=is_stopped,
+                    metrics=metrics_by_page[index]
+                )
+                if merged is None: return # Stopped
+                if cache:
+                    cache.put(cache.FINAL, image_hashes[index], final_params, merged)
+                merged_by_page[index] = merged
+            yield index, merged_by_page[index], metrics_by_page[index]
+
+class CrossPageOCRProcessor(QThread):
+    """
+    Runs iter_cross_page_results() off the GUI thread with the in-process reader.
+    Mirrors OCRPoolThread's interface, so BatchOCRHandler commits its pages the same way.
+    """
+    page_finished = pyqtSignal(int, list, dict)  # (page index, merged results, page metrics)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, image_paths, reader, pages_per_batch, settings, cache=None, prefetcher=None):
+        super().__init__()
+        self.image_paths = image_paths
+        self.reader = reader
+        self.pages_per_batch = pages_per_batch
+        self.settings = settings
+        self.cache = cache
+        self.prefetcher = prefetcher
+        self.stop_requested = False
+
+    def run(self):
+        index = 0
+        try:
+            print(f"OCR Batch: Recognizing {len(self.image_paths)} images in batches of {self.pages_per_batch} pages.")
+            for index, results, metrics in iter_cross_page_results(
+                    self.image_paths, self.reader, self.pages_per_batch, self.settings,
+                    cache=self.cache, prefetcher=self.prefetcher, stop_check=lambda: self.stop_requested):
+                self.page_finished.emit(index, results, metrics)
+        except Exception as e:
+            print(f"!!! OCR Batch Error: {str(e)} !!!")
+            print(traceback.format_exc())
+            self.error_occurred.emit(f"Cross-page OCR failed near {os.path.basename(self.image_paths[index])}: {str(e)}")
+
+# --- END OF FILE cross_page_ocr.py ---
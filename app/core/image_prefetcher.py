@@ -0,0 +1,78 @@
+# --- START OF FILE image_prefetcher.py ---
+
+import os
+import queue
+import threading
+import traceback
+from app.core.ocr_processor import preprocess_image
+
+class ImagePrefetcher:
+    """
+    Producer side of the batch OCR pipeline.
+    A background thread decodes and preprocesses the upcoming pages into a bounded queue,
+    so the reader never waits on disk or PIL. PIL releases the GIL while decoding and
+    resizing, so this overlaps with recognition running in the OCRProcessor thread.
+    Pages must be consumed in the same order as `image_paths`.
+    """
+    def __init__(self, image_paths, adjust_contrast, resize_threshold, depth=2):
+        self.image_paths = list(image_paths)
+        self.adjust_contrast = adjust_contrast
+        self.resize_threshold = resize_threshold
+        self.depth = max(1, depth)
+
+        self._queue = queue.Queue(maxsize=self.depth)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ImagePrefetcher", daemon=True)
+
+    def start(self):
+        print(f"Prefetcher: Starting (queue depth={self.depth}).")
+        self._thread.start()
+
+    def stop(self):
+        """Stops the loader thread and drops any pages still waiting in the queue."""
+        self._stop_event.set()
+        while True:
+            try: self._queue.get_nowait()
+            except queue.Empty: break
+
+    def _run(self):
+        for image_path in self.image_paths:
+            if self._stop_event.is_set(): return
+            try:
+                item = preprocess_image(image_path, self.adjust_contrast, self.resize_threshold)
+            except Exception as e:
+                print(f"Prefetcher: Failed to preprocess {image_path}: {e}")
+                traceback.print_exc()
+                item = e # Re-raised on the consumer side so the batch reports it
+            # Blocks while the queue is full; wakes up regularly to honour stop().
+            while not self._stop_event.is_set():
+                try:
+                    self._queue.put((image_path, item), timeout=0.2)
+                    break
+                except queue.Full:
+                    continue
+
+    def get(self, image_path, stop_check=None):
+        """
+        Returns the PreprocessedImage for `image_path`, waiting if it is not ready yet.
+
+        :param stop_check: Optional callable returning True to abandon the wait.
+        :return: PreprocessedImage, or None if stopped while waiting.
+        """
+        is_stopped = stop_check or (lambda: False)
+        while True:
+            if is_stopped() or self._stop_event.is_set():
+                return None
+            try:
+                queued_path, item = self._queue.get(timeout=0.2)
+                break
+            except queue.Empty:
+                continue
+        if queued_path != image_path:
+            raise RuntimeError(f"Prefetcher out of sync: expected {os.path.basename(image_path)}, "
+                               f"got {os.path.basename(queued_path)}")
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+# --- END OF FILE image_prefetcher.py ---
@@ -0,0 +1,128 @@
+# --- START OF FILE ocr_cache.py ---
+
+import os
+import json
+import hashlib
+import tempfile
+from app.core.project_archive import open_project_file
+
+class OCRResultCache:
+    """
+    On-disk cache of OCR results with size-based LRU eviction.
+
+    Two layers are kept, both keyed by the SHA-256 of the image bytes, the OCR language and
+    the engine (so results of the fake benchmark engine never reach an EasyOCR run):
+      - 'raw':   page-space reader output before filtering/merging, keyed by the
+                 settings that affect recognition (batch size, decoder, contrast, resize...,
+                 and the text height bounds, since boxes outside them are never recognized).
+      - 'final': filtered and merged results, keyed additionally by the confidence and
+                 merge settings.
+    Changing only the confidence or merge setting therefore misses 'final' but hits 'raw',
+    and the page is re-filtered in milliseconds without running the reader.
+
+    With read_final off, 'final' lookups always miss (entries are still written), so a page
+    OCRed again on purpose is re-filtered from the reader output instead of returned as is.
+
+    The object is plain data so it can be pickled into OCR worker processes; entries are
+    written atomically, so several processes may share one cache directory.
+    """
+    RAW = 'raw'
+    FINAL = 'final'
+
+    def __init__(self, cache_dir, language, engine_name="easyocr", max_bytes=512 * 1024 * 1024, read_final=True):
+        self.cache_dir = cache_dir
+        self.language = language
+        self.engine_name = engine_name
+        self.max_bytes = max_bytes
+        self.read_final = read_final
+        for layer in (self.RAW, self.FINAL):
+            os.makedirs(os.path.join(cache_dir, layer), exist_ok=True)
+
+    @staticmethod
+    def hash_image(image_path):
+        """Returns the SHA-256 hex digest of the image file's bytes."""
+        sha = hashlib.sha256()
+        with open_project_file(image_path) as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def _entry_path(self, layer, image_hash, params):
+        key_source = json.dumps([image_hash, self.language, self.engine_name, sorted(params.items())])
+        key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, layer, f"{key}.json")
+
+    def get(self, layer, image_hash, params):
+        """
+        Looks up a cached result list.
+
+        :param layer: OCRResultCache.RAW or OCRResultCache.FINAL.
+        :param params: Dict of every setting the cached results depend on.
+        :return: List of result dicts, or None on a miss.
+        """
+        if layer == self.FINAL and not self.read_final:
+            return None
+        path = self._entry_path(layer, image_hash, params)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                results = json.load(f)
+            os.utime(path) # Mark as recently used for LRU eviction
+            return results
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"OCR Cache: Warning - Ignoring unreadable entry {os.path.basename(path)}: {e}")
+            return None
+
+    def put(self, layer, image_hash, params, results):
+        """Stores a result list, then evicts the least recently used entries if over budget."""
+        path = self._entry_path(layer, image_hash, params)
+        serializable = [
+            {'coordinates': [[int(p[0]), int(p[1])] for p in res['coordinates']],
+             'text': res['text'], 'confidence': float(res['confidence'])}
+            for res in results
+        ]
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(serializable, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"OCR Cache: Warning - Could not write entry: {e}")
+            return
+        self._evict_if_needed()
+
+    def _evict_if_needed(self):
+        """Deletes the oldest entries (by last use) until the cache is below 90% of its budget."""
+        entries = []
+        total_size = 0
+        for layer in (self.RAW, self.FINAL):
+            try:
+                with os.scandir(os.path.join(self.cache_dir, layer)) as it:
+                    for entry in it:
+                        if not entry.name.endswith('.json'): continue
+                        try: stat = entry.stat()
+                        except FileNotFoundError: continue # Evicted by another process
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                        total_size += stat.st_size
+            except FileNotFoundError:
+                continue
+        if total_size <= self.max_bytes:
+            return
+
+        target_size = int(self.max_bytes * 0.9)
+        entries.sort()
+        removed = 0
+        for _, size, path in entries:
+            if total_size <= target_size: break
+            try:
+                os.remove(path)
+                total_size -= size
+                removed += 1
+            except FileNotFoundError:
+                total_size -= size
+            except OSError as e:
+                print(f"OCR Cache: Warning - Could not evict {path}: {e}")
+        print(f"OCR Cache: Evicted {removed} entries; cache size is now {total_size / (1024 * 1024):.1f} MB.")
+
+# --- END OF FILE ocr_cache.py ---
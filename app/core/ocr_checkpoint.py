@@ -0,0 +1,97 @@
+# --- START OF FILE ocr_checkpoint.py ---
+
+import os
+import json
+import traceback
+
+class OCRCheckpoint:
+    """
+    Append-only, per-page checkpoint of a batch OCR run, stored as JSON Lines.
+
+    The first line is a header; every following line records one completed page:
+    its filename, its numbered results and the next global row number after it.
+    A line is flushed to disk as soon as the page is committed, so a crash loses
+    at most the page that was being processed. A truncated last line (crash during
+    a write) is ignored on load.
+
+    The file lives next to the .mmtl (not in the extraction temp dir), because the
+    temp dir gets a random name per session and is deleted when the window closes.
+    """
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+
+    @staticmethod
+    def path_for_project(mmtl_path):
+        return f"{mmtl_path}.ocr-checkpoint"
+
+    def begin(self, starting_row_number):
+        """Starts a fresh checkpoint, discarding any previous one."""
+        self._write_line({'version': self.VERSION, 'starting_row_number': starting_row_number}, mode='w')
+
+    def record_page(self, filename, results, next_global_row_number):
+        """Appends one completed page (possibly with no results)."""
+        self._write_line({
+            'filename': filename,
+            'results': results,
+            'next_global_row_number': next_global_row_number
+        }, mode='a')
+
+    def _write_line(self, record, mode):
+        try:
+            with open(self.path, mode, encoding='utf-8') as f:
+                # default=float covers numpy scalars coming from the reader
+                f.write(json.dumps(record, ensure_ascii=False, default=float) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            print(f"Checkpoint: Warning - Could not write {self.path}: {e}")
+
+    def load(self):
+        """
+        Reads the checkpoint back.
+
+        :return: Dict with 'starting_row_number', 'completed' (filenames in commit order),
+                 'results' (all numbered results) and 'next_global_row_number',
+                 or None if there is no usable checkpoint.
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+            header = json.loads(lines[0]) if lines else {}
+            if header.get('version') != self.VERSION:
+                return None
+
+            state = {
+                'starting_row_number': header.get('starting_row_number', 0),
+                'completed': [],
+                'results': [],
+                'next_global_row_number': header.get('starting_row_number', 0)
+            }
+            for line in lines[1:]:
+                try:
+                    page = json.loads(line)
+                except ValueError:
+                    print("Checkpoint: Ignoring incomplete trailing page record.")
+                    break
+                state['completed'].append(page['filename'])
+                state['results'].extend(page.get('results', []))
+                state['next_global_row_number'] = page['next_global_row_number']
+            return state
+        except (OSError, ValueError, KeyError, IndexError) as e:
+            print(f"Checkpoint: Warning - Could not read {self.path}: {e}")
+            traceback.print_exc()
+            return None
+
+    def clear(self):
+        """Deletes the checkpoint once the run it describes is no longer resumable."""
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        except OSError as e:
+            print(f"Checkpoint: Warning - Could not remove {self.path}: {e}")
+
+# --- END OF FILE ocr_checkpoint.py ---
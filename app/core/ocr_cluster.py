@@ -0,0 +1,278 @@
+# --- START OF FILE ocr_cluster.py ---
+
+import os
+import time
+import socket
+import threading
+import tempfile
+import traceback
+from collections import deque, namedtuple
+from multiprocessing.connection import Listener, Client, AuthenticationError
+from app.core.ocr_processor import run_ocr_pipeline
+from app.core.ocr_engine import create_engine
+from app.core.ocr_metrics import OCRRunReport, new_page_metrics
+from app.utils.data_processing import number_page_results
+
+# One page to OCR. `project` indexes OCRCoordinator.projects, `index` the project's image_paths.
+ClusterJob = namedtuple('ClusterJob', ['project', 'index', 'image_path', 'lang_code'])
+
+class ClusterProject:
+    """Coordinator-side state of one project: its model and the pages committed so far."""
+    def __init__(self, name, model, lang_code, settings):
+        self.name = name
+        self.model = model
+        self.lang_code = lang_code
+        self.image_paths = list(model.image_paths)
+        self.next_commit_index = 0
+        self.pending = {} # page index -> (results, metrics), waiting for the earlier pages
+        self.attempts = {} # page index -> failed attempts
+        self.next_global_row_number = model.next_global_row_number
+        self.status = 'running'
+        self.report = OCRRunReport(name, 'cluster', settings)
+
+class OCRCoordinator:
+    """
+    Splits projects into page jobs and hands them to OCR workers on any number of machines.
+
+    Workers connect over TCP (multiprocessing.connection with an authentication key), take one
+    page at a time and send back the merged result dicts of run_ocr_pipeline(). The page image
+    travels with the job, so workers need no shared filesystem. Results are numbered and added
+    to each project's model in page order, as BatchOCRHandler does. A page whose worker
+    disconnects or times out is queued again for another worker.
+
+    Usage: start(), launch workers pointing at `address`, then wait().
+
+    :param projects: List of (name, ProjectModel, lang_code). The models' standard results are
+                     replaced by the run, manual results are kept.
+    :param settings: The run_ocr_pipeline settings dict, shared by all pages.
+    :param on_project_finished: Optional callable(ClusterProject), called from a coordinator
+                                thread when a project completes or fails, e.g. to save it.
+    :param job_timeout: Seconds a worker may spend on one page before it is considered lost.
+    :param max_attempts: Failed attempts per page (worker errors, lost or timed-out workers) before its project is marked failed.
+    """
+    def __init__(self, projects, settings, address=('localhost', 6010), authkey=b'',
+                 on_project_finished=None, job_timeout=900, max_attempts=3):
+        self.settings = dict(settings)
+        self.address = address
+        self.authkey = authkey
+        self.on_project_finished = on_project_finished
+        self.job_timeout = job_timeout
+        self.max_attempts = max_attempts
+
+        self.projects = []
+        self._jobs = deque()
+        for project_index, (name, model, lang_code) in enumerate(projects):
+            model.clear_standard_results()
+            project = ClusterProject(name, model, lang_code, self.settings)
+            self.projects.append(project)
+            self._jobs.extend(ClusterJob(project_index, index, image_path, lang_code)
+                              for index, image_path in enumerate(project.image_paths))
+            if not project.image_paths:
+                project.status = 'completed'
+
+        self._condition = threading.Condition()
+        self._listener = None
+        self._stopped = False
+        self._finishing = 0 # Projects whose on_project_finished callback has not returned yet
+        self.started_at = None
+        self.pages_done = 0
+
+    def start(self):
+        """Binds the listening socket and starts accepting workers in the background."""
+        self._listener = Listener(self.address, authkey=self.authkey)
+        self.address = self._listener.address # Resolves port 0 to the one actually bound
+        self.started_at = time.time()
+        print(f"Coordinator: Listening on {self.address[0]}:{self.address[1]} "
+              f"with {len(self._jobs)} pages from {len(self.projects)} projects.")
+        threading.Thread(target=self._accept_loop, name="CoordinatorAccept", daemon=True).start()
+
+    def wait(self):
+        """Blocks until every project has completed or failed. Returns {name: status}."""
+        with self._condition:
+            while (not self._stopped and self._has_running_projects()) or self._finishing:
+                self._condition.wait(1.0)
+        self.stop()
+        return {project.name: project.status for project in self.projects}
+
+    def stop(self):
+        """Stops handing out pages; workers are told to exit on their next request."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._listener:
+            try: self._listener.close()
+            except OSError: pass
+
+    def _has_running_projects(self):
+        return any(project.status == 'running' for project in self.projects)
+
+    def _accept_loop(self):
+        while not self._stopped:
+            try:
+                conn = self._listener.accept()
+            except AuthenticationError as e:
+                print(f"Coordinator: Rejected a connection: {e}")
+                continue
+            except OSError:
+                return # Listener closed
+            threading.Thread(target=self._serve_worker, args=(conn,), name="CoordinatorWorker", daemon=True).start()
+
+    def _next_job(self):
+        """Waits for a page to hand out. Returns None once there is nothing left to do."""
+        with self._condition:
+            while True:
+                while self._jobs:
+                    job = self._jobs.popleft()
+                    if self.projects[job.project].status == 'running':
+                        return job
+                # Pages still in flight elsewhere may come back if their worker is lost
+                if self._stopped or not self._has_running_projects():
+                    return None
+                self._condition.wait(1.0)
+
+    def _serve_worker(self, conn):
+        """Feeds pages to one connected worker until the run ends or the worker is lost."""
+        worker_name = "?"
+        job = None
+        try:
+            _, worker_name = conn.recv() # ('hello', name)
+            print(f"Coordinator: Worker '{worker_name}' connected.")
+            while True:
+                job = self._next_job()
+                if job is None:
+                    conn.send(('done',))
+                    break
+                try:
+                    with open(job.image_path, 'rb') as f:
+                        image_bytes = f.read()
+                except OSError as e:
+                    self._fail_job(job, f"Could not read the image: {e}", "coordinator")
+                    job = None
+                    continue
+                conn.send(('job', os.path.basename(job.image_path), image_bytes, job.lang_code, self.settings))
+                if not conn.poll(self.job_timeout):
+                    raise TimeoutError(f"no result after {self.job_timeout}s")
+                reply = conn.recv()
+                if reply[0] == 'result':
+                    self._complete_job(job, reply[1], reply[2], worker_name)
+                else:
+                    self._fail_job(job, reply[1], worker_name)
+                job = None
+        except (EOFError, OSError, TimeoutError) as e:
+            # Counted as a failed attempt too: a page that crashes or hangs every worker it is
+            # sent to must end its project rather than be re-queued forever.
+            print(f"Coordinator: Lost worker '{worker_name}': {e or type(e).__name__}")
+            if job is not None:
+                self._fail_job(job, f"Worker lost: {e or type(e).__name__}", worker_name)
+        except Exception as e:
+            # E.g. a reply that cannot be unpickled, or a page that fails to commit. The page counts
+            # as a failed attempt, so a page that always breaks ends its project instead of looping,
+            # and wait() never blocks on a job this thread no longer serves.
+            print(f"Coordinator: Dropping worker '{worker_name}' after an unexpected error: {type(e).__name__}: {e}")
+            if job is not None:
+                self._fail_job(job, f"{type(e).__name__}: {e}", worker_name)
+        finally:
+            conn.close()
+
+    def _fail_job(self, job, message, worker_name):
+        project = self.projects[job.project]
+        with self._condition:
+            attempts = project.attempts[job.index] = project.attempts.get(job.index, 0) + 1
+            print(f"Coordinator: Worker '{worker_name}' failed on page {job.index + 1} of '{project.name}' "
+                  f"(attempt {attempts}/{self.max_attempts}): {message}")
+            if attempts < self.max_attempts:
+                # To the front, so the commit order of its project is unblocked first
+                self._jobs.appendleft(job)
+                self._condition.notify_all()
+                return
+            finished = self._finish_project(project, 'failed')
+        if finished: self._notify_finished(project)
+
+    def _complete_job(self, job, results, metrics, worker_name):
+        """Stores one page and commits every page of its project that is now in order."""
+        project = self.projects[job.project]
+        with self._condition:
+            if project.status != 'running': return
+            project.pending[job.index] = (results, metrics)
+            self.pages_done += 1
+            while project.next_commit_index in project.pending:
+                page_results, page_metrics = project.pending.pop(project.next_commit_index)
+                filename = os.path.basename(project.image_paths[project.next_commit_index])
+                project.report.add_page(filename, page_metrics)
+                numbered, project.next_global_row_number = number_page_results(
+                    page_results, filename, project.next_global_row_number)
+                project.model.add_new_ocr_results(numbered)
+                project.next_commit_index += 1
+            elapsed = max(time.time() - self.started_at, 1e-6)
+            print(f"Coordinator: '{project.name}' page {job.index + 1}/{len(project.image_paths)} from "
+                  f"'{worker_name}' ({self.pages_done / elapsed:.2f} pages/s overall)")
+            finished = project.next_commit_index >= len(project.image_paths) and self._finish_project(project, 'completed')
+        if finished: self._notify_finished(project)
+
+    def _finish_project(self, project, status):
+        """Marks a project as finished (caller holds the lock). Returns False if it already was."""
+        if project.status != 'running':
+            return False
+        project.status = status
+        project.report.finish(status)
+        if status == 'completed':
+            project.model.next_global_row_number = project.next_global_row_number
+        self._finishing += 1
+        self._condition.notify_all()
+        return True
+
+    def _notify_finished(self, project):
+        print(f"Coordinator: Project '{project.name}' {project.status}. " + project.report.summary_text().replace("\n", "; "))
+        try:
+            if self.on_project_finished:
+                self.on_project_finished(project)
+        except Exception as e:
+            print(f"Coordinator: Error while finishing '{project.name}': {e}")
+            traceback.print_exc()
+        finally:
+            with self._condition:
+                self._finishing -= 1
+                self._condition.notify_all()
+
+def run_worker(address, authkey, engine_name="easyocr", use_gpu=False, name=None):
+    """
+    Connects to an OCRCoordinator and OCRs pages until it says the run is done.
+    One reader per language is built on first use and kept for the worker's lifetime.
+    """
+    name = name or f"{socket.gethostname()}-{os.getpid()}"
+    conn = Client(address, authkey=authkey)
+    conn.send(('hello', name))
+    print(f"OCR Worker '{name}': Connected to {address[0]}:{address[1]}.")
+    readers = {}
+    pages = 0
+    with tempfile.TemporaryDirectory() as work_dir:
+        try:
+            while True:
+                message = conn.recv()
+                if message[0] == 'done':
+                    break
+                _, filename, image_bytes, lang_code, settings = message
+                try:
+                    if lang_code not in readers:
+                        print(f"OCR Worker '{name}': Loading {engine_name} reader (Lang='{lang_code}', GPU={use_gpu})...")
+                        readers[lang_code] = create_engine(engine_name, lang_code, use_gpu)
+                    image_path = os.path.join(work_dir, filename)
+                    with open(image_path, 'wb') as f:
+                        f.write(image_bytes)
+                    metrics = new_page_metrics()
+                    results = run_ocr_pipeline(image_path, readers[lang_code], metrics=metrics, **settings)
+                    os.remove(image_path)
+                except Exception as e:
+                    traceback.print_exc()
+                    conn.send(('error', f"{filename}: {e}"))
+                    continue
+                conn.send(('result', results, metrics))
+                pages += 1
+        except (EOFError, OSError) as e:
+            print(f"OCR Worker '{name}': Lost the coordinator: {e}")
+        finally:
+            conn.close()
+    print(f"OCR Worker '{name}': Finished after {pages} pages.")
+    return pages
+
+# --- END OF FILE ocr_cluster.py ---
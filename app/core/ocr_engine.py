@@ -0,0 +1,152 @@
+# --- START OF FILE ocr_engine.py ---
+
+import time
+import math
+import zlib
+import numpy as np
+
+class OCREngine:
+    """
+    The interface the OCR pipelines (batch, cross-page, worker pool and manual) call.
+    It follows EasyOCR's Reader API, so a Reader-backed engine is a thin adapter.
+
+    Coordinates are in pixels of the image passed in. Boxes are 4-point polygons
+    [[x, y], [x, y], [x, y], [x, y]] (top-left, top-right, bottom-right, bottom-left).
+    """
+    name = "base"
+
+    def detect(self, image):
+        """
+        Finds text regions without reading them.
+
+        :param image: 2-D grayscale uint8 array.
+        :return: (horizontal_list, free_list), each holding one list per input image:
+                 axis-aligned boxes as [x_min, x_max, y_min, y_max], free-form boxes as 4-point polygons.
+        """
+        raise NotImplementedError
+
+    def recognize(self, image, horizontal_list=None, free_list=None, batch_size=1, decoder='greedy', detail=1, **kwargs):
+        """
+        Reads the given regions of an image.
+        Engines ignore keyword options they do not support.
+
+        :return: List of (box, text, confidence), one per region.
+        """
+        raise NotImplementedError
+
+    def readtext(self, image, batch_size=1, decoder='greedy', detail=1, **kwargs):
+        """
+        Detects and reads all text in an image.
+
+        :return: List of (box, text, confidence).
+        """
+        horizontal_list, free_list = self.detect(image)
+        return self.recognize(image, horizontal_list[0], free_list[0], batch_size=batch_size, decoder=decoder, detail=detail)
+
+class EasyOCREngine(OCREngine):
+    """Adapter around an easyocr.Reader."""
+    name = "easyocr"
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    @classmethod
+    def create(cls, lang_code, use_gpu):
+        import easyocr # Deferred: importing torch alone takes seconds
+        return cls(easyocr.Reader([lang_code], gpu=use_gpu))
+
+    def detect(self, image):
+        return self.reader.detect(image)
+
+    def recognize(self, image, horizontal_list=None, free_list=None, batch_size=1, decoder='greedy', detail=1, **kwargs):
+        return self.reader.recognize(image, horizontal_list=horizontal_list, free_list=free_list,
+                                     batch_size=batch_size, decoder=decoder, detail=detail, **kwargs)
+
+    def readtext(self, image, batch_size=1, decoder='greedy', detail=1, **kwargs):
+        return self.reader.readtext(image, batch_size=batch_size, decoder=decoder, detail=detail, **kwargs)
+
+class FakeOCREngine(OCREngine):
+    """
+    Deterministic stand-in for a real reader, for benchmarking and testing the rest of the
+    pipeline (filtering, merging, model updates, UI refresh) without models or a network.
+
+    Detection returns the scripted `boxes` (clipped to the image), or, if none are given, a
+    webtoon-like layout: a speech bubble of `lines_per_block` lines every `block_spacing` rows.
+    Recognized text and confidence are derived from the crop's pixels, so the same region
+    always reads the same, whichever code path cut it out.
+
+    :param boxes: Optional list of [x_min, x_max, y_min, y_max] to "detect" in every image.
+    :param detect_latency: Seconds slept per detect() call, per megapixel of input.
+    :param recognize_latency: Seconds slept per recognition batch of `batch_size` regions.
+    """
+    name = "fake"
+
+    def __init__(self, boxes=None, detect_latency=0.0, recognize_latency=0.0,
+                 block_spacing=800, lines_per_block=3, line_height=48):
+        self.boxes = boxes
+        self.detect_latency = detect_latency
+        self.recognize_latency = recognize_latency
+        self.block_spacing = block_spacing
+        self.lines_per_block = lines_per_block
+        self.line_height = line_height
+
+    def _layout(self, width, height):
+        boxes = []
+        line_step = self.line_height + self.line_height // 4
+        x_min, x_max = int(width * 0.3), int(width * 0.7)
+        for block_top in range(self.block_spacing // 4, height, self.block_spacing):
+            for line in range(self.lines_per_block):
+                y_min = block_top + line * line_step
+                if y_min + self.line_height > height: break
+                boxes.append([x_min, x_max, y_min, y_min + self.line_height])
+        return boxes
+
+    def detect(self, image):
+        height, width = image.shape[:2]
+        if self.detect_latency:
+            time.sleep(self.detect_latency * (width * height) / 1e6)
+        if self.boxes is None:
+            boxes = self._layout(width, height)
+        else:
+            boxes = []
+            for x_min, x_max, y_min, y_max in self.boxes:
+                x_min, x_max = max(0, x_min), min(width, x_max)
+                y_min, y_max = max(0, y_min), min(height, y_max)
+                if x_max > x_min and y_max > y_min:
+                    boxes.append([x_min, x_max, y_min, y_max])
+        return [boxes], [[]]
+
+    def recognize(self, image, horizontal_list=None, free_list=None, batch_size=1, decoder='greedy', detail=1, **kwargs):
+        height, width = image.shape[:2]
+        if horizontal_list is None and free_list is None:
+            horizontal_list = [[0, width, 0, height]]
+        regions = [[[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+                   for x_min, x_max, y_min, y_max in (horizontal_list or [])]
+        regions.extend(free_list or [])
+        if self.recognize_latency and regions:
+            time.sleep(self.recognize_latency * math.ceil(len(regions) / max(1, batch_size)))
+
+        results = []
+        for box in regions:
+            xs = [int(p[0]) for p in box]
+            ys = [int(p[1]) for p in box]
+            crop = np.ascontiguousarray(image[max(0, min(ys)):max(ys), max(0, min(xs)):max(xs)])
+            checksum = zlib.crc32(crop.tobytes())
+            text = f"Fake text {checksum % 100000:05d}"
+            confidence = 0.5 + (checksum % 500) / 1000.0
+            results.append((box, text, confidence))
+        return results
+
+def create_engine(engine_name, lang_code, use_gpu, **options):
+    """
+    Builds the named engine ('easyocr' or 'fake') for a language.
+
+    :param options: Extra keyword arguments for FakeOCREngine (latencies, scripted boxes...).
+    """
+    if engine_name == FakeOCREngine.name:
+        return FakeOCREngine(**options)
+    if engine_name != EasyOCREngine.name:
+        raise ValueError(f"Unknown OCR engine: {engine_name}")
+    return EasyOCREngine.create(lang_code, use_gpu)
+
+# --- END OF FILE ocr_engine.py ---
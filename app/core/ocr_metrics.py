@@ -0,0 +1,135 @@
+# --- START OF FILE ocr_metrics.py ---
+
+import json
+import time
+import platform
+
+# Pipeline stages in execution order. Cross-page runs charge each page its share of the batch's 'recognize'.
+STAGES = ('open', 'grayscale', 'contrast', 'resize', 'detect', 'recognize', 'scale', 'filter', 'merge')
+
+def new_page_metrics():
+    """
+    Returns an empty per-page metrics dict, filled in by the OCR pipeline:
+      - 'timings': seconds spent per stage (see STAGES); stages that did not run are absent.
+      - 'regions_detected': regions found on the page, before filtering.
+      - 'regions_pruned': detected regions dropped by the height filter before recognition.
+      - 'regions_escalated': regions re-read with beam search by the adaptive decoder.
+      - 'regions_kept': regions left after the height/confidence filters.
+      - 'blocks': merged text blocks.
+      - 'cache': 'final' or 'raw' on a cache hit, 'duplicate' for a page copied from an
+        identical earlier page (see OCRRunReport.add_duplicate_page), else 'miss'.
+    """
+    return {'timings': {}, 'regions_detected': 0, 'regions_pruned': 0, 'regions_escalated': 0, 'regions_kept': 0, 'blocks': 0, 'cache': 'miss'}
+
+class OCRRunReport:
+    """
+    Aggregates the per-page metrics of one batch OCR run and saves them as JSON next to the project.
+    """
+    def __init__(self, project_name, mode, settings):
+        self.project_name = project_name
+        self.mode = mode
+        self.settings = dict(settings)
+        self.pages = []
+        self.status = 'running'
+        self.started_at = time.time()
+        self.wall_time = 0.0
+
+    @staticmethod
+    def path_for_project(mmtl_path):
+        return f"{mmtl_path}.ocr-report.json"
+
+    def add_page(self, filename, page_metrics):
+        self.pages.append(dict(page_metrics or new_page_metrics(), filename=filename))
+
+    def add_duplicate_page(self, filename, source_filename, distance, blocks):
+        """Records a page whose results were copied from an earlier page that looks the same."""
+        self.pages.append(dict(new_page_metrics(), filename=filename, cache='duplicate', blocks=blocks,
+                               duplicate_of=source_filename, hash_distance=distance))
+
+    def duplicate_pages(self):
+        return [page for page in self.pages if page['cache'] == 'duplicate']
+
+    def finish(self, status):
+        """Marks the run as 'completed', 'stopped' or 'failed' and freezes its wall time."""
+        self.status = status
+        self.wall_time = time.time() - self.started_at
+
+    def stage_totals(self):
+        """Returns {stage: total seconds} over all pages, in STAGES order."""
+        totals = {}
+        for stage in STAGES:
+            total = sum(page['timings'].get(stage, 0.0) for page in self.pages)
+            if any(stage in page['timings'] for page in self.pages):
+                totals[stage] = total
+        return totals
+
+    def to_dict(self):
+        cache_hits = {}
+        for page in self.pages:
+            cache_hits[page['cache']] = cache_hits.get(page['cache'], 0) + 1
+        return {
+            'project': self.project_name,
+            'status': self.status,
+            'mode': self.mode,
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started_at)),
+            'wall_time': round(self.wall_time, 3),
+            'pages_processed': len(self.pages),
+            'pages_per_second': round(len(self.pages) / self.wall_time, 3) if self.wall_time > 0 else None,
+            'regions_detected': sum(page['regions_detected'] for page in self.pages),
+            'regions_pruned': sum(page.get('regions_pruned', 0) for page in self.pages),
+            'regions_escalated': sum(page.get('regions_escalated', 0) for page in self.pages),
+            'regions_kept': sum(page['regions_kept'] for page in self.pages),
+            'blocks': sum(page['blocks'] for page in self.pages),
+            'cache': cache_hits,
+            'duplicate_pages': [
+                {'filename': page['filename'], 'duplicate_of': page['duplicate_of'], 'hash_distance': page['hash_distance']}
+                for page in self.duplicate_pages()
+            ],
+            'stage_totals': {stage: round(seconds, 3) for stage, seconds in self.stage_totals().items()},
+            'platform': platform.platform(),
+            'settings': self.settings,
+            'pages': [
+                dict(page, timings={stage: round(seconds, 4) for stage, seconds in page['timings'].items()})
+                for page in self.pages
+            ],
+        }
+
+    def save(self, path):
+        """Writes the report as JSON. Returns True on success."""
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, indent=2, ensure_ascii=False, default=float)
+            print(f"OCR Report: Saved run report to {path}")
+            return True
+        except OSError as e:
+            print(f"OCR Report: Warning - Could not write {path}: {e}")
+            return False
+
+    def summary_text(self):
+        """Short human-readable summary for the finish dialog."""
+        lines = [f"{len(self.pages)} pages in {self.wall_time:.1f}s"
+                 + (f" ({len(self.pages) / self.wall_time:.2f} pages/s)" if self.wall_time > 0 else "")]
+        lines.append(f"Regions: {sum(p['regions_detected'] for p in self.pages)} detected, "
+                     f"{sum(p.get('regions_pruned', 0) for p in self.pages)} skipped by height, "
+                     f"{sum(p['regions_kept'] for p in self.pages)} kept, "
+                     f"{sum(p['blocks'] for p in self.pages)} text blocks")
+        escalated = sum(p.get('regions_escalated', 0) for p in self.pages)
+        if escalated:
+            lines.append(f"Beam search re-reads (adaptive decoder): {escalated} regions")
+        duplicates = self.duplicate_pages()
+        if duplicates:
+            lines.append(f"Duplicate pages copied: {len(duplicates)} ("
+                         + ", ".join(f"{p['filename']} = {p['duplicate_of']}" for p in duplicates[:5])
+                         + (", ..." if len(duplicates) > 5 else "") + ")")
+        cached = sum(1 for p in self.pages if p['cache'] not in ('miss', 'duplicate'))
+        if cached:
+            lines.append(f"Cache hits: {cached} pages")
+        totals = self.stage_totals()
+        stage_sum = sum(totals.values())
+        if stage_sum > 0:
+            top_stages = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:3]
+            lines.append("Slowest stages: " + ", ".join(
+                f"{stage} {seconds:.1f}s ({seconds / stage_sum:.0%})" for stage, seconds in top_stages))
+        return "\n".join(lines)
+
+# --- END OF FILE ocr_metrics.py ---
@@ -6,11 +6,587 @@ import numpy as np
 from PIL import Image, ImageEnhance # Added ImageEnhance
 import traceback
 import time
-from app.utils.data_processing import group_and_merge_text # Import merging function
+import math
+from collections import namedtuple
+from app.utils.data_processing import group_and_merge_text, remove_overlap_duplicates # Import merging functions
+from app.core.ocr_metrics import new_page_metrics
+from app.core.project_archive import open_project_file
+
+# A decoded, grayscale, contrast-adjusted and resized page, ready for the reader.
+# timings holds the seconds spent in each preprocessing stage ('open', 'grayscale', 'contrast', 'resize').
+PreprocessedImage = namedtuple('PreprocessedImage', ['image', 'original_width', 'original_height',
+                                                     'resized_width', 'resized_height', 'timings'])
+
+# Blank-band pre-pass (in preprocessed pixels): rows whose variance is at most BLANK_ROW_VARIANCE are
+# flat background; content is padded by BLANK_MARGIN and gaps shorter than BLANK_MIN_GAP are kept.
+BLANK_ROW_VARIANCE = 10.0
+BLANK_MIN_GAP = 48
+BLANK_MARGIN = 16
+
+# Decoder mode that reads every box greedily and re-reads only the doubtful ones with beam search.
+ADAPTIVE_DECODER = 'adaptive'
+# Adaptive decoding also re-reads boxes scoring less than this far above min_confidence.
+ESCALATION_MARGIN = 0.1
+
+def escalation_threshold(adaptive_threshold, min_confidence):
+    """Returns the confidence below which an adaptively decoded box is re-read with beam search."""
+    return max(adaptive_threshold, min_confidence + ESCALATION_MARGIN)
+
+def recognize_boxes(reader, image, horizontal_list, free_list, batch_size, decoder, escalate_below=0.0, **recognize_kwargs):
+    """
+    Runs reader.recognize() on the given boxes of an image.
+
+    With decoder 'adaptive', every box is read with the fast greedy decoder first and only the
+    boxes whose confidence is below `escalate_below` are read again, in one more call, with beam
+    search, whose reading replaces the greedy one. The reader returns each box's coordinates as
+    it was given (axis-aligned boxes clipped to the image), which is how the second pass finds them.
+
+    :return: (results, escalated): the list of (box, text, confidence) and the set of indices
+             into it of the boxes that were re-read with beam search.
+    """
+    if decoder != ADAPTIVE_DECODER:
+        results = reader.recognize(image, horizontal_list=horizontal_list, free_list=free_list,
+                                   batch_size=batch_size, decoder=decoder, detail=1, **recognize_kwargs)
+        return results, set()
+
+    results = reader.recognize(image, horizontal_list=horizontal_list, free_list=free_list,
+                               batch_size=batch_size, decoder='greedy', detail=1, **recognize_kwargs)
+    retry_horizontal, retry_free, retry_indices = [], [], {}
+    for index, (box, text, confidence) in enumerate(results):
+        if confidence >= escalate_below: continue
+        key = _box_key(box)
+        if key in retry_indices: continue
+        retry_indices[key] = index
+        xs, ys = [p[0] for p in box], [p[1] for p in box]
+        if len(box) == 4 and box[0][1] == box[1][1] and box[2][1] == box[3][1] and box[0][0] == box[3][0] and box[1][0] == box[2][0]:
+            retry_horizontal.append([min(xs), max(xs), min(ys), max(ys)])
+        else:
+            retry_free.append(box)
+    if not retry_indices:
+        return results, set()
+
+    results = list(results)
+    beam_results = reader.recognize(image, horizontal_list=retry_horizontal, free_list=retry_free,
+                                    batch_size=batch_size, decoder='beamsearch', detail=1, **recognize_kwargs)
+    for box, text, confidence in beam_results:
+        index = retry_indices.get(_box_key(box))
+        if index is not None:
+            results[index] = (results[index][0], text, confidence)
+    return results, set(retry_indices.values())
+
+def _box_key(box):
+    return tuple((int(round(p[0])), int(round(p[1]))) for p in box)
+
+def preprocess_image(image_path, adjust_contrast, resize_threshold):
+    """
+    Loads an image and prepares it for OCR: grayscale, optional contrast and width-based resize.
+
+    Pages wider than resize_threshold are not decoded at full size when avoidable: JPEGs are
+    decoded straight to a 1/2, 1/4 or 1/8 scale (PIL draft mode), other formats are block-reduced
+    by an integer factor right after decoding. Both stay at or above the target size, and a final
+    LANCZOS resize gives the exact target. The original dimensions are still the file's own.
+
+    :return: PreprocessedImage holding the PIL image, its original/resized dimensions and stage timings.
+    """
+    timings = {}
+    # --- 1. Load and Preprocess Image ---
+    stage_start = time.perf_counter()
+    with open_project_file(image_path) as image_file: # Project pages may be read from the .mmtl
+        img_pil = Image.open(image_file)
+        original_width, original_height = img_pil.size # From the header, before any reduced decoding
+
+        resized_width, resized_height = original_width, original_height
+        needs_resize = resize_threshold > 0 and original_width > resize_threshold
+        if needs_resize:
+            ratio = resize_threshold / original_width
+            resized_width, resized_height = resize_threshold, int(original_height * ratio)
+            if img_pil.format == 'JPEG':
+                # The decoder picks the largest DCT scaling that keeps the image >= the requested size
+                img_pil.draft('L', (resized_width, resized_height))
+        img_pil.load() # Decode now, so the time is attributed to 'open'
+    timings['open'] = time.perf_counter() - stage_start
+
+    # Convert to grayscale first
+    stage_start = time.perf_counter()
+    img_pil_processed = img_pil.convert('L')
+    timings['grayscale'] = time.perf_counter() - stage_start
+
+    # Block-average down by the remaining integer factor, so contrast and LANCZOS run on a smaller image
+    stage_start = time.perf_counter()
+    if needs_resize:
+        reduce_factor = img_pil_processed.width // resized_width
+        if reduce_factor >= 2:
+            img_pil_processed = img_pil_processed.reduce(reduce_factor)
+    reduce_duration = time.perf_counter() - stage_start
+
+    # Optional Contrast Adjustment (before potential resize)
+    stage_start = time.perf_counter()
+    if adjust_contrast > 0.0: # 0 means disabled or no effect
+        try:
+            # Use a value slightly different from 1.0 for noticeable effect
+            # Clamp adjustment factor if necessary, e.g., 0.5 to 2.0
+            factor = max(0.1, 1.0 + adjust_contrast) # Example adjustment
+            enhancer = ImageEnhance.Contrast(img_pil_processed)
+            img_pil_processed = enhancer.enhance(factor)
+            print(f"OCR Proc: Applied contrast factor: {factor:.2f}")
+        except Exception as enhance_err:
+            print(f"OCR Proc: Warning - Failed to apply contrast enhancement: {enhance_err}")
+            # Continue with the unenhanced image
+    timings['contrast'] = time.perf_counter() - stage_start
+
+    # --- 2. Resize Image (if needed) ---
+    stage_start = time.perf_counter()
+    if needs_resize:
+        print(f"OCR Proc: Resizing image {original_width}x{original_height} -> {resized_width}x{resized_height} "
+              f"(Threshold: {resize_threshold}px, decoded at {img_pil_processed.width}x{img_pil_processed.height})")
+        if img_pil_processed.size != (resized_width, resized_height):
+            # Use LANCZOS (previously ANTIALIAS) for better quality downsampling
+            img_pil_processed = img_pil_processed.resize((resized_width, resized_height), Image.Resampling.LANCZOS)
+    timings['resize'] = reduce_duration + time.perf_counter() - stage_start
+
+    return PreprocessedImage(img_pil_processed, original_width, original_height, resized_width, resized_height, timings)
+
+def ocr_cache_params(batch_size, decoder, adjust_contrast, resize_threshold, tile_height, tile_overlap,
+                     skip_blank_bands, min_text_height, max_text_height, min_confidence, distance_threshold,
+                     detect_resize_threshold=0, adaptive_threshold=0.5):
+    """
+    Returns the (raw_params, final_params) cache keys for a page OCRed with these settings.
+    See OCRResultCache for what each layer holds.
+    """
+    raw_params = {
+        'batch_size': batch_size, 'decoder': decoder, 'adjust_contrast': adjust_contrast,
+        'resize_threshold': resize_threshold, 'tile_height': tile_height, 'tile_overlap': tile_overlap,
+        'skip_blank_bands': skip_blank_bands, 'detect_resize_threshold': detect_resize_threshold,
+        # Pages are decoded at reduced scale before the final resize (see preprocess_image)
+        'reduced_decode': True,
+        # Boxes outside the height bounds are never recognized (see prune_boxes_by_height)
+        'min_text_height': min_text_height, 'max_text_height': max_text_height,
+    }
+    if decoder == ADAPTIVE_DECODER:
+        # Which boxes get the beam-search pass depends on the confidence filter too
+        raw_params['escalate_below'] = escalation_threshold(adaptive_threshold, min_confidence)
+    final_params = dict(raw_params, min_confidence=min_confidence, distance_threshold=distance_threshold)
+    return raw_params, final_params
+
+def filter_and_merge_results(scaled_results, min_text_height, max_text_height, min_confidence, distance_threshold,
+                             stop_check=None, progress_callback=None, metrics=None):
+    """
+    Applies the height/confidence filters to one page's page-space results and merges nearby regions.
+
+    :param metrics: Optional page metrics dict (see ocr_metrics.new_page_metrics) to record into.
+    :return: List of merged result dicts (without filename/row_number), or None if stopped.
+    """
+    is_stopped = stop_check or (lambda: False)
+    report_progress = progress_callback or (lambda progress: None)
+    metrics = metrics if metrics is not None else new_page_metrics()
+
+    # --- 5. Filter Results ---
+    stage_start = time.perf_counter()
+    filtered_results = []
+    num_scaled = len(scaled_results)
+    print(f"OCR Proc: Filtering {num_scaled} results (MinH={min_text_height}, MaxH={max_text_height}, MinConf={min_confidence:.2f})...")
+    for i, result in enumerate(scaled_results):
+        if is_stopped(): print("OCR Proc: Stop requested during filtering."); break
+        if not result.get('coordinates'): continue # Skip if coords somehow became invalid
+
+        try:
+            y_coords = [p[1] for p in result['coordinates']]
+            height = max(y_coords) - min(y_coords) if y_coords else 0
+        except (ValueError, IndexError, TypeError): height = 0
+
+        confidence = result['confidence']
+        text = result['text']
+
+        if (min_text_height <= height <= max_text_height and
+            confidence >= min_confidence):
+            filtered_results.append(result) # Keep the dictionary structure
+        # else: # Optional: Log excluded results if needed for debugging
+        #     print(f"OCR Proc: Excluded (H:{height:.0f}, C:{confidence:.2f}): '{text[:30]}...'")
+
+        # Update progress during filtering (from 50% to 75%)
+        if num_scaled > 0:
+            progress_percent = 50 + int((i + 1) / num_scaled * 25)
+            report_progress(progress_percent)
+
+    if is_stopped(): return None # Check again before merging
+    print(f"OCR Proc: Filtered down to {len(filtered_results)} results.")
+    metrics['timings']['filter'] = time.perf_counter() - stage_start
+    # Boxes pruned before recognition count as detected, so the totals match an unpruned run
+    metrics['regions_detected'] = num_scaled + metrics.get('regions_pruned', 0)
+    metrics['regions_kept'] = len(filtered_results)
+
+    # --- 6. Merge Results (Internal to this image) ---
+    stage_start = time.perf_counter()
+    if not filtered_results:
+         print("OCR Proc: No results remaining after filtering to merge.")
+         merged_results = []
+    else:
+         print(f"OCR Proc: Merging {len(filtered_results)} results (DistThr={distance_threshold})...")
+         # The merging function expects 'filename' key, add a placeholder
+         for res in filtered_results: res['filename'] = "placeholder"
+         merged_results = group_and_merge_text(
+             filtered_results,
+             distance_threshold=distance_threshold
+         )
+         # Remove the placeholder filename before emitting
+         for res in merged_results: res.pop('filename', None)
+         print(f"OCR Proc: Merged into {len(merged_results)} final blocks.")
+    metrics['timings']['merge'] = time.perf_counter() - stage_start
+    metrics['blocks'] = len(merged_results)
+
+    # Update progress after merging (from 75% to 100%)
+    report_progress(100)
+    return merged_results
+
+def run_ocr_pipeline(image_path, reader,
+                     # Filters
+                     min_text_height, max_text_height, min_confidence,
+                     # Merging
+                     distance_threshold,
+                     # EasyOCR Params
+                     batch_size, decoder, adjust_contrast, resize_threshold,
+                     # Tiling (0 disables)
+                     tile_height=0, tile_overlap=0,
+                     # Only read the non-blank horizontal spans of the page
+                     skip_blank_bands=False,
+                     # Max width of the image the detector sees (0 = detect on the recognition image)
+                     detect_resize_threshold=0,
+                     # Decoder 'adaptive': boxes below this confidence get a beam-search pass
+                     adaptive_threshold=0.5,
+                     # Pre-loaded page (e.g. from ImagePrefetcher); loaded here if None
+                     preprocessed=None,
+                     # Optional OCRResultCache
+                     cache=None,
+                     # Hooks
+                     stop_check=None, progress_callback=None,
+                     # Optional dict (see ocr_metrics.new_page_metrics) receiving stage timings and counts
+                     metrics=None):
+    """
+    Runs the full OCR pipeline (preprocess -> [blank-band pre-pass] -> detect [downscaled] -> prune -> recognize -> scale -> filter -> merge) on one image.
+    Has no Qt dependencies so it can run inside a QThread or a worker process alike.
+
+    :param reader: The OCR engine (see ocr_engine.OCREngine), e.g. EasyOCR or the fake benchmark engine.
+    :param preprocessed: Optional PreprocessedImage for image_path, produced ahead of time.
+    :param cache: Optional OCRResultCache; a 'final' hit skips everything, a 'raw' hit skips the reader.
+    :param stop_check: Optional callable returning True when processing should be aborted.
+    :param progress_callback: Optional callable receiving the image progress (0-100).
+    :return: List of merged result dicts (without filename/row_number), or None if stopped.
+    """
+    is_stopped = stop_check or (lambda: False)
+    report_progress = progress_callback or (lambda progress: None)
+    metrics = metrics if metrics is not None else new_page_metrics()
+
+    start_time_img = time.time()
+    print(f"OCR Proc: Starting image {image_path}")
+
+    scaled_results = None
+    if cache:
+        image_hash = cache.hash_image(image_path)
+        raw_params, final_params = ocr_cache_params(
+            batch_size, decoder, adjust_contrast, resize_threshold, tile_height, tile_overlap, skip_blank_bands,
+            min_text_height, max_text_height, min_confidence, distance_threshold, detect_resize_threshold,
+            adaptive_threshold
+        )
+        cached_final = cache.get(cache.FINAL, image_hash, final_params)
+        if cached_final is not None:
+            print(f"OCR Proc: Cache hit (final) for {image_path}: {len(cached_final)} blocks.")
+            metrics['cache'] = cache.FINAL
+            metrics['blocks'] = len(cached_final)
+            report_progress(100)
+            return cached_final
+        scaled_results = cache.get(cache.RAW, image_hash, raw_params)
+        if scaled_results is not None:
+            print(f"OCR Proc: Cache hit (raw) for {image_path}: {len(scaled_results)} regions, re-filtering only.")
+            metrics['cache'] = cache.RAW
+            report_progress(50)
+
+    if scaled_results is None:
+        scaled_results = _read_page_results(
+            image_path, reader, batch_size, decoder, adjust_contrast, resize_threshold,
+            tile_height, tile_overlap, skip_blank_bands, detect_resize_threshold, min_text_height, max_text_height,
+            min_confidence, adaptive_threshold, preprocessed, is_stopped, report_progress, metrics
+        )
+        if scaled_results is None: return None # Stopped
+        if cache:
+            cache.put(cache.RAW, image_hash, raw_params, scaled_results)
+
+    merged_results = filter_and_merge_results(
+        scaled_results, min_text_height, max_text_height, min_confidence, distance_threshold,
+        stop_check=is_stopped, progress_callback=report_progress, metrics=metrics
+    )
+    if merged_results is None: return None # Stopped
+
+    if cache:
+        cache.put(cache.FINAL, image_hash, final_params, merged_results)
+
+    img_duration = time.time() - start_time_img
+    print(f"OCR Proc: Finished image {image_path} in {img_duration:.2f}s")
+    return merged_results
+
+def _read_page_results(image_path, reader, batch_size, decoder, adjust_contrast, resize_threshold,
+                       tile_height, tile_overlap, skip_blank_bands, detect_resize_threshold, min_text_height, max_text_height,
+                       min_confidence, adaptive_threshold, preprocessed, is_stopped, report_progress, metrics):
+    """
+    Preprocesses the image (unless given), runs the reader and maps the results back to page space.
+    Detection may run on a further downscaled copy (detect_resize_threshold); recognition always
+    reads the preprocessed image. Detected boxes outside the text height bounds are dropped before recognition.
+    With decoder 'adaptive', only doubtful boxes are decoded with beam search (see recognize_boxes).
+
+    :return: List of unfiltered result dicts with integer page coordinates, or None if stopped.
+    """
+    if preprocessed is None:
+        preprocessed = preprocess_image(image_path, adjust_contrast, resize_threshold)
+    metrics['timings'].update(preprocessed.timings)
+    img_pil_processed = preprocessed.image
+    resized_height = preprocessed.resized_height
+
+    # Check for stop request before running OCR
+    if is_stopped():
+        print("OCR Proc: Stop requested before running reader."); return None
+
+    # Convert final processed image to numpy array
+    img_np = np.array(img_pil_processed)
+
+    # --- 3a. Find the parts of the page worth reading ---
+    spans, bands = plan_page_bands(img_np, skip_blank_bands, tile_height, tile_overlap)
+
+    # --- 3b. Detect, drop boxes the height filter would reject, recognize the rest ---
+    # Each content span is read on its own (and split into overlapping tiles if it is
+    # taller than tile_height). Every band gets its own index so tile overlap duplicates can be found later.
+    print(f"OCR Proc: Running reader detect/recognize (batch={batch_size}, decoder='{decoder}', bands={len(bands)})")
+    scale_y = preprocessed.original_height / resized_height if resized_height else 1.0
+    detect_scale = detection_scale(preprocessed.resized_width, detect_resize_threshold)
+    if detect_scale < 1.0:
+        print(f"OCR Proc: Detecting at {detect_scale:.2f}x ({detect_resize_threshold}px wide), recognizing at {preprocessed.resized_width}px wide.")
+    escalate_below = escalation_threshold(adaptive_threshold, min_confidence)
+    detect_duration = recognize_duration = 0.0
+    raw_results = []
+    for band_index, (top, bottom) in enumerate(bands):
+        if is_stopped():
+            print("OCR Proc: Stop requested while reading bands."); return None
+        # Row slices of the page array are views, so no band is copied
+        band_np = img_np if (top, bottom) == (0, resized_height) else img_np[top:bottom]
+        stage_start = time.perf_counter()
+        horizontal_list, free_list = detect_band(reader, band_np, detect_scale)
+        horizontal_list, free_list, pruned = prune_boxes_by_height(
+            horizontal_list, free_list, bottom - top, top, scale_y, min_text_height, max_text_height)
+        metrics['regions_pruned'] = metrics.get('regions_pruned', 0) + pruned
+        detect_duration += time.perf_counter() - stage_start
+
+        stage_start = time.perf_counter()
+        band_results = []
+        if horizontal_list or free_list:
+            band_results, escalated = recognize_boxes(reader, band_np, horizontal_list, free_list, batch_size, decoder,
+                                                      escalate_below=escalate_below)
+            metrics['regions_escalated'] = metrics.get('regions_escalated', 0) + len(escalated)
+        recognize_duration += time.perf_counter() - stage_start
+        if len(bands) > 1:
+            print(f"OCR Proc: Band {band_index} (y={top}-{bottom}) found {len(band_results)} regions ({pruned} pruned by height).")
+        for coord_float, text, confidence in band_results:
+            shifted = [[p[0], p[1] + top] for p in coord_float]
+            raw_results.append((shifted, text, confidence, band_index))
+    del img_np
+    metrics['timings']['detect'] = detect_duration
+    metrics['timings']['recognize'] = recognize_duration
+    print(f"OCR Proc: Recognized {len(raw_results)} regions in {recognize_duration:.2f}s "
+          f"(detection {detect_duration:.2f}s, {metrics.get('regions_pruned', 0)} boxes pruned by height).")
+    if decoder == ADAPTIVE_DECODER:
+        print(f"OCR Proc: Adaptive decoder re-read {metrics.get('regions_escalated', 0)} regions below "
+              f"confidence {escalate_below:.2f} with beam search.")
+
+    # Emit 50% progress after recognition completes (as it's the main work)
+    report_progress(50)
+
+    # Check for stop request after running OCR
+    if is_stopped():
+        print("OCR Proc: Stop requested after running reader."); return None
+
+    stage_start = time.perf_counter()
+    scaled_results = scale_to_page(raw_results, preprocessed, tiled=len(bands) > len(spans))
+    metrics['timings']['scale'] = time.perf_counter() - stage_start
+    return scaled_results
+
+def detection_scale(image_width, detect_resize_threshold):
+    """
+    Returns the factor (<= 1.0) by which an image of this width is shrunk for text detection.
+    0 for detect_resize_threshold means detection runs on the image as it is.
+    """
+    if detect_resize_threshold > 0 and image_width > detect_resize_threshold:
+        return detect_resize_threshold / image_width
+    return 1.0
+
+def detect_band(reader, band_np, detect_scale=1.0):
+    """
+    Runs the text detector on one band, on a copy shrunk by `detect_scale` if it is below 1.
+    The detector only needs the layout of the text, so it tolerates much smaller images than
+    the recognizer; the boxes it finds are mapped back to the band's own pixels (rounded
+    outwards) so the recognizer can read them at full resolution.
+
+    :param band_np: 2-D grayscale uint8 array.
+    :return: (horizontal_list, free_list) for this band, in band pixels.
+    """
+    if detect_scale >= 1.0:
+        horizontal_list, free_list = reader.detect(band_np)
+        # detect() returns one list per input image
+        return horizontal_list[0], free_list[0]
+
+    band_height, band_width = band_np.shape[:2]
+    small_width, small_height = max(1, round(band_width * detect_scale)), max(1, round(band_height * detect_scale))
+    small_np = np.array(Image.fromarray(band_np).resize((small_width, small_height), Image.Resampling.BILINEAR))
+    horizontal_list, free_list = reader.detect(small_np)
+    scale_x, scale_y = band_width / small_width, band_height / small_height
+    horizontal_list = [
+        [math.floor(x_min * scale_x), math.ceil(x_max * scale_x), math.floor(y_min * scale_y), math.ceil(y_max * scale_y)]
+        for x_min, x_max, y_min, y_max in horizontal_list[0]
+    ]
+    free_list = [[[p[0] * scale_x, p[1] * scale_y] for p in box] for box in free_list[0]]
+    return horizontal_list, free_list
+
+def prune_boxes_by_height(horizontal_list, free_list, band_height, top, scale_y, min_text_height, max_text_height):
+    """
+    Drops detected boxes that filter_and_merge_results() would reject for their height, before
+    the recognizer reads them (tiny noise boxes, huge SFX). The height is computed exactly as the
+    filter will see it: clipped to the band like the recognizer does, shifted by `top` and scaled
+    to page space with the same int() truncation as scale_to_page(). Confidence is not known yet,
+    so that filter still runs afterwards.
+
+    :param horizontal_list: Axis-aligned boxes [x_min, x_max, y_min, y_max] of one band.
+    :param free_list: Free-form 4-point boxes of one band.
+    :param band_height: Height of the detected band in preprocessed pixels.
+    :param top: Row of the band within the preprocessed page.
+    :param scale_y: original_height / resized_height of the page (1.0 if not resized).
+    :return: (kept_horizontal_list, kept_free_list, pruned_count)
+    """
+    def page_height(y_min, y_max):
+        return int((y_max + top) * scale_y) - int((y_min + top) * scale_y)
+
+    kept_horizontal = [box for box in horizontal_list
+                       if min_text_height <= page_height(max(0, box[2]), min(box[3], band_height)) <= max_text_height]
+    kept_free = [box for box in free_list
+                 if min_text_height <= page_height(min(p[1] for p in box), max(p[1] for p in box)) <= max_text_height]
+    pruned = len(horizontal_list) + len(free_list) - len(kept_horizontal) - len(kept_free)
+    return kept_horizontal, kept_free, pruned
+
+def scale_to_page(raw_results, preprocessed, tiled=False):
+    """
+    Maps reader output from the preprocessed image back to original page coordinates (as ints)
+    and drops the duplicates read twice in tile overlaps.
+
+    :param raw_results: List of (coordinates, text, confidence, tile_index) in preprocessed-image space.
+    :param tiled: True if the page was read in overlapping tiles (only used for logging).
+    :return: List of unfiltered result dicts with integer page coordinates.
+    """
+    original_width, original_height = preprocessed.original_width, preprocessed.original_height
+    resized_width, resized_height = preprocessed.resized_width, preprocessed.resized_height
+    was_resized = (resized_width, resized_height) != (original_width, original_height)
+
+    # --- 4. Scale Coordinates (if resized) ---
+    scaled_results = []
+    if was_resized:
+        print("OCR Proc: Scaling coordinates back...")
+        scale_x = original_width / resized_width
+        scale_y = original_height / resized_height
+        for coord_float, text, confidence, tile in raw_results:
+            # Ensure coordinates are valid lists/tuples before scaling
+            try:
+                scaled_int_coord = [
+                    [int(p[0] * scale_x), int(p[1] * scale_y)]
+                    for p in coord_float
+                ]
+                scaled_results.append({'coordinates': scaled_int_coord, 'text': text, 'confidence': confidence, 'tile': tile})
+            except (TypeError, IndexError) as scale_err:
+                print(f"OCR Proc: Warning - Skipping result due to coordinate scaling error ({scale_err}): Text='{text[:30]}...'")
+    else:
+        # Convert coords to int even if not scaled, ensure consistent format
+        for coord_float, text, confidence, tile in raw_results:
+            try:
+                int_coord = [ [int(p[0]), int(p[1])] for p in coord_float ]
+                scaled_results.append({'coordinates': int_coord, 'text': text, 'confidence': confidence, 'tile': tile})
+            except (TypeError, IndexError) as int_err:
+                 print(f"OCR Proc: Warning - Skipping result due to coordinate conversion error ({int_err}): Text='{text[:30]}...'")
+
+    # Drop the copies of lines that were read twice in a tile overlap zone
+    num_before_dedup = len(scaled_results)
+    scaled_results = remove_overlap_duplicates(scaled_results)
+    if tiled:
+        print(f"OCR Proc: Removed {num_before_dedup - len(scaled_results)} duplicate detections from tile overlaps.")
+
+    return scaled_results
+
+def plan_page_bands(img_np, skip_blank_bands, tile_height, tile_overlap):
+    """
+    Decides which horizontal bands of a preprocessed page the reader runs on.
+
+    :return: (spans, bands): the content spans (the whole page unless skip_blank_bands) and the
+             row ranges to read, where spans taller than tile_height are split into overlapping tiles.
+    """
+    page_height = img_np.shape[0]
+    spans = [(0, page_height)]
+    if skip_blank_bands:
+        spans = find_content_spans(img_np)
+        kept_height = sum(bottom - top for top, bottom in spans)
+        skipped_ratio = 1.0 - kept_height / page_height if page_height else 0.0
+        print(f"OCR Proc: Blank-band pre-pass kept {len(spans)} spans, skipped {skipped_ratio:.1%} of the page height.")
+    return spans, _plan_bands(spans, tile_height, tile_overlap)
+
+def find_content_spans(img_np, variance_threshold=BLANK_ROW_VARIANCE, min_gap=BLANK_MIN_GAP, margin=BLANK_MARGIN):
+    """
+    Finds the horizontal spans of a grayscale page that contain anything but flat background.
+
+    A row is blank if the variance of its pixels is at most `variance_threshold`. Content rows
+    are padded by `margin` and spans separated by less than `min_gap` blank rows are joined,
+    so the gaps between lines of one text block are never cut.
+
+    :param img_np: 2-D uint8 array (the preprocessed page).
+    :return: Sorted, non-overlapping list of (top, bottom) row ranges; empty for a blank page.
+    """
+    height = img_np.shape[0]
+    row_variance = np.empty(height, dtype=np.float32)
+    # Chunked so the float copy stays small even for very tall strips
+    for start in range(0, height, 1024):
+        chunk = img_np[start:start + 1024].astype(np.float32)
+        row_variance[start:start + chunk.shape[0]] = chunk.var(axis=1)
+
+    has_content = row_variance > variance_threshold
+    if not has_content.any():
+        return []
+    # Rising/falling edges of the content mask give [start, end) runs
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], has_content, [False])).astype(np.int8)))
+    spans = []
+    for start, end in zip(edges[0::2], edges[1::2]):
+        top, bottom = max(0, int(start) - margin), min(height, int(end) + margin)
+        if spans and top - spans[-1][1] < min_gap:
+            spans[-1][1] = max(spans[-1][1], bottom)
+        else:
+            spans.append([top, bottom])
+    return [(top, bottom) for top, bottom in spans]
+
+def _plan_bands(spans, tile_height, tile_overlap):
+    """
+    Splits every span taller than tile_height into overlapping tiles (tile_height <= 0 disables tiling),
+    so the reader's working memory is bounded by the tile size instead of the page height.
+
+    :return: List of (top, bottom) row ranges to read, in page order.
+    """
+    bands = []
+    # The overlap must leave the tiles advancing; it should exceed the tallest text line.
+    tile_overlap = max(0, min(tile_overlap, tile_height - 1))
+    step = tile_height - tile_overlap
+    for span_top, span_bottom in spans:
+        if tile_height <= 0 or span_bottom - span_top <= tile_height:
+            bands.append((span_top, span_bottom))
+            continue
+        top = span_top
+        while True:
+            bottom = min(top + tile_height, span_bottom)
+            bands.append((top, bottom))
+            if bottom >= span_bottom: break
+            top += step
+    return bands
 
 class OCRProcessor(QThread):
     ocr_progress = pyqtSignal(int)  # Progress for the current image (0-100)
-    ocr_finished = pyqtSignal(list)  # Results for the current image (list of dicts)
+    ocr_finished = pyqtSignal(list, dict)  # Results for the current image (list of dicts), page metrics
     error_occurred = pyqtSignal(str)
 
     def __init__(self, image_path, reader,
@@ -19,7 +595,19 @@ class OCRProcessor(QThread):
                  # Merging
                  distance_threshold, # <-- New: for merging
                  # EasyOCR Params
-                 batch_size, decoder, adjust_contrast, resize_threshold
+                 batch_size, decoder, adjust_contrast, resize_threshold,
+                 # Tiling
+                 tile_height=0, tile_overlap=0,
+                 # Blank-band pre-pass
+                 skip_blank_bands=False,
+                 # Detection at a smaller scale than recognition
+                 detect_resize_threshold=0,
+                 # Adaptive decoder escalation threshold
+                 adaptive_threshold=0.5,
+                 # Optional background loader shared by the whole batch
+                 prefetcher=None,
+                 # Optional OCRResultCache
+                 cache=None
                 ):
         super().__init__()
         self.image_path = image_path
@@ -35,157 +623,47 @@ class OCRProcessor(QThread):
         self.decoder = decoder
         self.adjust_contrast = adjust_contrast
         self.resize_threshold = resize_threshold
+        self.tile_height = tile_height
+        self.tile_overlap = tile_overlap
+        self.skip_blank_bands = skip_blank_bands
+        self.detect_resize_threshold = detect_resize_threshold
+        self.adaptive_threshold = adaptive_threshold
+        self.prefetcher = prefetcher
+        self.cache = cache
 
     def run(self):
         try:
-            start_time_img = time.time()
-            print(f"OCR Proc: Starting image {self.image_path}")
-            # --- 1. Load and Preprocess Image ---
-            img_pil = Image.open(self.image_path)
-            original_width, original_height = img_pil.size
-
-            # Convert to grayscale first
-            img_pil_processed = img_pil.convert('L')
-
-            # Optional Contrast Adjustment (before potential resize)
-            if self.adjust_contrast > 0.0: # 0 means disabled or no effect
-                try:
-                    # Use a value slightly different from 1.0 for noticeable effect
-                    # Clamp adjustment factor if necessary, e.g., 0.5 to 2.0
-                    factor = max(0.1, 1.0 + self.adjust_contrast) # Example adjustment
-                    enhancer = ImageEnhance.Contrast(img_pil_processed)
-                    img_pil_processed = enhancer.enhance(factor)
-                    print(f"OCR Proc: Applied contrast factor: {factor:.2f}")
-                except Exception as enhance_err:
-                    print(f"OCR Proc: Warning - Failed to apply contrast enhancement: {enhance_err}")
-                    # Continue with the unenhanced image
-
-
-            # --- 2. Resize Image (if needed) ---
-            resized_width, resized_height = original_width, original_height
-            was_resized = False
-            if self.resize_threshold > 0 and original_width > self.resize_threshold:
-                was_resized = True
-                max_width = self.resize_threshold
-                ratio = max_width / original_width
-                resized_height = int(original_height * ratio)
-                resized_width = max_width
-                print(f"OCR Proc: Resizing image {original_width}x{original_height} -> {resized_width}x{resized_height} (Threshold: {self.resize_threshold}px)")
-                # Use LANCZOS (previously ANTIALIAS) for better quality downsampling
-                img_pil_processed = img_pil_processed.resize((resized_width, resized_height), Image.Resampling.LANCZOS)
-
-            # Convert final processed image to numpy array
-            img_np = np.array(img_pil_processed)
-
-            # Check for stop request before running OCR
-            if self.stop_requested:
-                print("OCR Proc: Stop requested before running reader."); return
-
-            # --- 3. Run EasyOCR ---
-            print(f"OCR Proc: Running reader.readtext (batch={self.batch_size}, decoder='{self.decoder}')")
-            start_time_readtext = time.time()
-            # Note: adjust_contrast is handled *before* readtext now via PIL
-            raw_results = self.reader.readtext(
-                img_np,
-                batch_size=self.batch_size,
-                decoder=self.decoder,
-                detail=1 # Ensure coordinates, text, confidence
-                # Removed adjust_contrast from here
+            preprocessed = None
+            if self.prefetcher:
+                # Waits only if the loader has fallen behind the reader
+                preprocessed = self.prefetcher.get(self.image_path, stop_check=lambda: self.stop_requested)
+                if preprocessed is None:
+                    print("OCR Proc: Stop requested while waiting for prefetched image."); return
+
+            metrics = new_page_metrics()
+            merged_results = run_ocr_pipeline(
+                self.image_path, self.reader,
+                min_text_height=self.min_text_height, max_text_height=self.max_text_height,
+                min_confidence=self.min_confidence, distance_threshold=self.distance_threshold,
+                batch_size=self.batch_size, decoder=self.decoder,
+                adjust_contrast=self.adjust_contrast, resize_threshold=self.resize_threshold,
+                tile_height=self.tile_height, tile_overlap=self.tile_overlap,
+                skip_blank_bands=self.skip_blank_bands,
+                detect_resize_threshold=self.detect_resize_threshold,
+                adaptive_threshold=self.adaptive_threshold,
+                preprocessed=preprocessed, cache=self.cache,
+                stop_check=lambda: self.stop_requested,
+                progress_callback=self.ocr_progress.emit,
+                metrics=metrics
             )
-            readtext_duration = time.time() - start_time_readtext
-            print(f"OCR Proc: reader.readtext found {len(raw_results)} regions in {readtext_duration:.2f}s.")
-
-            # Emit 50% progress after readtext completes (as it's the main work)
-            self.ocr_progress.emit(50)
-
-            # Check for stop request after running OCR
-            if self.stop_requested:
-                print("OCR Proc: Stop requested after running reader."); return
-
-            # --- 4. Scale Coordinates (if resized) ---
-            scaled_results = []
-            if was_resized:
-                print("OCR Proc: Scaling coordinates back...")
-                scale_x = original_width / resized_width
-                scale_y = original_height / resized_height
-                for coord_float, text, confidence in raw_results:
-                    # Ensure coordinates are valid lists/tuples before scaling
-                    try:
-                        scaled_int_coord = [
-                            [int(p[0] * scale_x), int(p[1] * scale_y)]
-                            for p in coord_float
-                        ]
-                        scaled_results.append({'coordinates': scaled_int_coord, 'text': text, 'confidence': confidence})
-                    except (TypeError, IndexError) as scale_err:
-                        print(f"OCR Proc: Warning - Skipping result due to coordinate scaling error ({scale_err}): Text='{text[:30]}...'")
-            else:
-                # Convert coords to int even if not scaled, ensure consistent format
-                for coord_float, text, confidence in raw_results:
-                    try:
-                        int_coord = [ [int(p[0]), int(p[1])] for p in coord_float ]
-                        scaled_results.append({'coordinates': int_coord, 'text': text, 'confidence': confidence})
-                    except (TypeError, IndexError) as int_err:
-                         print(f"OCR Proc: Warning - Skipping result due to coordinate conversion error ({int_err}): Text='{text[:30]}...'")
-
-            # --- 5. Filter Results ---
-            filtered_results = []
-            num_scaled = len(scaled_results)
-            print(f"OCR Proc: Filtering {num_scaled} results (MinH={self.min_text_height}, MaxH={self.max_text_height}, MinConf={self.min_confidence:.2f})...")
-            for i, result in enumerate(scaled_results):
-                if self.stop_requested: print("OCR Proc: Stop requested during filtering."); break
-                if not result.get('coordinates'): continue # Skip if coords somehow became invalid
-
-                try:
-                    y_coords = [p[1] for p in result['coordinates']]
-                    height = max(y_coords) - min(y_coords) if y_coords else 0
-                except (ValueError, IndexError, TypeError): height = 0
-
-                confidence = result['confidence']
-                text = result['text']
-
-                if (self.min_text_height <= height <= self.max_text_height and
-                    confidence >= self.min_confidence):
-                    filtered_results.append(result) # Keep the dictionary structure
-                # else: # Optional: Log excluded results if needed for debugging
-                #     print(f"OCR Proc: Excluded (H:{height:.0f}, C:{confidence:.2f}): '{text[:30]}...'")
-
-                # Update progress during filtering (from 50% to 75%)
-                if num_scaled > 0:
-                    progress_percent = 50 + int((i + 1) / num_scaled * 25)
-                    self.ocr_progress.emit(progress_percent)
-
-            if self.stop_requested: return # Check again before merging
-            print(f"OCR Proc: Filtered down to {len(filtered_results)} results.")
-
-            # --- 6. Merge Results (Internal to this image) ---
-            if not filtered_results:
-                 print("OCR Proc: No results remaining after filtering to merge.")
-                 merged_results = []
-            else:
-                 print(f"OCR Proc: Merging {len(filtered_results)} results (DistThr={self.distance_threshold})...")
-                 # The merging function expects 'filename' key, add a placeholder
-                 for res in filtered_results: res['filename'] = "placeholder"
-                 merged_results = group_and_merge_text(
-                     filtered_results,
-                     distance_threshold=self.distance_threshold
-                 )
-                 # Remove the placeholder filename before emitting
-                 for res in merged_results: res.pop('filename', None)
-                 print(f"OCR Proc: Merged into {len(merged_results)} final blocks.")
-
-            # Update progress after merging (from 75% to 100%)
-            self.ocr_progress.emit(100)
 
             # Check for stop request one last time
-            if self.stop_requested:
+            if merged_results is None or self.stop_requested:
                 print("OCR Proc: Stop requested before emitting results."); return
 
             # --- 7. Emit Final Results ---
             print(f"OCR Proc: Emitting {len(merged_results)} processed results for {self.image_path}.")
-            self.ocr_finished.emit(merged_results) # Emit the list of merged result dicts
-
-            img_duration = time.time() - start_time_img
-            print(f"OCR Proc: Finished image {self.image_path} in {img_duration:.2f}s")
+            self.ocr_finished.emit(merged_results, metrics) # Emit the list of merged result dicts
 
         except Exception as e:
             print(f"!!! OCR Processor Error in image {self.image_path}: {str(e)} !!!")
@@ -193,4 +671,4 @@ class OCRProcessor(QThread):
             # Emit the error signal with details
             self.error_occurred.emit(f"Error processing {os.path.basename(self.image_path)}: {str(e)}")
 
-# --- END OF FILE ocr_processor.py ---
\ No newline at end of file
+# --- END OF FILE ocr_processor.py ---
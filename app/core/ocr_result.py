@@ -0,0 +1,145 @@
+# --- START OF FILE ocr_result.py ---
+
+import sys
+import math
+
+# Keys of the master.json dict layout that map onto OCRResult fields
+RESULT_FIELDS = ('row_number', 'filename', 'coordinates', 'text', 'confidence',
+                 'is_manual', 'is_deleted', 'translations', 'custom_style')
+# Fields that only count as present (for 'in', get() and [] ) while they are set
+OPTIONAL_FIELDS = ('translations', 'custom_style')
+
+def box_from_points(points):
+    """
+    Packs a list of [x, y] points into the integer box (x_min, y_min, x_max, y_max) covering them.
+    Returns None for an empty or missing list.
+    """
+    if not points:
+        return None
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return (math.floor(min(xs)), math.floor(min(ys)), math.ceil(max(xs)), math.ceil(max(ys)))
+
+class OCRResult:
+    """
+    One text block of a project: its page, row, box, text and edits.
+
+    Projects hold tens of thousands of these, so it is a slotted record instead of a dict.
+    The box is four packed integers instead of a list of point lists, the filename is
+    interned (all blocks of a page share one string), and 'translations', 'custom_style'
+    and 'extra' (unknown keys from master.json, kept for round trips) stay None until used.
+
+    master.json keeps the dict layout, see from_dict() and to_dict(). get(), [], 'in' and
+    del work on the same keys, for code that still handles results as dicts.
+    """
+    __slots__ = ('row_number', 'filename', 'box', 'text', 'confidence',
+                 'is_manual', 'is_deleted', 'translations', 'custom_style', 'extra')
+
+    def __init__(self, filename, row_number, box, text, confidence=0.0, is_manual=False, is_deleted=False,
+                 translations=None, custom_style=None, extra=None):
+        self.filename = sys.intern(filename) if isinstance(filename, str) else filename
+        self.row_number = row_number
+        self.box = tuple(int(v) for v in box) if box is not None else None
+        self.text = text
+        self.confidence = float(confidence)
+        self.is_manual = bool(is_manual)
+        self.is_deleted = bool(is_deleted)
+        self.translations = translations or None
+        self.custom_style = custom_style or None
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds a record from a result dict (master.json, OCR pipelines, checkpoints)."""
+        return cls(data.get('filename', ''), data.get('row_number'), box_from_points(data.get('coordinates')),
+                   data.get('text', ''), data.get('confidence', 0.0),
+                   is_manual=data.get('is_manual', False), is_deleted=data.get('is_deleted', False),
+                   translations=data.get('translations'), custom_style=data.get('custom_style'),
+                   extra={k: v for k, v in data.items() if k not in RESULT_FIELDS})
+
+    def to_dict(self):
+        """Returns the result in the master.json dict layout."""
+        data = {'row_number': self.row_number, 'filename': self.filename, 'coordinates': self.coordinates,
+                'text': self.text, 'confidence': self.confidence,
+                'is_manual': self.is_manual, 'is_deleted': self.is_deleted}
+        if self.translations:
+            data['translations'] = self.translations
+        if self.custom_style:
+            data['custom_style'] = self.custom_style
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @property
+    def coordinates(self):
+        """The box as the four corner points [[x, y], ...], clockwise from the top left."""
+        if self.box is None:
+            return []
+        x_min, y_min, x_max, y_max = self.box
+        return [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+
+    @coordinates.setter
+    def coordinates(self, points):
+        self.box = box_from_points(points)
+
+    def move(self, dx, dy):
+        """Shifts the box, e.g. when its page is stitched to or split from another."""
+        if self.box is not None:
+            x_min, y_min, x_max, y_max = self.box
+            self.box = (x_min + dx, y_min + dy, x_max + dx, y_max + dy)
+
+    def translation(self, profile_name):
+        """Returns the text edited in a profile, or None if the profile has none for this block."""
+        return self.translations.get(profile_name) if self.translations else None
+
+    def set_translation(self, profile_name, text):
+        if self.translations is None:
+            self.translations = {}
+        self.translations[profile_name] = text
+
+    def remove_translation(self, profile_name):
+        if self.translations:
+            self.translations.pop(profile_name, None)
+
+    # --- Dict compatibility ---
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __getitem__(self, key):
+        if key in RESULT_FIELDS:
+            value = getattr(self, key)
+            if value is None and key in OPTIONAL_FIELDS:
+                raise KeyError(key)
+            return value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in RESULT_FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in OPTIONAL_FIELDS and getattr(self, key) is not None:
+            setattr(self, key, None)
+        elif self.extra and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in RESULT_FIELDS:
+            return key not in OPTIONAL_FIELDS or getattr(self, key) is not None
+        return bool(self.extra) and key in self.extra
+
+    def __repr__(self):
+        return f"OCRResult({self.filename!r}, row={self.row_number!r}, box={self.box}, text={self.text!r})"
+
+# --- END OF FILE ocr_result.py ---
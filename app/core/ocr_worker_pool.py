@@ -0,0 +1,121 @@
+# --- START OF FILE ocr_worker_pool.py ---
+
+import os
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from PyQt5.QtCore import QThread, pyqtSignal
+from app.core.ocr_processor import run_ocr_pipeline
+from app.core.ocr_engine import create_engine
+from app.core.ocr_metrics import new_page_metrics
+from app.core.project_archive import ProjectArchive, registered_archives
+
+# Each worker process keeps its own warm reader for its whole lifetime.
+_worker_reader = None
+
+def default_torch_threads(num_workers):
+    """Splits the available CPU cores evenly between the worker processes."""
+    return max(1, (os.cpu_count() or 1) // max(1, num_workers))
+
+def _init_worker(lang_code, use_gpu, torch_threads, engine_name, archives):
+    """
+    Process initializer: sizes torch's thread pool and builds the reader once.
+    Also reopens the parent's project archives, so pages not extracted to disk can be read.
+    """
+    global _worker_reader
+    for mmtl_path, project_dir in archives:
+        ProjectArchive(mmtl_path, project_dir)
+    if engine_name == "easyocr":
+        import torch
+        torch.set_num_threads(torch_threads)
+    print(f"OCR Worker {os.getpid()}: Initializing {engine_name} reader (Lang='{lang_code}', GPU={use_gpu}, Threads={torch_threads})")
+    _worker_reader = create_engine(engine_name, lang_code, use_gpu)
+
+def _process_page(index, image_path, settings, cache):
+    """Runs the OCR pipeline for a single page inside a worker process."""
+    metrics = new_page_metrics()
+    results = run_ocr_pipeline(image_path, _worker_reader, cache=cache, metrics=metrics, **settings)
+    return index, results, metrics
+
+def iter_pool_results(image_paths, settings, num_workers, lang_code, use_gpu,
+                      torch_threads=0, stop_check=None, cache=None, engine_name="easyocr"):
+    """
+    Dispatches every page to a pool of worker processes and yields results as they complete.
+    Pages finish out of order; callers are responsible for committing them in page order.
+
+    :param stop_check: Optional callable returning True when the run should be aborted.
+    :param cache: Optional OCRResultCache shared by all workers through its directory.
+    :param engine_name: OCR engine each worker builds (see ocr_engine.create_engine).
+    :return: Generator of (index, results, page_metrics, error_message) tuples. Exactly one of
+             results / error_message is not None.
+    """
+    is_stopped = stop_check or (lambda: False)
+    torch_threads = torch_threads or default_torch_threads(num_workers)
+    # 'spawn' keeps torch and Qt state out of the children on every platform.
+    executor = ProcessPoolExecutor(
+        max_workers=num_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(lang_code, use_gpu, torch_threads, engine_name, registered_archives())
+    )
+    try:
+        pending = {
+            executor.submit(_process_page, index, image_path, settings, cache): index
+            for index, image_path in enumerate(image_paths)
+        }
+        while pending:
+            if is_stopped():
+                print("OCR Pool: Stop requested, cancelling queued pages.")
+                return
+            done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    _, results, metrics = future.result()
+                    yield index, results, metrics, None
+                except Exception as e:
+                    print(f"!!! OCR Pool Error in image {image_paths[index]}: {str(e)} !!!")
+                    traceback.print_exc()
+                    yield index, None, None, f"Error processing {os.path.basename(image_paths[index])}: {str(e)}"
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+class OCRPoolThread(QThread):
+    """
+    Drives iter_pool_results() off the GUI thread and forwards each finished page.
+    Mirrors OCRProcessor's interface (stop_requested, error_occurred).
+    """
+    page_finished = pyqtSignal(int, list, dict)  # (page index, merged results, page metrics)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, image_paths, settings, num_workers, lang_code, use_gpu, torch_threads=0, cache=None,
+                 engine_name="easyocr"):
+        super().__init__()
+        self.image_paths = image_paths
+        self.settings = settings
+        self.num_workers = num_workers
+        self.lang_code = lang_code
+        self.use_gpu = use_gpu
+        self.torch_threads = torch_threads
+        self.cache = cache
+        self.engine_name = engine_name
+        self.stop_requested = False
+
+    def run(self):
+        try:
+            print(f"OCR Pool: Dispatching {len(self.image_paths)} images to {self.num_workers} worker processes.")
+            for index, results, metrics, error in iter_pool_results(
+                    self.image_paths, self.settings, self.num_workers, self.lang_code, self.use_gpu,
+                    torch_threads=self.torch_threads, stop_check=lambda: self.stop_requested,
+                    cache=self.cache, engine_name=self.engine_name):
+                if error:
+                    self.error_occurred.emit(error)
+                    return
+                if results is not None:
+                    self.page_finished.emit(index, results, metrics)
+        except Exception as e:
+            print(f"!!! OCR Pool Error: {str(e)} !!!")
+            print(traceback.format_exc())
+            self.error_occurred.emit(f"OCR worker pool failed: {str(e)}")
+
+# --- END OF FILE ocr_worker_pool.py ---
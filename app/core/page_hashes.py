@@ -0,0 +1,159 @@
+# --- START OF FILE page_hashes.py ---
+
+import os
+import json
+import hashlib
+import numpy as np
+from PIL import Image
+from app.core.project_archive import open_project_file, project_file_size, list_project_dir
+
+# Stored inside the project (extraction temp dir), so it is saved into the .mmtl with everything else.
+PAGE_HASHES_FILE = 'page_hashes.json'
+# Side of the grayscale thumbnail each segment's DCT runs on, and of the low-frequency block kept from it.
+HASH_SAMPLE = 32
+HASH_SIZE = 8
+
+def _dct_matrix(n):
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    return np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+
+_DCT = _dct_matrix(HASH_SAMPLE)
+
+def perceptual_hash(image_path):
+    """
+    Computes a DCT perceptual hash (pHash) of a page.
+
+    Tall webtoon strips would lose all detail in a single 32x32 thumbnail, so the page is cut
+    into roughly square segments, top to bottom, and every segment gets its own 64-bit hash.
+
+    :return: Dict with 'size' ([width, height]) and 'hash' (list of 16-digit hex strings, one per segment).
+    """
+    with open_project_file(image_path) as image_file, Image.open(image_file) as img:
+        width, height = img.size
+        segments = max(1, round(height / width)) if width else 1
+        thumb_size = (HASH_SAMPLE, HASH_SAMPLE * segments)
+        if img.format == 'JPEG':
+            img.draft('L', thumb_size) # Decode at 1/8 scale when possible
+        thumb = img.convert('L').resize(thumb_size, Image.Resampling.BOX)
+    pixels = np.asarray(thumb, dtype=np.float64)
+
+    hashes = []
+    for segment in range(segments):
+        block = pixels[segment * HASH_SAMPLE:(segment + 1) * HASH_SAMPLE]
+        low = (_DCT @ block @ _DCT.T)[:HASH_SIZE, :HASH_SIZE].flatten()
+        bits = low > np.median(low[1:]) # The DC term says nothing about the layout
+        hashes.append(f"{int(''.join('1' if bit else '0' for bit in bits), 2):016x}")
+    return {'size': [width, height], 'hash': hashes}
+
+def pixel_digest(image_path):
+    """
+    Returns the SHA-256 of a page's decoded pixels (with its mode and size).
+
+    Unlike the perceptual hash, this tells apart pages that differ in a single word of dialogue.
+    It only matches pixel-identical pages: a lossless re-save (other metadata or PNG compression)
+    still matches, but any lossy re-encode, such as saving a JPEG again, changes the digest.
+    """
+    with open_project_file(image_path) as image_file, Image.open(image_file) as img:
+        sha = hashlib.sha256(f"{img.mode}:{img.size[0]}x{img.size[1]}:".encode('ascii'))
+        sha.update(img.tobytes())
+    return sha.hexdigest()
+
+def hash_distance(first, second):
+    """
+    Returns the largest Hamming distance between matching segments of two page hashes,
+    or None if the pages cannot be duplicates (different dimensions or segment counts).
+    """
+    if first['size'] != second['size'] or len(first['hash']) != len(second['hash']):
+        return None
+    return max(bin(int(a, 16) ^ int(b, 16)).count('1') for a, b in zip(first['hash'], second['hash']))
+
+def update_page_hashes(project_dir):
+    """
+    Loads the page hashes stored in an extracted project and computes those that are missing
+    or stale (the image's byte size changed). The file is rewritten only if anything changed.
+
+    :param project_dir: The project's extraction directory (holding 'images/').
+    :return: Dict {filename: {'bytes', 'size', 'hash'}} for every page image, whether it
+             is extracted or still only in the project archive.
+    """
+    hashes_path = os.path.join(project_dir, PAGE_HASHES_FILE)
+    image_dir = os.path.join(project_dir, 'images')
+    stored = {}
+    if os.path.exists(hashes_path):
+        try:
+            with open(hashes_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Page Hashes: Warning - Ignoring unreadable {hashes_path}: {e}")
+
+    page_hashes = {}
+    computed = 0
+    filenames = sorted(f for f in list_project_dir(image_dir) if f.lower().endswith(('png', 'jpg', 'jpeg'))) if os.path.isdir(image_dir) else []
+    for filename in filenames:
+        image_path = os.path.join(image_dir, filename)
+        byte_size = project_file_size(image_path)
+        entry = stored.get(filename)
+        if not entry or entry.get('bytes') != byte_size:
+            try:
+                entry = dict(perceptual_hash(image_path), bytes=byte_size)
+                computed += 1
+            except Exception as e:
+                print(f"Page Hashes: Warning - Could not hash {filename}: {e}")
+                continue
+        page_hashes[filename] = entry
+
+    if computed or set(stored) != set(page_hashes):
+        try:
+            with open(hashes_path, 'w', encoding='utf-8') as f:
+                json.dump(page_hashes, f, indent=2)
+        except OSError as e:
+            print(f"Page Hashes: Warning - Could not write {hashes_path}: {e}")
+    print(f"Page Hashes: {len(page_hashes)} pages indexed ({computed} newly hashed).")
+    return page_hashes
+
+def find_duplicate_pages(image_paths, page_hashes, max_distance):
+    """
+    Finds pages that are the same as an earlier page of the list.
+
+    The perceptual hash only picks candidates: at 64 bits per segment, pages that differ in a
+    short line of dialogue ("Hey!" / "No!") are a bit or two apart. A candidate counts as a
+    duplicate only if its decoded pixels are identical to the earlier page's (pixel_digest()),
+    which is computed just for the candidate pairs. Near-duplicates (e.g. a page re-encoded as
+    JPEG) are therefore OCRed like any other page.
+
+    :param image_paths: Page image paths in processing order.
+    :param page_hashes: Dict from update_page_hashes(), keyed by filename; pages without a hash are never duplicates.
+    :param max_distance: Largest per-segment Hamming distance (out of 64 bits) for a page to be checked.
+    :return: Dict {index: (source_index, distance)} where the source is the first matching page
+             that is not a duplicate itself.
+    """
+    filenames = [os.path.basename(path) for path in image_paths]
+    digests = {}
+
+    def digest(index):
+        if index not in digests:
+            try:
+                digests[index] = pixel_digest(image_paths[index])
+            except Exception as e:
+                print(f"Page Hashes: Warning - Could not read {filenames[index]}: {e}")
+                digests[index] = None
+        return digests[index]
+
+    duplicates = {}
+    sources = [] # Indices of hashed pages that will actually be OCRed
+    for index, filename in enumerate(filenames):
+        page_hash = page_hashes.get(filename)
+        if page_hash is None: continue
+        for source_index in sources:
+            distance = hash_distance(page_hashes[filenames[source_index]], page_hash)
+            if distance is None or distance > max_distance:
+                continue
+            if digest(index) is not None and digest(index) == digest(source_index):
+                duplicates[index] = (source_index, distance)
+                break
+        else:
+            sources.append(index)
+    return duplicates
+
+# --- END OF FILE page_hashes.py ---
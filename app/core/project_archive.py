@@ -0,0 +1,321 @@
+# --- START OF FILE project_archive.py ---
+
+import io
+import os
+import mmap
+import time
+import struct
+import zipfile
+import warnings
+import threading
+
+# Images are compressed already; deflating them again costs seconds per save and gains next to nothing.
+STORED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+# Archive members that stay in the .mmtl until they are read (see extract_project_metadata)
+LAZY_PREFIX = 'images/'
+# The archive is rewritten once superseded entries take up more than this share of it.
+COMPACT_RATIO = 0.5
+# Local file header: signature, then the name and extra field lengths at offset 26
+_LOCAL_HEADER = struct.Struct('<4s22xHH')
+_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+
+# Open archives of this process, keyed by normalized project directory
+_archives = {}
+_archives_lock = threading.Lock()
+
+def compression_for(name):
+    """Returns the zip compression for a project member: stored for images, deflated for everything else."""
+    return zipfile.ZIP_STORED if name.lower().endswith(STORED_EXTENSIONS) else zipfile.ZIP_DEFLATED
+
+def live_entries(zipf):
+    """
+    Maps every member name of an open archive to its newest entry.
+    Appending saves leave the older entries of a rewritten file behind; readers must ignore them.
+    """
+    entries = {}
+    for info in zipf.infolist():
+        entries[info.filename] = info
+    return entries
+
+def extract_project_metadata(mmtl_path, project_dir):
+    """
+    Prepares a project directory without unpacking the page images: extracts every other member
+    (master.json, meta.json, page_hashes.json, ...) and creates an empty 'images/' directory.
+    A ProjectArchive opened on the directory then serves the images from the .mmtl.
+    """
+    with zipfile.ZipFile(mmtl_path, 'r') as zipf:
+        for name, info in live_entries(zipf).items():
+            if not info.is_dir() and not name.startswith(LAZY_PREFIX):
+                zipf.extract(info, project_dir)
+    os.makedirs(os.path.join(project_dir, LAZY_PREFIX), exist_ok=True)
+
+def _dir_key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+def archive_for_path(path):
+    """Returns the open ProjectArchive whose project directory contains `path`, or None."""
+    key = _dir_key(path)
+    with _archives_lock:
+        for dir_key, archive in _archives.items():
+            if key == dir_key or key.startswith(dir_key + os.sep):
+                return archive
+    return None
+
+def registered_archives():
+    """Returns (mmtl_path, project_dir) of every archive open in this process, e.g. to reopen them in workers."""
+    with _archives_lock:
+        return [(archive.mmtl_path, archive.project_dir) for archive in _archives.values()]
+
+def open_project_file(path):
+    """
+    Opens a project file for binary reading. Files that were never extracted from the
+    project's .mmtl are read from the archive; everything else (and any path outside
+    an open project) from disk.
+    """
+    if not os.path.exists(path):
+        archive = archive_for_path(path)
+        if archive is not None:
+            return io.BytesIO(archive.read(archive.relative_path(path)))
+    return open(path, 'rb')
+
+def read_project_file(path):
+    """Returns the bytes of a project file, see open_project_file()."""
+    with open_project_file(path) as f:
+        return f.read()
+
+def project_file_size(path):
+    """Returns the byte size of a project file, see open_project_file()."""
+    if not os.path.exists(path):
+        archive = archive_for_path(path)
+        if archive is not None:
+            return archive.size(archive.relative_path(path))
+    return os.path.getsize(path)
+
+def list_project_dir(dir_path):
+    """Lists the files of a project directory, including those still only in the archive."""
+    archive = archive_for_path(dir_path)
+    if archive is not None:
+        return archive.list_dir(archive.relative_path(dir_path))
+    return [f for f in os.listdir(dir_path) if os.path.isfile(os.path.join(dir_path, f))]
+
+def remove_project_file(path):
+    """Deletes a project file, whether it is on disk or still only in the archive."""
+    archive = archive_for_path(path)
+    if archive is not None:
+        archive.remove(archive.relative_path(path))
+    elif os.path.exists(path):
+        os.remove(path)
+
+class ProjectArchive:
+    """
+    The storage of an open project: its .mmtl file and the directory the project works in.
+
+    Files in the directory are the current version of the project. Archive members that were
+    never extracted there (normally the page images, see extract_project_metadata) are read
+    from the archive on demand, through a memory map when they are stored uncompressed.
+    Pages written by split or stitch are the only images that end up on disk.
+
+    Saving tracks every file of the directory by (size, mtime) as of the last load or save,
+    and appends the changed ones to the archive, where the newest entry of a name wins.
+    The archive is compacted (rewritten into a temporary file that then replaces it) when files
+    were deleted, when superseded entries take up more than COMPACT_RATIO of it, or when it
+    is saved under a new path.
+
+    Creating an instance registers it for its directory, so the module functions
+    (open_project_file() etc.) find it; close() releases the archive.
+    """
+    def __init__(self, mmtl_path, project_dir):
+        self.mmtl_path = mmtl_path
+        self.project_dir = project_dir
+        self._lock = threading.RLock()
+        self._entries = {} # Member name -> ZipInfo of its newest entry
+        self._removed = set() # Members deleted from the project since the last save
+        self._file = None
+        self._mmap = None
+        self._saved = {} # Relative path -> (size, mtime_ns) of the version in the archive
+        self._needs_compact = False
+        try:
+            self._index()
+        except (OSError, zipfile.BadZipFile) as e:
+            print(f"Project Archive: Warning - Could not index {mmtl_path}, the next save rewrites it: {e}")
+            self._needs_compact = True
+        for rel_path, stat in self._scan().items():
+            info = self._entries.get(rel_path)
+            # Files changed since extraction (e.g. a refreshed page_hashes.json) stay dirty
+            if info is not None and info.file_size == stat[0]:
+                self._saved[rel_path] = stat
+        with _archives_lock:
+            _archives[_dir_key(project_dir)] = self
+
+    def _index(self):
+        with zipfile.ZipFile(self.mmtl_path, 'r') as zipf:
+            self._entries = {name: info for name, info in live_entries(zipf).items() if not info.is_dir()}
+
+    def close(self):
+        """Closes the memory map and unregisters the archive. Call before deleting the project directory."""
+        with self._lock:
+            self._close_map()
+        with _archives_lock:
+            if _archives.get(_dir_key(self.project_dir)) is self:
+                del _archives[_dir_key(self.project_dir)]
+
+    def _open_map(self):
+        self._file = open(self.mmtl_path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _close_map(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def relative_path(self, path):
+        return os.path.relpath(path, self.project_dir).replace(os.sep, '/')
+
+    # --- Reading ---
+    def _archived(self, rel_path):
+        """Returns the ZipInfo to read `rel_path` from, or None if the file is on disk or does not exist."""
+        if os.path.exists(os.path.join(self.project_dir, rel_path)) or rel_path in self._removed:
+            return None
+        return self._entries.get(rel_path)
+
+    def read(self, rel_path):
+        """Returns the bytes of a project file, from disk or else from the archive."""
+        with self._lock:
+            info = self._archived(rel_path)
+            if info is not None:
+                return self._read_member(info)
+        with open(os.path.join(self.project_dir, rel_path), 'rb') as f:
+            return f.read()
+
+    def size(self, rel_path):
+        with self._lock:
+            info = self._archived(rel_path)
+            if info is not None:
+                return info.file_size
+        return os.path.getsize(os.path.join(self.project_dir, rel_path))
+
+    def list_dir(self, rel_dir):
+        """Returns the sorted names of the files in one directory of the project, extracted or not."""
+        prefix = rel_dir.strip('/') + '/'
+        with self._lock:
+            names = {name[len(prefix):] for name in self._entries
+                     if name.startswith(prefix) and name not in self._removed}
+        disk_dir = os.path.join(self.project_dir, rel_dir)
+        if os.path.isdir(disk_dir):
+            names.update(f for f in os.listdir(disk_dir) if os.path.isfile(os.path.join(disk_dir, f)))
+        return sorted(name for name in names if '/' not in name)
+
+    def _read_member(self, info):
+        """Reads an archive member; stored members are sliced out of a memory map of the archive."""
+        if info.compress_type != zipfile.ZIP_STORED:
+            with zipfile.ZipFile(self.mmtl_path, 'r') as zipf:
+                return zipf.read(info)
+        if self._mmap is None:
+            self._open_map()
+        header_end = info.header_offset + _LOCAL_HEADER.size
+        signature, name_length, extra_length = _LOCAL_HEADER.unpack(self._mmap[info.header_offset:header_end])
+        if signature != _LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile(f"Bad local header for {info.filename} in {self.mmtl_path}")
+        data_start = header_end + name_length + extra_length
+        return self._mmap[data_start:data_start + info.file_size]
+
+    # --- Changes ---
+    def remove(self, rel_path):
+        """Deletes a project file from the directory and, at the next save, from the archive."""
+        full_path = os.path.join(self.project_dir, rel_path)
+        if os.path.exists(full_path):
+            os.remove(full_path)
+        with self._lock:
+            if rel_path in self._entries:
+                self._removed.add(rel_path)
+
+    def _scan(self):
+        """Returns {relative path: (size, mtime_ns)} for every file of the project directory."""
+        files = {}
+        for root, _, names in os.walk(self.project_dir):
+            for name in names:
+                full_path = os.path.join(root, name)
+                stat = os.stat(full_path)
+                files[self.relative_path(full_path)] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def save(self, mmtl_path=None):
+        """
+        Writes the changes of the project into the archive.
+
+        :param mmtl_path: Save to this path instead; the whole archive is written there.
+        """
+        with self._lock:
+            start_time = time.perf_counter()
+            target_path = mmtl_path or self.mmtl_path
+            files = self._scan()
+            dirty = sorted(rel_path for rel_path, stat in files.items() if self._saved.get(rel_path) != stat)
+            removed = [rel_path for rel_path in self._saved if rel_path not in files]
+            removed += [rel_path for rel_path in self._removed if rel_path not in files]
+
+            if self._needs_compact or removed or target_path != self.mmtl_path or not os.path.exists(target_path):
+                self._compact(files, target_path, start_time)
+                return
+            if not dirty:
+                print("Project Archive: Nothing changed.")
+                return
+
+            # zipfile truncates the file when an appending ZipFile closes, which fails on Windows
+            # while a mapping of it is open; the map is made again after the append.
+            was_mapped = self._mmap is not None
+            self._close_map()
+            with warnings.catch_warnings():
+                # Rewriting a member adds a second entry of the same name, which is the point here
+                warnings.filterwarnings('ignore', message='Duplicate name', category=UserWarning)
+                with zipfile.ZipFile(self.mmtl_path, 'a') as zipf:
+                    for rel_path in dirty:
+                        zipf.write(os.path.join(self.project_dir, rel_path), rel_path, compress_type=compression_for(rel_path))
+                    live_bytes = sum(info.compress_size for info in live_entries(zipf).values())
+            for rel_path in dirty:
+                self._saved[rel_path] = files[rel_path]
+            self._index()
+            if was_mapped:
+                self._open_map()
+
+            archive_size = os.path.getsize(self.mmtl_path)
+            if archive_size and 1 - live_bytes / archive_size > COMPACT_RATIO:
+                self._compact(files, self.mmtl_path, start_time)
+                return
+            written = sum(files[rel_path][0] for rel_path in dirty)
+            print(f"Project Archive: Appended {len(dirty)} changed file(s) ({written / 1e6:.1f} MB) "
+                  f"in {time.perf_counter() - start_time:.2f}s.")
+
+    def _compact(self, files, target_path, start_time):
+        """
+        Writes a new archive at target_path holding the project directory plus the members that
+        were never extracted, without superseded or deleted entries.
+        """
+        archived = {rel_path: info for rel_path, info in self._entries.items()
+                    if rel_path not in files and rel_path not in self._removed}
+        tmp_path = target_path + '.tmp'
+        try:
+            with zipfile.ZipFile(tmp_path, 'w') as zipf:
+                for rel_path in sorted(set(files) | set(archived)):
+                    if rel_path in files:
+                        zipf.write(os.path.join(self.project_dir, rel_path), rel_path, compress_type=compression_for(rel_path))
+                    else:
+                        member = zipfile.ZipInfo(rel_path, date_time=archived[rel_path].date_time)
+                        zipf.writestr(member, self._read_member(archived[rel_path]), compress_type=compression_for(rel_path))
+            self._close_map() # The old archive may be the one being replaced
+            os.replace(tmp_path, target_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.mmtl_path = target_path
+        self._index()
+        self._saved = files
+        self._removed = set()
+        self._needs_compact = False
+        print(f"Project Archive: Rewrote {len(files) + len(archived)} file(s) ({os.path.getsize(target_path) / 1e6:.1f} MB) "
+              f"in {time.perf_counter() - start_time:.2f}s.")
+
+# --- END OF FILE project_archive.py ---
@@ -1,5 +1,9 @@
-import os, json, traceback, zipfile, math, sys
+import os, json, traceback, math, sys
 from PyQt5.QtCore import QObject, pyqtSignal
+from app.core.page_hashes import update_page_hashes
+from app.core.result_store import ResultStore
+from app.core.ocr_result import OCRResult
+from app.core.project_archive import ProjectArchive
 
 class ProjectModel(QObject):
     """
@@ -25,15 +29,34 @@ class ProjectModel(QObject):
 
     def _initialize_state(self):
         """Resets all project data to its default, empty state."""
+        if getattr(self, 'archive', None) is not None:
+            self.archive.close()
         self.mmtl_path: str = ""
         self.temp_dir: str = ""
         self.project_name: str = ""
         self.image_paths: list[str] = []
-        self.ocr_results: list[dict] = []
+        # OCRResult records, ordered by (filename, row number) and indexed by row number; see ResultStore
+        self._results = ResultStore()
         self.profiles: dict = {"Original": {}}
         self.original_language: str = "Korean"
         self.active_profile_name: str = "Original"
         self.next_global_row_number: int = 0
+        # Serves the page images from the .mmtl and writes changes of temp_dir back to it
+        self.archive: ProjectArchive | None = None
+
+    @property
+    def ocr_results(self) -> ResultStore:
+        """All OCR results, iterable like a list in (filename, row number) order."""
+        return self._results
+
+    @ocr_results.setter
+    def ocr_results(self, results):
+        self._results.reset(self._as_records(results))
+
+    @staticmethod
+    def _as_records(results):
+        """Converts result dicts (OCR pipelines, checkpoints, master.json) to OCRResult records."""
+        return [res if isinstance(res, OCRResult) else OCRResult.from_dict(res) for res in results]
 
     def load_project(self, mmtl_path: str, temp_dir: str):
         """
@@ -46,14 +69,15 @@ class ProjectModel(QObject):
             self.temp_dir = temp_dir
             self.project_name = os.path.splitext(os.path.basename(mmtl_path))[0]
 
-            # 1. Load image paths
+            # 1. Load image paths (the images themselves may still be in the archive only)
+            self.archive = ProjectArchive(mmtl_path, temp_dir)
             image_dir = os.path.join(temp_dir, 'images')
             if not os.path.exists(image_dir):
                 raise FileNotFoundError("The 'images' directory is missing in the project file.")
             
             self.image_paths = sorted([
                 os.path.join(image_dir, f)
-                for f in os.listdir(image_dir)
+                for f in self.archive.list_dir('images')
                 if f.lower().endswith(('png', 'jpg', 'jpeg'))
             ])
             
@@ -87,7 +111,7 @@ class ProjectModel(QObject):
         with open(path, 'r', encoding='utf-8') as f:
             loaded_data = json.load(f)
 
-        self.ocr_results = []
+        loaded_results = []
         for res in loaded_data:
             if all(k in res for k in ['row_number', 'filename', 'coordinates', 'text']):
                  if 'row_number' in res:
@@ -95,7 +119,8 @@ class ProjectModel(QObject):
                  if 'translations' in res and isinstance(res['translations'], dict):
                      for profile_name in res['translations']:
                          loaded_profiles.add(profile_name)
-                 self.ocr_results.append(res)
+                 loaded_results.append(res)
+        self.ocr_results = loaded_results
         
         self.next_global_row_number = max_row_num + 1
         self.profiles = {name: {} for name in loaded_profiles}
@@ -123,9 +148,8 @@ class ProjectModel(QObject):
         try:
             # Save master JSON file
             master_path = os.path.join(self.temp_dir, 'master.json')
-            self._sort_ocr_results()
             with open(master_path, 'w', encoding='utf-8') as f:
-                json.dump(self.ocr_results, f, indent=2, ensure_ascii=False)
+                json.dump([res.to_dict() for res in self.ocr_results], f, indent=2, ensure_ascii=False)
 
             # Save metadata
             meta_path = os.path.join(self.temp_dir, 'meta.json')
@@ -136,13 +160,10 @@ class ProjectModel(QObject):
             with open(meta_path, 'w', encoding='utf-8') as f:
                 json.dump(meta_data, f, indent=2, ensure_ascii=False)
 
-            # Create the final zip archive
-            with zipfile.ZipFile(self.mmtl_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for root, _, files in os.walk(self.temp_dir):
-                    for file in files:
-                        full_path = os.path.join(root, file)
-                        rel_path = os.path.relpath(full_path, self.temp_dir).replace(os.sep, '/')
-                        zipf.write(full_path, rel_path)
+            # Write what changed into the archive (images stay stored, unchanged files are not rewritten)
+            if self.archive is None:
+                self.archive = ProjectArchive(self.mmtl_path, self.temp_dir)
+            self.archive.save(self.mmtl_path)
             
             return f"Project saved successfully to\n{self.mmtl_path}"
 
@@ -151,72 +172,120 @@ class ProjectModel(QObject):
              traceback.print_exc()
              return f"Failed to save project: {e}"
 
-    def _find_result_by_row_number(self, row_number_to_find):
-        """Internal helper to find an OCR result and its index by its row number."""
+    def page_hashes(self):
+        """
+        Returns the perceptual hash of every page image (see page_hashes.update_page_hashes), keyed by filename.
+        Only needed for duplicate page detection, so nothing is hashed when a project is opened. The hashes
+        are stored in the project and only new or changed pages are decoded, but the first call on a
+        large project reads every page: call it off the GUI thread.
+        """
+        if not self.temp_dir:
+            return {}
+        try:
+            return update_page_hashes(self.temp_dir)
+        except Exception as e:
+            print(f"Warning: Could not index page hashes: {e}")
+            return {}
+
+    def find_result(self, row_number):
+        """Returns the OCR result with this row number (deleted ones included), or None."""
+        return self._results.find(row_number)
+
+    def results_for_file(self, filename):
+        """Returns the OCR results of one image, in row order."""
+        return self._results.for_file(filename)
+
+    @staticmethod
+    def result_sort_key(item):
+        """Sort key of the results list: filename, then row number."""
         try:
-            target_rn_float = float(row_number_to_find)
+            row_num = float(item.row_number)
         except (ValueError, TypeError):
-            return None, -1
-        for index, result in enumerate(self.ocr_results):
-            try:
-                current_rn_float = float(result.get('row_number', float('nan')))
-                if not math.isnan(current_rn_float) and math.isclose(current_rn_float, target_rn_float):
-                    return result, index
-            except (ValueError, TypeError):
-                continue
-        return None, -1
+            row_num = float('inf')
+        return (item.filename, row_num)
 
     def _sort_ocr_results(self):
-        """Sorts OCR results primarily by filename, then by row number."""
+        """
+        Re-sorts and re-indexes the results by filename, then row number. Only needed after
+        results were renamed or renumbered in place (e.g. by the stitch/split handlers);
+        the model's own methods keep the order as they go.
+        """
         try:
-            def sort_key(item):
-                try:
-                    row_num = float(item.get('row_number', float('inf')))
-                except (ValueError, TypeError):
-                    row_num = float('inf')
-                return (item.get('filename', ''), row_num)
-            self.ocr_results.sort(key=sort_key)
+            self._results.reindex()
         except Exception as e:
             print(f"Error during sorting OCR results: {e}. Check row_number values.")
             traceback.print_exc(file=sys.stdout)
 
-    def get_display_text(self, result: dict) -> str:
+    def get_display_text(self, result: OCRResult) -> str:
         """Gets the text to display for a result based on the active profile."""
         if self.active_profile_name != "Original":
-            edited_text = result.get('translations', {}).get(self.active_profile_name)
+            edited_text = result.translation(self.active_profile_name)
             if edited_text is not None:
                 return edited_text
-        return result.get('text', '')
+        return result.text
         
     def clear_standard_results(self):
         """Removes all non-manual OCR results before a new run."""
-        results_to_keep = [res for res in self.ocr_results if res.get('is_manual', False)]
-        self.ocr_results = results_to_keep
+        self._results.remove_where(lambda res: not res.is_manual)
         
         max_existing_base = -1
-        if results_to_keep:
-            for res in results_to_keep:
-                try: max_existing_base = max(max_existing_base, math.floor(float(res.get('row_number', -1))))
+        if self._results:
+            for res in self._results:
+                try: max_existing_base = max(max_existing_base, math.floor(float(res.row_number)))
                 except: pass
         self.next_global_row_number = max_existing_base + 1
         print(f"Standard OCR results cleared. Next global row number will start from: {self.next_global_row_number}")
 
 
+    def remove_standard_results(self, filename):
+        """
+        Drops the non-manual results of one page, e.g. when it is OCRed again.
+        The other pages and the page's manual results are left as they are.
+
+        :return: Sorted row numbers of the removed results, free for the page's new results.
+        """
+        removed = self._results.remove_from_file(filename, lambda res: not res.is_manual)
+        removed_rows = [res.row_number for res in removed]
+        if removed_rows:
+            self.model_updated.emit([filename])
+        return sorted(row for row in removed_rows if row is not None)
+
     def add_new_ocr_results(self, new_results: list[dict]):
         """Adds results from a completed OCR process to the model."""
         if not new_results:
             return
         
-        self.ocr_results.extend(new_results)
-        self._sort_ocr_results()
+        # Inserted in place; only the buckets of the new results' pages are touched
+        new_records = self._as_records(new_results)
+        self._results.add(new_records)
         
-        affected_filename = new_results[0].get('filename')
+        affected_filename = new_records[0].filename
         self.model_updated.emit([affected_filename] if affected_filename else [])
 
+    def add_manual_ocr_results(self, new_results: list[dict]):
+        """Adds manually OCR'd blocks (already numbered, is_manual=True) and refreshes their pages."""
+        if not new_results:
+            return
+        new_records = self._as_records(new_results)
+        self._results.add(new_records)
+        self.model_updated.emit(sorted({res.filename for res in new_records if res.filename}))
+
+    def restore_checkpoint_results(self, checkpoint_results: list[dict], next_global_row_number: int):
+        """
+        Replaces the standard results with those of an interrupted OCR run so it can be resumed.
+        Manual results are kept, as they are during a normal run.
+        """
+        known_filenames = {os.path.basename(p) for p in self.image_paths}
+        manual_results = [res for res in self._results if res.is_manual]
+        self.ocr_results = manual_results + [res for res in checkpoint_results if res.get('filename') in known_filenames]
+        self.next_global_row_number = next_global_row_number
+        print(f"Restored {len(self.ocr_results)} results from checkpoint. Next global row number: {next_global_row_number}")
+        self.model_updated.emit([])
+
     def update_text(self, row_number, new_text: str):
         """Updates the text for a given row in the active profile."""
-        target_result, _ = self._find_result_by_row_number(row_number)
-        if not target_result or target_result.get('is_deleted', False):
+        target_result = self.find_result(row_number)
+        if not target_result or target_result.is_deleted:
             return "Result not found or is deleted.", False
 
         # If user is editing while in "Original", create a new profile.
@@ -227,35 +296,30 @@ class ProjectModel(QObject):
                 self.profiles_updated.emit() # Signal that the profile list has changed
                 # The view will handle showing the message.
 
-        if 'translations' not in target_result:
-            target_result['translations'] = {}
-
-        original_text = target_result.get('text', '')
-        if new_text == original_text:
-            if self.active_profile_name in target_result['translations']:
-                del target_result['translations'][self.active_profile_name]
+        if new_text == target_result.text:
+            target_result.remove_translation(self.active_profile_name)
         else:
-            target_result['translations'][self.active_profile_name] = new_text
+            target_result.set_translation(self.active_profile_name, new_text)
 
-        self.model_updated.emit([target_result.get('filename')])
+        self.model_updated.emit([target_result.filename])
         return None, True
 
     def delete_row(self, row_number_to_delete):
         """Marks a row as deleted."""
-        target_result, target_index = self._find_result_by_row_number(row_number_to_delete)
-        if target_index == -1 or target_result.get('is_deleted', False):
+        target_result = self.find_result(row_number_to_delete)
+        if target_result is None or target_result.is_deleted:
             return
 
-        self.ocr_results[target_index]['is_deleted'] = True
+        target_result.is_deleted = True
         print(f"Marked row {row_number_to_delete} as deleted in model.")
         
-        affected_filename = target_result.get('filename')
+        affected_filename = target_result.filename
         self.model_updated.emit([affected_filename] if affected_filename else [])
 
     def combine_rows(self, first_row_number, combined_text, min_confidence, rows_to_delete):
         """Combines multiple rows into a single entry."""
-        first_result, first_result_index = self._find_result_by_row_number(first_row_number)
-        if first_result_index == -1:
+        first_result = self.find_result(first_row_number)
+        if first_result is None:
             return "Could not find first row to update in data model.", False
         
         if self.active_profile_name == "Original":
@@ -265,18 +329,16 @@ class ProjectModel(QObject):
                 self.profiles_updated.emit()
 
         # Update confidence on the original record, but store combined text in the profile
-        self.ocr_results[first_result_index]['confidence'] = min_confidence
-        if 'translations' not in self.ocr_results[first_result_index]:
-            self.ocr_results[first_result_index]['translations'] = {}
-        self.ocr_results[first_result_index]['translations'][self.active_profile_name] = combined_text
+        first_result.confidence = float(min_confidence)
+        first_result.set_translation(self.active_profile_name, combined_text)
 
-        affected_filenames = {self.ocr_results[first_result_index].get('filename')}
+        affected_filenames = {first_result.filename}
         
         for rn_to_delete in rows_to_delete:
-            result_to_delete, delete_index = self._find_result_by_row_number(rn_to_delete)
-            if delete_index != -1:
-                self.ocr_results[delete_index]['is_deleted'] = True
-                affected_filenames.add(result_to_delete.get('filename'))
+            result_to_delete = self.find_result(rn_to_delete)
+            if result_to_delete is not None:
+                result_to_delete.is_deleted = True
+                affected_filenames.add(result_to_delete.filename)
 
         self.model_updated.emit(list(filter(None, affected_filenames)))
         return f"Combined rows into row {first_row_number} in profile '{self.active_profile_name}'", True
@@ -291,16 +353,13 @@ class ProjectModel(QObject):
 
         if translation_data:
             for result in self.ocr_results:
-                if result.get('is_deleted', False): continue
+                if result.is_deleted: continue
                 
-                filename = result.get('filename')
-                row_number_str = str(result.get('row_number'))
+                filename = result.filename
+                row_number_str = str(result.row_number)
 
                 if filename in translation_data and row_number_str in translation_data[filename]:
-                    translated_text = translation_data[filename][row_number_str]
-                    if 'translations' not in result:
-                        result['translations'] = {}
-                    result['translations'][profile_name] = translated_text
+                    result.set_translation(profile_name, translation_data[filename][row_number_str])
                     applied_count += 1
         
         print(f"Added profile '{profile_name}'. Applied {applied_count} translations.")
@@ -0,0 +1,65 @@
+# --- START OF FILE reader_registry.py ---
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.core.ocr_engine import create_engine
+
+class ReaderRegistry:
+    """
+    Application-wide store of warm OCR engines (see ocr_engine.py), keyed by
+    (language code, GPU flag, engine name).
+
+    Readers are built on a background thread as soon as they are requested with preload(),
+    and the same reader is handed to every window that asks for that key, so opening another
+    project does not pay the model loading time again. Use ReaderRegistry.instance().
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        """Returns the process-wide registry, creating it on first use."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures = {}
+        # One loader thread: two models loading at once would only compete for disk and VRAM.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ReaderLoader")
+
+    def preload(self, lang_code, use_gpu, engine_name="easyocr"):
+        """
+        Starts building the reader for this key in the background, unless it is loaded or loading.
+        A previous failed attempt is retried.
+
+        :return: concurrent.futures.Future resolving to the OCREngine.
+        """
+        key = (lang_code, bool(use_gpu), engine_name)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None or (future.done() and future.exception() is not None):
+                future = self._executor.submit(self._build_reader, lang_code, bool(use_gpu), engine_name)
+                self._futures[key] = future
+            return future
+
+    def get(self, lang_code, use_gpu, engine_name="easyocr", timeout=None):
+        """Returns the reader for this key, waiting for it to finish loading if necessary."""
+        return self.preload(lang_code, use_gpu, engine_name).result(timeout)
+
+    def is_ready(self, lang_code, use_gpu, engine_name="easyocr"):
+        """True if the reader for this key is loaded and can be used without waiting."""
+        with self._lock:
+            future = self._futures.get((lang_code, bool(use_gpu), engine_name))
+        return future is not None and future.done() and future.exception() is None
+
+    @staticmethod
+    def _build_reader(lang_code, use_gpu, engine_name):
+        print(f"Reader Registry: Loading {engine_name} reader (Lang='{lang_code}', GPU={use_gpu})...")
+        reader = create_engine(engine_name, lang_code, use_gpu)
+        print(f"Reader Registry: {engine_name} reader for '{lang_code}' (GPU={use_gpu}) is ready.")
+        return reader
+
+# --- END OF FILE reader_registry.py ---
@@ -0,0 +1,154 @@
+# --- START OF FILE result_store.py ---
+
+import math
+import bisect
+
+def row_key(row_number):
+    """
+    Normalizes a row number for hashing, so 3, 3.0 and '3.0' (or 3.1 and 3.1000000001) are the same row.
+    Returns None for values that are not a number.
+    """
+    try:
+        value = float(row_number)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(value):
+        return None
+    return round(value, 6)
+
+def _sort_value(result):
+    key = row_key(result.row_number)
+    return float('inf') if key is None else key
+
+class ResultStore:
+    """
+    The project's OCRResult records in (filename, row number) order, with a hash index from row
+    number to result and one bucket per filename, both kept up to date on every change.
+
+    Looking up a row is O(1) and adding a page's results only touches that page's bucket,
+    so neither depends on the size of the project. The flat, ordered list is rebuilt by
+    concatenating the buckets the next time it is read after a change, without sorting.
+
+    Iterating, len() and indexing behave like the plain list this replaces. Results are the
+    same records the callers hold, so edits of their text, translations or flags need nothing.
+    Code that changes a result's filename or row_number in place must call reindex().
+    """
+    def __init__(self, results=()):
+        self.reset(results)
+
+    def reset(self, results):
+        """Replaces the whole contents."""
+        self._buckets = {} # filename -> results sorted by row number
+        self._bucket_keys = {} # filename -> the sort values of its bucket, for bisect
+        self._filenames = [] # Sorted bucket names
+        self._by_row = {}
+        self._count = 0
+        self._flat = None
+        for result in sorted(results, key=lambda r: (r.filename, _sort_value(r))):
+            filename = result.filename
+            if filename not in self._buckets:
+                self._buckets[filename] = []
+                self._bucket_keys[filename] = []
+                self._filenames.append(filename)
+            self._buckets[filename].append(result)
+            self._bucket_keys[filename].append(_sort_value(result))
+            self._index_row(result)
+            self._count += 1
+
+    def reindex(self):
+        """Rebuilds the indexes after results were renamed or renumbered in place."""
+        self.reset(self._flat_list())
+
+    def _index_row(self, result):
+        key = row_key(result.row_number)
+        if key is not None:
+            # On duplicate row numbers the first one in order wins, as with a linear scan
+            self._by_row.setdefault(key, result)
+
+    def _flat_list(self):
+        if self._flat is None:
+            self._flat = [result for filename in self._filenames for result in self._buckets[filename]]
+        return self._flat
+
+    # --- List behaviour ---
+    def __iter__(self):
+        return iter(self._flat_list())
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def __getitem__(self, index):
+        return self._flat_list()[index]
+
+    def to_list(self):
+        """Returns a new plain list of the results."""
+        return list(self._flat_list())
+
+    # --- Lookups ---
+    def find(self, row_number):
+        """Returns the result with this row number, or None."""
+        key = row_key(row_number)
+        return self._by_row.get(key) if key is not None else None
+
+    def for_file(self, filename):
+        """Returns the results of one image, in row order (a copy)."""
+        return list(self._buckets.get(filename, ()))
+
+    def filenames(self):
+        return list(self._filenames)
+
+    # --- Changes ---
+    def add(self, results):
+        """Inserts results at their place in the order; other pages' buckets are not touched."""
+        for result in results:
+            filename = result.filename
+            if filename not in self._buckets:
+                bisect.insort(self._filenames, filename)
+                self._buckets[filename] = []
+                self._bucket_keys[filename] = []
+            keys = self._bucket_keys[filename]
+            position = bisect.bisect_right(keys, _sort_value(result))
+            keys.insert(position, _sort_value(result))
+            self._buckets[filename].insert(position, result)
+            self._index_row(result)
+            self._count += 1
+        if results:
+            self._flat = None
+
+    def remove_where(self, predicate):
+        """Removes every result for which predicate(result) is true. Returns the removed results."""
+        removed = [result for result in self._flat_list() if predicate(result)]
+        if removed:
+            removed_ids = {id(result) for result in removed}
+            self.reset([result for result in self._flat_list() if id(result) not in removed_ids])
+        return removed
+
+    def remove_from_file(self, filename, predicate):
+        """Like remove_where(), but only looks at (and only reorders) one image's results."""
+        bucket = self._buckets.get(filename)
+        if not bucket:
+            return []
+        removed = [result for result in bucket if predicate(result)]
+        if not removed:
+            return []
+        removed_ids = {id(result) for result in removed}
+        kept = [result for result in bucket if id(result) not in removed_ids]
+        for result in removed:
+            key = row_key(result.row_number)
+            if key is not None and self._by_row.get(key) is result:
+                del self._by_row[key]
+        if kept:
+            self._buckets[filename] = kept
+            self._bucket_keys[filename] = [_sort_value(result) for result in kept]
+        else:
+            del self._buckets[filename]
+            del self._bucket_keys[filename]
+            self._filenames.remove(filename)
+        self._count -= len(removed)
+        self._flat = None
+        return removed
+
+# --- END OF FILE result_store.py ---
@@ -51,10 +51,10 @@ class TranslationThread(QThread):
 def _get_text_for_profile_static(result, profile_name):
     """Gets the text for a given result based on the specified profile."""
     if profile_name != "Original":
-        edited_text = result.get('translations', {}).get(profile_name)
+        edited_text = result.translation(profile_name)
         if edited_text is not None:
             return edited_text
-    return result.get('text', '')
+    return result.text
 
 def generate_for_translate_content(ocr_results, source_profile_name):
 # ... (This function is unchanged)
@@ -65,12 +65,12 @@ def generate_for_translate_content(ocr_results, source_profile_name):
     content = "<!-- type: for-translate -->\n\n"
     grouped_results = {}
 
-    visible_results = [res for res in ocr_results if not res.get('is_deleted', False)]
+    visible_results = [res for res in ocr_results if not res.is_deleted]
 
     for result in visible_results:
         text = _get_text_for_profile_static(result, source_profile_name)
-        filename = result.get('filename')
-        row_number = result.get('row_number')
+        filename = result.filename
+        row_number = result.row_number
 
         if not all([filename, text, row_number is not None]) or text.isspace():
             continue
@@ -103,15 +103,15 @@ def generate_retranslate_content(ocr_results, source_profile_name, selected_item
     # Filter out deleted results and group all results by filename for quick lookup
     all_results_by_file = {}
     for res in ocr_results:
-        if not res.get('is_deleted', False):
-            filename = res.get('filename')
+        if not res.is_deleted:
+            filename = res.filename
             if filename not in all_results_by_file:
                 all_results_by_file[filename] = []
             all_results_by_file[filename].append(res)
     
     # Sort results within each file by row number
     for filename in all_results_by_file:
-        all_results_by_file[filename].sort(key=lambda x: float(x.get('row_number', 0)))
+        all_results_by_file[filename].sort(key=lambda x: float(x.row_number))
 
     # Group the selected items by filename to process them in batches
     selected_by_file = {}
@@ -133,7 +133,7 @@ def generate_retranslate_content(ocr_results, source_profile_name, selected_item
         for row_number_str in selected_rows:
             target_idx = -1
             for i, res in enumerate(file_results):
-                if str(res.get('row_number')) == row_number_str:
+                if str(res.row_number) == row_number_str:
                     target_idx = i
                     break
             
@@ -145,11 +145,11 @@ def generate_retranslate_content(ocr_results, source_profile_name, selected_item
             context_slice = file_results[start_idx:end_idx]
             
             context_before, text_to_retranslate, context_after = [], "", []
-            target_row_float = float(file_results[target_idx].get('row_number', -1))
+            target_row_float = float(file_results[target_idx].row_number)
 
             for res in context_slice:
                 text = _get_text_for_profile_static(res, source_profile_name)
-                res_row_float = float(res.get('row_number', 0))
+                res_row_float = float(res.row_number)
 
                 if res_row_float < target_row_float:
                     context_before.append(text)
@@ -1,16 +1,42 @@
+import os
 import traceback
 import sys
-import io
 import math
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from PIL import Image
 
 from PyQt5.QtWidgets import QMessageBox, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton
-from PyQt5.QtCore import QPoint, QBuffer
-from app.utils.data_processing import group_and_merge_text
+from PyQt5.QtCore import QObject, QPoint, QRectF, pyqtSignal
+from app.core.cross_page_ocr import cut_text_crops, recognize_crops
+from app.core.ocr_processor import escalation_threshold
+from app.core.project_model import ProjectModel
+from app.core.ocr_result import OCRResult, box_from_points
+from app.core.project_archive import open_project_file
+from app.utils.data_processing import group_and_merge_text, sub_row_numbers
 from app.ui.components import ResizableImageLabel
 from assets import MANUALOCR_STYLES
 
+# Grayscale page arrays kept for manual OCR; users usually select several regions on the same few pages.
+MANUAL_PAGE_CACHE_SIZE = 4
+
+# One selected region. `rect` is (x, y, width, height) in image pixels; `label` shows its
+# pending `overlay_item` until the region's results arrive.
+ManualOCRRegion = namedtuple('ManualOCRRegion', ['filename', 'image_path', 'rect', 'label', 'overlay_item'])
+
+# Reader and settings snapshot for one batch of regions; `generation` ties it to the
+# manual OCR session that submitted it.
+ManualOCRSettings = namedtuple('ManualOCRSettings', ['reader', 'batch_size', 'decoder', 'adaptive_threshold', 'adjust_contrast',
+                                                     'min_height', 'max_height', 'min_confidence', 'distance_threshold',
+                                                     'generation'])
+
+class _ManualOCRSignals(QObject):
+    """Delivers results from the recognition thread to the GUI thread."""
+    regions_finished = pyqtSignal(object, object) # (future, per region: merged results relative to the crop, or a message)
+    regions_failed = pyqtSignal(object, str) # (future, error message)
+
 class ManualOCRHandler:
     """Handles all logic for the Manual OCR feature."""
     def __init__(self, main_window):
@@ -19,6 +45,21 @@ class ManualOCRHandler:
         self.active_label = None
         self.selected_rect_scene = None
 
+        # Regions selected with "Add to Queue", recognized together by process_queue()
+        self._queued_regions = []
+        # Recognition runs here, one batch at a time (the reader is not thread-safe), so the
+        # GUI stays responsive and further regions can be selected meanwhile.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ManualOCR")
+        self._pending_futures = {} # future -> (regions, settings)
+        # Every submitted batch until it is done, including cancelled ones that were already running
+        self._submitted_futures = set()
+        self._generation = 0
+        self._page_arrays = OrderedDict() # image_path -> grayscale np.ndarray, LRU
+        self._page_arrays_lock = threading.Lock()
+        self._signals = _ManualOCRSignals()
+        self._signals.regions_finished.connect(self._handle_regions_finished)
+        self._signals.regions_failed.connect(self._handle_regions_failed)
+
         self._setup_ui()
 
         # Connect signal to the main toggle button in MainWindow
@@ -37,6 +78,10 @@ class ManualOCRHandler:
         self.btn_ocr_manual_area = QPushButton("OCR This Part")
         self.btn_ocr_manual_area.clicked.connect(self.process_selected_area)
         overlay_buttons.addWidget(self.btn_ocr_manual_area)
+
+        self.btn_queue_manual_area = QPushButton("Add to Queue")
+        self.btn_queue_manual_area.clicked.connect(self.queue_selected_area)
+        overlay_buttons.addWidget(self.btn_queue_manual_area)
         
         self.btn_reset_manual_selection = QPushButton("Reset Selection")
         self.btn_reset_manual_selection.setObjectName("ResetButton")
@@ -49,12 +94,39 @@ class ManualOCRHandler:
         overlay_buttons.addWidget(self.btn_cancel_manual_ocr)
         
         overlay_layout.addLayout(overlay_buttons)
-        self.overlay_widget.setFixedSize(350, 80)
+        self.overlay_widget.setFixedSize(470, 80)
         self.overlay_widget.hide()
 
+        # Bar shown while regions are queued
+        self.queue_widget = QWidget(self.main_window)
+        self.queue_widget.setObjectName("ManualOCROverlay")
+        self.queue_widget.setStyleSheet(MANUALOCR_STYLES)
+        queue_layout = QHBoxLayout(self.queue_widget)
+        queue_layout.setContentsMargins(5, 5, 5, 5)
+        self.queue_label = QLabel()
+        queue_layout.addWidget(self.queue_label)
+
+        self.btn_ocr_queue = QPushButton("OCR Queued Regions")
+        self.btn_ocr_queue.clicked.connect(self.process_queue)
+        queue_layout.addWidget(self.btn_ocr_queue)
+
+        self.btn_clear_queue = QPushButton("Clear Queue")
+        self.btn_clear_queue.setObjectName("ResetButton")
+        self.btn_clear_queue.clicked.connect(self.clear_queue)
+        queue_layout.addWidget(self.btn_clear_queue)
+
+        self.queue_widget.setFixedSize(420, 50)
+        self.queue_widget.hide()
+
     def toggle_mode(self, checked):
         """Activates or deactivates the manual OCR mode."""
         if checked:
+            if self._batch_running():
+                # The batch thread uses the same reader, and EasyOCR readers are not thread-safe
+                QMessageBox.warning(self.main_window, "Manual OCR Mode",
+                                    "Manual OCR is unavailable while batch OCR is running. Stop it or wait for it to finish.")
+                self.cancel_mode()
+                return
             self.is_active = True
             self.main_window.btn_manual_ocr.setText("Cancel Manual OCR")
             self.main_window.btn_process.setEnabled(False)
@@ -65,10 +137,6 @@ class ManualOCRHandler:
                     self.cancel_mode()
                     return
 
-            if self.main_window.ocr_processor and self.main_window.ocr_processor.isRunning():
-                print("Stopping ongoing standard OCR process to enter manual mode...")
-                self.main_window.stop_ocr()
-
             self.main_window.btn_stop_ocr.setVisible(False)
             self._clear_selection_state()
             self._set_selection_enabled_on_all(True)
@@ -77,6 +145,10 @@ class ManualOCRHandler:
         else:
             self.cancel_mode()
 
+    def _batch_running(self):
+        """True while a batch OCR run (which uses the shared reader) is in progress, stopping included."""
+        return self.main_window.batch_handler is not None
+
     def _clear_selection_state(self):
         """Hides the overlay and clears any graphical selection indicators."""
         self.overlay_widget.hide()
@@ -88,6 +160,7 @@ class ManualOCRHandler:
         """Cancels the manual OCR mode and resets the UI."""
         print("Cancelling Manual OCR mode...")
         self.is_active = False
+        self.cancel_pending()
         if self.main_window.btn_manual_ocr.isChecked():
             self.main_window.btn_manual_ocr.setChecked(False)
         self.main_window.btn_manual_ocr.setText("Manual OCR")
@@ -154,136 +227,302 @@ class ManualOCRHandler:
             traceback.print_exc(file=sys.stdout)
             self.reset_selection()
 
-    def process_selected_area(self):
-        """Crops the selected area, runs OCR, and adds the results."""
-        if not self.selected_rect_scene or not self.active_label or not self.main_window.reader:
-            QMessageBox.warning(self.main_window, "Error", "No area selected, active label lost, or OCR reader not ready.")
+    def _take_selected_region(self):
+        """Validates the current selection and marks it as pending. Returns a ManualOCRRegion or None."""
+        if not self.selected_rect_scene or not self.active_label:
+            QMessageBox.warning(self.main_window, "Error", "No area selected or active label lost.")
             self.reset_selection()
+            return None
+
+        crop_rect = self.selected_rect_scene.toRect()
+        if crop_rect.width() <= 0 or crop_rect.height() <= 0:
+            QMessageBox.warning(self.main_window, "Error", "Invalid selection area.")
+            self.reset_selection(); return None
+
+        pixmap = self.active_label.original_pixmap
+        bounded_crop_rect = crop_rect.intersected(pixmap.rect())
+        if bounded_crop_rect.width() <= 0 or bounded_crop_rect.height() <= 0:
+             QMessageBox.warning(self.main_window, "Error", "Selection area is outside image bounds.")
+             self.reset_selection(); return None
+
+        filename = self.active_label.filename
+        image_path = next((p for p in self.main_window.model.image_paths if os.path.basename(p) == filename), None)
+        if image_path is None:
+            QMessageBox.warning(self.main_window, "Error", f"Image file for {filename} not found in the project.")
+            self.reset_selection(); return None
+
+        overlay_item = self.active_label.add_pending_region(QRectF(bounded_crop_rect))
+        return ManualOCRRegion(
+            filename=filename, image_path=image_path,
+            rect=(bounded_crop_rect.left(), bounded_crop_rect.top(), bounded_crop_rect.width(), bounded_crop_rect.height()),
+            label=self.active_label, overlay_item=overlay_item
+        )
+
+    def queue_selected_area(self):
+        """Adds the selected area to the queue and frees the selection for the next one."""
+        region = self._take_selected_region()
+        if region is None: return
+        self._queued_regions.append(region)
+        print(f"Queued manual OCR region {region.rect} on {region.filename} ({len(self._queued_regions)} queued).")
+        self.reset_selection()
+        self._update_queue_widget()
+
+    def process_selected_area(self):
+        """Recognizes the selected area, together with any queued ones, in the background."""
+        region = self._take_selected_region()
+        if region is None: return
+        self._queued_regions.append(region)
+        self.reset_selection()
+        self.process_queue()
+
+    def process_queue(self):
+        """Sends every queued region to the recognition thread as one batch."""
+        if not self._queued_regions:
+            return
+        if not self.main_window.reader:
+            QMessageBox.warning(self.main_window, "Error", "OCR reader not ready.")
+            return
+        if self._batch_running():
+            # Regions stay queued until the batch run is over
+            QMessageBox.warning(self.main_window, "Manual OCR", "Batch OCR is running. Queued regions are kept; process them once it finishes.")
             return
 
-        print(f"Processing manual OCR for selection on {self.active_label.filename}")
-        self.overlay_widget.hide()
+        # Snapshot everything the worker needs, so it never touches widgets or settings
+        qsettings = self.main_window.settings
+        self.main_window._load_filter_settings()
+        settings = ManualOCRSettings(
+            reader=self.main_window.reader,
+            batch_size=int(qsettings.value("ocr_batch_size", 1)),
+            decoder=qsettings.value("ocr_decoder", "beamsearch"),
+            adaptive_threshold=float(qsettings.value("ocr_adaptive_threshold", 0.5)),
+            adjust_contrast=float(qsettings.value("ocr_adjust_contrast", 0.5)),
+            min_height=self.main_window.min_text_height, max_height=self.main_window.max_text_height,
+            min_confidence=self.main_window.min_confidence, distance_threshold=self.main_window.distance_threshold,
+            generation=self._generation
+        )
+        regions, self._queued_regions = self._queued_regions, []
+        self._update_queue_widget()
+
+        future = self._executor.submit(self._recognize_regions, regions, settings)
+        self._pending_futures[future] = (regions, settings)
+        self._submitted_futures.add(future)
+        future.add_done_callback(self._on_regions_done)
+        print(f"Submitted {len(regions)} manual OCR region(s) for recognition.")
+        self._update_pending_status()
+
+    def clear_queue(self):
+        """Drops the queued (not yet submitted) regions."""
+        self._remove_region_overlays(self._queued_regions)
+        self._queued_regions = []
+        self._update_queue_widget()
+
+    def is_recognizing(self):
+        """True while the recognition thread has a batch to run or is running one, even a discarded one."""
+        self._submitted_futures = {future for future in self._submitted_futures if not future.done()}
+        return bool(self._submitted_futures)
+
+    def cancel_pending(self):
+        """Drops queued and submitted regions; a batch already being recognized finishes but is discarded."""
+        self._generation += 1
+        self.clear_queue()
+        for future, (regions, _) in list(self._pending_futures.items()):
+            future.cancel()
+            self._remove_region_overlays(regions)
+        self._pending_futures.clear()
+        with self._page_arrays_lock:
+            self._page_arrays.clear()
+
+    def shutdown(self):
+        """Cancels pending work and stops the recognition thread (call when the window closes)."""
+        self.cancel_pending()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _remove_region_overlays(self, regions):
+        for region in regions:
+            try:
+                region.label.remove_pending_region(region.overlay_item)
+            except RuntimeError:
+                pass # The label was deleted with its project
+
+    def _update_queue_widget(self):
+        """Shows the queue bar at the bottom of the window while regions are queued."""
+        if not self._queued_regions:
+            self.queue_widget.hide()
+            return
+        pages = len({region.filename for region in self._queued_regions})
+        self.queue_label.setText(f"{len(self._queued_regions)} region(s) on {pages} page(s)")
+        queue_x = (self.main_window.width() - self.queue_widget.width()) // 2
+        queue_y = self.main_window.height() - self.queue_widget.height() - 40
+        self.queue_widget.move(max(0, queue_x), max(0, queue_y))
+        self.queue_widget.show()
+        self.queue_widget.raise_()
+
+    def _get_page_array(self, image_path):
+        """Returns the page as a grayscale array, decoding it on first use. Runs on the worker thread."""
+        with self._page_arrays_lock:
+            page = self._page_arrays.get(image_path)
+            if page is not None:
+                self._page_arrays.move_to_end(image_path)
+                return page
+        with open_project_file(image_path) as image_file, Image.open(image_file) as img:
+            page = np.array(img.convert('L'))
+        with self._page_arrays_lock:
+            self._page_arrays[image_path] = page
+            while len(self._page_arrays) > MANUAL_PAGE_CACHE_SIZE:
+                self._page_arrays.popitem(last=False)
+        return page
+
+    def _recognize_regions(self, regions, settings):
+        """
+        Worker thread: runs detection on each region, then recognizes the text of all regions
+        in one batched pass (see cross_page_ocr.recognize_crops), then filters and merges per region.
+
+        :return: List parallel to `regions`; each entry is a list of merged result dicts with
+                 coordinates relative to its region, or a message string if nothing usable was found.
+        """
+        crops = []
+        for region_index, region in enumerate(regions):
+            x, y, width, height = region.rect
+            img_np = np.ascontiguousarray(self._get_page_array(region.image_path)[y:y + height, x:x + width])
+            horizontal_list, free_list = settings.reader.detect(img_np)
+            # Each crop remembers its region in `tile`
+            crops.extend(cut_text_crops(img_np, horizontal_list[0], free_list[0], tile=region_index))
+
+        print(f"Running manual OCR: {len(crops)} text regions detected in {len(regions)} selected area(s).")
+        raw_by_region = [[] for _ in regions]
+        if crops:
+            recognized = recognize_crops(settings.reader, crops, settings.batch_size, settings.decoder,
+                                         escalate_below=escalation_threshold(settings.adaptive_threshold, settings.min_confidence),
+                                         adjust_contrast=settings.adjust_contrast)
+            for crop, crop_results in zip(crops, recognized):
+                raw_by_region[crop.tile].extend(crop_results)
+        return [self._filter_and_merge_region(raw_results, settings) for raw_results in raw_by_region]
+
+    def _filter_and_merge_region(self, raw_results_relative, settings):
+        """Applies the height/confidence filters to one region's raw results and merges them."""
+        if not raw_results_relative:
+            return "No text found in the selected area."
+
+        # Pre-filter RAW results BEFORE Merging
+        temp_results_for_merge = []
+        min_h, max_h, min_conf = settings.min_height, settings.max_height, settings.min_confidence
+        print(f"Pre-filtering {len(raw_results_relative)} raw manual results (MinH={min_h}, MaxH={max_h}, MinConf={min_conf})...")
+
+        for (coord_rel, text, confidence) in raw_results_relative:
+            raw_height = 0
+            if coord_rel:
+                 try:
+                     y_coords_rel = [p[1] for p in coord_rel]
+                     raw_height = max(y_coords_rel) - min(y_coords_rel) if y_coords_rel else 0
+                 except (ValueError, IndexError, TypeError) as coord_err:
+                      print(f"Warning: Error calculating raw height for coords {coord_rel}. Error: {coord_err}")
+                      raw_height = 0
+
+            if (min_h <= raw_height <= max_h and confidence >= min_conf):
+                temp_results_for_merge.append({
+                    'coordinates': coord_rel, 'text': text, 'confidence': confidence,
+                    'filename': "manual_crop", # Placeholder
+                })
+            else:
+                exclusion_reasons = []
+                if not (min_h <= raw_height <= max_h):
+                     exclusion_reasons.append(f"height {raw_height:.1f}px (bounds: {min_h}-{max_h})")
+                if confidence < min_conf:
+                    exclusion_reasons.append(f"low confidence ({confidence:.2f} < {min_conf})")
+                if exclusion_reasons:
+                     print(f"Excluded RAW manual block ({', '.join(exclusion_reasons)}): '{text[:50]}...'")
+
+        if not temp_results_for_merge:
+            return "No text found in the selected area passed the initial filters."
+
+        # Merge the PRE-FILTERED Results
+        merged_results_relative = group_and_merge_text(
+            temp_results_for_merge,
+            distance_threshold=settings.distance_threshold
+        )
+        print(f"Internal merge of pre-filtered results produced {len(merged_results_relative)} final block(s).")
+        return merged_results_relative
+
+    def _on_regions_done(self, future):
+        """Worker thread (or caller thread, if cancelled): forwards the outcome to the GUI thread."""
+        if future.cancelled() or future not in self._pending_futures:
+            return # Cancelled, possibly while running
+        error = future.exception()
+        if error is not None:
+            self._signals.regions_failed.emit(future, str(error))
+        else:
+            self._signals.regions_finished.emit(future, future.result())
 
-        try:
-            # 1. Get the Crop
-            crop_rect = self.selected_rect_scene.toRect()
-            if crop_rect.width() <= 0 or crop_rect.height() <= 0:
-                QMessageBox.warning(self.main_window, "Error", "Invalid selection area.")
-                self.reset_selection(); return
-
-            pixmap = self.active_label.original_pixmap
-            bounded_crop_rect = crop_rect.intersected(pixmap.rect())
-            if bounded_crop_rect.width() <= 0 or bounded_crop_rect.height() <= 0:
-                 QMessageBox.warning(self.main_window, "Error", "Selection area is outside image bounds.")
-                 self.reset_selection(); return
-
-            cropped_pixmap = pixmap.copy(bounded_crop_rect)
-            buffer = QBuffer()
-            buffer.open(QBuffer.ReadWrite); cropped_pixmap.save(buffer, "PNG")
-            pil_image = Image.open(io.BytesIO(buffer.data())).convert('L')
-            img_np = np.array(pil_image)
-
-            # 2. Run OCR on the Cropped Area
-            print(f"Running manual OCR on cropped area: {bounded_crop_rect}")
-            settings = self.main_window.settings
-            batch_size = int(settings.value("ocr_batch_size", 1))
-            decoder = settings.value("ocr_decoder", "beamsearch")
-            adjust_contrast = float(settings.value("ocr_adjust_contrast", 0.5))
-
-            raw_results_relative = self.main_window.reader.readtext(
-                img_np, batch_size=batch_size, adjust_contrast=adjust_contrast,
-                decoder=decoder, detail=1
-            )
-            print(f"Manual OCR raw results (relative coords): {raw_results_relative}")
-
-            if not raw_results_relative:
-                 QMessageBox.information(self.main_window, "Info", "No text found in the selected area.")
-                 self.reset_selection(); return
-
-            # 3. Pre-filter RAW results BEFORE Merging
-            temp_results_for_merge = []
-            self.main_window._load_filter_settings()
-            min_h, max_h = self.main_window.min_text_height, self.main_window.max_text_height
-            min_conf = self.main_window.min_confidence
-            print(f"Pre-filtering {len(raw_results_relative)} raw manual results (MinH={min_h}, MaxH={max_h}, MinConf={min_conf})...")
-
-            for (coord_rel, text, confidence) in raw_results_relative:
-                raw_height = 0
-                if coord_rel:
-                     try:
-                         y_coords_rel = [p[1] for p in coord_rel]
-                         raw_height = max(y_coords_rel) - min(y_coords_rel) if y_coords_rel else 0
-                     except (ValueError, IndexError, TypeError) as coord_err:
-                          print(f"Warning: Error calculating raw height for coords {coord_rel}. Error: {coord_err}")
-                          raw_height = 0
-
-                if (min_h <= raw_height <= max_h and confidence >= min_conf):
-                    temp_results_for_merge.append({
-                        'coordinates': coord_rel, 'text': text, 'confidence': confidence,
-                        'filename': "manual_crop", # Placeholder
-                    })
-                else:
-                    exclusion_reasons = []
-                    if not (min_h <= raw_height <= max_h):
-                         exclusion_reasons.append(f"height {raw_height:.1f}px (bounds: {min_h}-{max_h})")
-                    if confidence < min_conf:
-                        exclusion_reasons.append(f"low confidence ({confidence:.2f} < {min_conf})")
-                    if exclusion_reasons:
-                         print(f"Excluded RAW manual block ({', '.join(exclusion_reasons)}): '{text[:50]}...'")
-
-            if not temp_results_for_merge:
-                QMessageBox.information(self.main_window, "Info", "No text found in the selected area passed the initial filters.")
-                self.reset_selection(); return
-
-            # 4. Merge the PRE-FILTERED Results
-            merged_results_relative = group_and_merge_text(
-                temp_results_for_merge,
-                distance_threshold=self.main_window.distance_threshold
-            )
-            print(f"Internal merge of pre-filtered results produced {len(merged_results_relative)} final block(s).")
-
-            # 5. Process Final MERGED Blocks
-            filename_actual = self.active_label.filename
-            any_change_made = False
-            offset_x, offset_y = bounded_crop_rect.left(), bounded_crop_rect.top()
-
-            for merged_result in merged_results_relative:
+    def _handle_regions_failed(self, future, message):
+        regions, settings = self._pending_futures.pop(future, (None, None))
+        if regions is None or settings.generation != self._generation:
+            return
+        self._remove_region_overlays(regions)
+        print(f"Error during manual OCR processing: {message}")
+        self._update_pending_status()
+        QMessageBox.critical(self.main_window, "Manual OCR Error", f"An unexpected error occurred: {message}")
+
+    def _handle_regions_finished(self, future, outcomes):
+        """GUI thread: numbers the merged blocks of a batch in one sweep and adds them through the model."""
+        regions, settings = self._pending_futures.pop(future, (None, None))
+        if regions is None or settings.generation != self._generation:
+            return # Manual OCR was cancelled or the project changed meanwhile
+        self._remove_region_overlays(regions)
+        self._update_pending_status()
+
+        # Absolute coordinates of every merged block, in reading order (page, then top to bottom)
+        blocks = []
+        empty_regions = 0
+        for region, outcome in zip(regions, outcomes):
+            if isinstance(outcome, str):
+                print(f"Manual OCR on {region.filename} {region.rect}: {outcome}")
+                empty_regions += 1
+                continue
+            offset_x, offset_y = region.rect[0], region.rect[1]
+            for merged_result in outcome:
                 coords_relative = merged_result['coordinates']
                 if not coords_relative: continue
-
                 coords_absolute = [[int(p[0] + offset_x), int(p[1] + offset_y)] for p in coords_relative]
-                try:
-                    new_row_number = self._calculate_row_number(coords_absolute, filename_actual)
-                except Exception as e:
-                     print(f"Error calculating row number for manual block '{merged_result['text'][:20]}...': {e}. Skipping.")
-                     continue
-
-                final_result = {
-                    'coordinates': coords_absolute, 'text': merged_result['text'],
-                    'confidence': merged_result['confidence'], 'filename': filename_actual,
-                    'is_manual': True, 'row_number': new_row_number
-                }
-                self.main_window.model.ocr_results.append(final_result)
-                any_change_made = True
-                print(f"Added final MERGED manual block: Row {new_row_number}, Text: '{merged_result['text'][:20]}...'")
-
-            # 6. Sort Results & Update UI
-            if any_change_made:
-                 self.main_window.model._sort_ocr_results()
-                 self.main_window.update_all_views(affected_filenames=[filename_actual])
-                 QMessageBox.information(self.main_window, "Success", f"Added {len(merged_results_relative)} text block(s) from manual selection.")
-
-            # 7. Reset state for new selection
-            self.reset_selection()
+                blocks.append((region.filename, coords_absolute, merged_result))
+        blocks.sort(key=lambda block: (block[0], min(p[1] for p in block[1])))
 
-        except Exception as e:
-            print(f"Error during manual OCR processing: {e}")
-            traceback.print_exc(file=sys.stdout)
-            QMessageBox.critical(self.main_window, "Manual OCR Error", f"An unexpected error occurred: {str(e)}")
-            self.reset_selection()
+        # Each new block is numbered against the results plus the blocks numbered before it
+        working_results = list(self.main_window.model.ocr_results)
+        final_results = []
+        for filename, coords_absolute, merged_result in blocks:
+            try:
+                new_row_number = self._calculate_row_number(coords_absolute, filename, working_results)
+            except Exception as e:
+                 print(f"Error calculating row number for manual block '{merged_result['text'][:20]}...': {e}. Skipping.")
+                 continue
+            final_result = OCRResult(filename, new_row_number, box_from_points(coords_absolute),
+                                     merged_result['text'], merged_result['confidence'], is_manual=True)
+            working_results.append(final_result)
+            working_results.sort(key=ProjectModel.result_sort_key)
+            final_results.append(final_result)
+            print(f"Added final MERGED manual block: Row {new_row_number}, Text: '{merged_result['text'][:20]}...'")
+
+        self.main_window.model.add_manual_ocr_results(final_results)
+        message = f"Manual OCR: Added {len(final_results)} text block(s) from {len(regions)} region(s)."
+        if empty_regions:
+            message += f" {empty_regions} region(s) had no usable text."
+        self.main_window.statusBar().showMessage(message, 8000)
+
+    def _update_pending_status(self):
+        pending = sum(len(regions) for regions, _ in self._pending_futures.values())
+        if pending:
+            self.main_window.statusBar().showMessage(f"Manual OCR: {pending} region(s) processing...")
+        else:
+            self.main_window.statusBar().clearMessage()
+
+    def _calculate_row_number(self, coordinates, filename, results=None):
+        """
+        Calculates a new fractional row number for manually added text.
 
-    def _calculate_row_number(self, coordinates, filename):
-        """Calculates a new fractional row number for manually added text."""
+        :param results: Sorted results to number against (default: the model's results).
+        """
+        if results is None:
+            results = self.main_window.model.ocr_results
         if not coordinates: return 0.0
         try:
             sort_key_y = min(p[1] for p in coordinates)
@@ -291,14 +530,12 @@ class ManualOCRHandler:
             print(f"Error calculating sort key Y: {e}"); return float('inf')
 
         preceding_result = None
-        for res in self.main_window.model.ocr_results:
-            if res.get('is_deleted', False): continue
-            res_filename, res_coords = res.get('filename', ''), res.get('coordinates')
-            res_row_number_raw = res.get('row_number')
-            if res_row_number_raw is None or res_coords is None: continue
+        for res in results:
+            if res.is_deleted: continue
+            res_filename = res.filename
+            if res.row_number is None or res.box is None: continue
 
-            try: res_sort_key_y = min(p[1] for p in res_coords)
-            except: continue
+            res_sort_key_y = res.box[1]
 
             if res_filename < filename or (res_filename == filename and res_sort_key_y < sort_key_y):
                 preceding_result = res
@@ -308,21 +545,8 @@ class ManualOCRHandler:
         base_row_number = 0
         if preceding_result:
             try:
-                base_row_number = math.floor(float(preceding_result.get('row_number', 0.0)))
+                base_row_number = math.floor(float(preceding_result.row_number))
             except (ValueError, TypeError): pass
 
-        max_sub_index_for_base = 0
-        for res in self.main_window.model.ocr_results:
-             current_row_num_raw = res.get('row_number')
-             if current_row_num_raw is None: continue
-             try:
-                 current_row_num_float = float(current_row_num_raw)
-                 if math.floor(current_row_num_float) == base_row_number:
-                      epsilon = 1e-9
-                      sub_index = int((current_row_num_float - base_row_number) * 10 + epsilon)
-                      if sub_index > 0:
-                           max_sub_index_for_base = max(max_sub_index_for_base, sub_index)
-             except (ValueError, TypeError): pass
-
-        new_sub_index = max_sub_index_for_base + 1
-        return float(base_row_number) + (float(new_sub_index) / 10.0)
\ No newline at end of file
+        # Same allocator as the extra blocks of a page OCRed again, so both agree on the used sub-rows
+        return sub_row_numbers(base_row_number, 1, [res.row_number for res in results])[0]
\ No newline at end of file
@@ -1,9 +1,37 @@
-import os, gc
-from PyQt5.QtCore import QObject, pyqtSignal
+import os, gc, copy
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
 from app.core.ocr_processor import OCRProcessor
+from app.core.ocr_worker_pool import OCRPoolThread
+from app.core.cross_page_ocr import CrossPageOCRProcessor
+from app.core.image_prefetcher import ImagePrefetcher
+from app.core.ocr_metrics import OCRRunReport
+from app.core.page_hashes import find_duplicate_pages
+from app.core.reader_registry import ReaderRegistry
 from app.core.project_model import ProjectModel
+from app.utils.data_processing import number_page_results
 from app.ui.widgets import CustomProgressBar # Import the progress bar
 
+class DuplicatePageScanThread(QThread):
+    """
+    Finds the duplicate pages of a batch off the GUI thread: pages the project has not hashed
+    yet are decoded for their perceptual hash, and candidate pairs for their pixel digest.
+    """
+    scan_finished = pyqtSignal(object) # {page index: (source page index, hash distance)}
+
+    def __init__(self, model, image_paths, max_distance):
+        super().__init__()
+        self.model = model
+        self.image_paths = image_paths
+        self.max_distance = max_distance
+
+    def run(self):
+        duplicates = {}
+        try:
+            duplicates = find_duplicate_pages(self.image_paths, self.model.page_hashes(), self.max_distance)
+        except Exception as e:
+            print(f"Batch Handler: Warning - Duplicate page detection failed, OCRing every page: {e}")
+        self.scan_finished.emit(duplicates)
+
 class BatchOCRHandler(QObject):
     """
     Manages the entire batch OCR process for multiple images.
@@ -16,11 +44,37 @@ class BatchOCRHandler(QObject):
     processing_stopped = pyqtSignal()
 
     # --- MODIFIED: Constructor now accepts the ProjectModel and the progress bar ---
-    def __init__(self, image_paths, reader, settings, starting_row_number, model: ProjectModel, progress_bar: CustomProgressBar):
+    def __init__(self, image_paths, reader, settings, starting_row_number, model: ProjectModel, progress_bar: CustomProgressBar,
+                 pool_settings=None, prefetch_depth=0, cache=None, checkpoint=None, cross_page_batch=0,
+                 duplicate_distance=-1, replace_existing=False):
         super().__init__()
         self.image_paths = image_paths
         self.reader = reader
         self.settings = settings
+        # Optional multi-process mode: {'num_workers', 'lang_code', 'use_gpu', 'torch_threads', 'engine_name'}
+        self.pool_settings = pool_settings or {}
+        # Pages whose text crops are recognized together (0/1 = page by page)
+        self.cross_page_batch = cross_page_batch
+        # Number of pages decoded ahead of the reader (0 disables the loader stage)
+        self.prefetch_depth = prefetch_depth
+        self.prefetcher = None
+        # Optional OCRResultCache shared by all pages of the run
+        self.cache = cache
+        # Optional OCRCheckpoint; every committed page is appended so an interrupted run can resume
+        self.checkpoint = checkpoint
+        # Pages whose perceptual hash is within this distance of an earlier page, and whose pixels
+        # are identical to it, reuse its results (-1 disables)
+        self.duplicate_distance = duplicate_distance
+        self._duplicates = {} # page index -> (source page index, hash distance)
+        self._source_results = {} # source page index -> its numbered results, kept for its duplicates
+        self._ocr_indices = [] # Pages actually handed to the reader, in order
+        # Re-OCR of selected pages: each page's old standard results are dropped when its new ones
+        # are committed, and their row numbers reused, so the rest of the project is untouched.
+        # Pages not reached because of a stop or an error keep their old results.
+        self.replace_existing = replace_existing
+        if self.cache is not None and replace_existing:
+            # A page OCRed again must not just get its previous final results back
+            self.cache.read_final = False
         self.starting_row_number = starting_row_number
         self.model = model
         self.progress_bar = progress_bar # Store a reference to the progress bar
@@ -29,14 +83,97 @@ class BatchOCRHandler(QObject):
         self.next_global_row_number = self.starting_row_number
         self._is_stopped = False
         self.ocr_thread = None
+        self.scan_thread = None
+        # Pool / cross-page mode: one thread reports whole pages, possibly out of order;
+        # they wait here until their turn to be committed.
+        self.page_thread = None
+        self._pending_results = {}
+        self._failed = False
+        # Per-stage timings and region counts of this run, saved next to the project when it ends
+        self.run_report = None
+
+    def uses_worker_pool(self):
+        """True if the batch is dispatched to several worker processes."""
+        return int(self.pool_settings.get('num_workers', 1)) > 1 and len(self._ocr_indices) > 1
+
+    def uses_cross_page_batching(self):
+        """True if text crops of several pages are recognized together by the in-process reader."""
+        return not self.uses_worker_pool() and self.cross_page_batch > 1 and len(self._ocr_indices) > 1
+
+    def _ensure_reader(self):
+        """
+        Fetches the in-process reader from the ReaderRegistry if the run was set up for worker
+        processes (so none was passed in) but has too few pages left to OCR to use them.
+        """
+        if self.reader or not self._ocr_indices:
+            return True
+        reader_key = (self.pool_settings.get('lang_code', 'ko'), self.pool_settings.get('use_gpu', False),
+                      self.pool_settings.get('engine_name', 'easyocr'))
+        print(f"Batch Handler: {len(self._ocr_indices)} page(s) to OCR, running in-process instead of in worker processes.")
+        try:
+            self.reader = ReaderRegistry.instance().get(*reader_key)
+            return True
+        except Exception as e:
+            print(f"Batch Handler: Could not load the OCR reader: {e}")
+            self._is_stopped = True
+            self._failed = True
+            self.error_occurred.emit(f"Failed to initialize OCR reader: {e}")
+            return False
 
     def start_processing(self):
-        """Starts the batch process."""
+        """Starts the batch process, once the duplicate pages (if enabled) are known."""
         print("Batch Handler: Starting processing...")
         self._is_stopped = False
+        self._source_results = {}
         # --- NEW: Directly control the progress bar ---
         self.progress_bar.start_initial_progress()
-        self._process_next_image()
+        if self.duplicate_distance < 0:
+            self._begin_processing({})
+            return
+        self.scan_thread = DuplicatePageScanThread(self.model, self.image_paths, self.duplicate_distance)
+        self.scan_thread.scan_finished.connect(self._begin_processing)
+        self.scan_thread.start()
+
+    def _begin_processing(self, duplicates):
+        """Hands the pages that are not duplicates to the reader."""
+        if self.scan_thread:
+            self.scan_thread.wait()
+            self.scan_thread = None
+        if self._is_stopped:
+            print("Batch Handler: Stopped before any page was processed.")
+            self.processing_stopped.emit()
+            return
+        filenames = [os.path.basename(path) for path in self.image_paths]
+        for index, (source_index, distance) in duplicates.items():
+            print(f"Batch Handler: {filenames[index]} is identical to {filenames[source_index]} "
+                  f"(distance {distance}), its results will be copied.")
+        self._duplicates = duplicates
+        self._ocr_indices = [index for index in range(len(self.image_paths)) if index not in self._duplicates]
+        if self.uses_worker_pool():
+            mode = 'pool'
+        elif self.uses_cross_page_batching():
+            mode = 'cross-page'
+        else:
+            mode = 'single'
+        if mode != 'pool' and not self._ensure_reader():
+            return
+        self.run_report = OCRRunReport(self.model.project_name, mode, self.settings)
+        if self.uses_worker_pool():
+            # Worker processes already decode their next page while others recognize.
+            self._start_worker_pool()
+        else:
+            if self.prefetch_depth > 0:
+                self.prefetcher = ImagePrefetcher(
+                    self._ocr_image_paths(),
+                    adjust_contrast=self.settings['adjust_contrast'],
+                    resize_threshold=self.settings['resize_threshold'],
+                    depth=self.prefetch_depth
+                )
+                self.prefetcher.start()
+            if self.uses_cross_page_batching():
+                self._start_cross_page_thread()
+            else:
+                self._process_next_image()
     
     # ... stop() and _process_next_image() remain the same ...
     def stop(self):
@@ -45,14 +182,99 @@ class BatchOCRHandler(QObject):
         self._is_stopped = True
         if self.ocr_thread and self.ocr_thread.isRunning():
             self.ocr_thread.stop_requested = True
-            
+        if self.page_thread and self.page_thread.isRunning():
+            self.page_thread.stop_requested = True
+        self._stop_prefetcher()
+
+    def _ocr_image_paths(self):
+        return [self.image_paths[index] for index in self._ocr_indices]
+
+    def _stop_prefetcher(self):
+        """Stops the background loader, if one is running."""
+        if self.prefetcher:
+            self.prefetcher.stop()
+            self.prefetcher = None
+
+    def _start_worker_pool(self):
+        """Dispatches all pages to the worker pool; results are committed in page order."""
+        self.current_image_index = 0
+        self._pending_results = {}
+        self.page_thread = OCRPoolThread(
+            image_paths=self._ocr_image_paths(),
+            settings=self.settings,
+            num_workers=int(self.pool_settings['num_workers']),
+            lang_code=self.pool_settings.get('lang_code', 'ko'),
+            use_gpu=self.pool_settings.get('use_gpu', False),
+            torch_threads=int(self.pool_settings.get('torch_threads', 0)),
+            cache=self.cache,
+            engine_name=self.pool_settings.get('engine_name', 'easyocr')
+        )
+        self.page_thread.page_finished.connect(self._handle_page_finished)
+        self.page_thread.error_occurred.connect(self._handle_image_error)
+        self.page_thread.finished.connect(self._handle_page_thread_finished)
+        self.page_thread.start()
+
+    def _start_cross_page_thread(self):
+        """Detects and recognizes pages in groups; results arrive in page order."""
+        if not self.reader:
+            self.error_occurred.emit("OCR Reader not available. Cannot start processing.")
+            return
+        self.current_image_index = 0
+        self._pending_results = {}
+        self.page_thread = CrossPageOCRProcessor(
+            image_paths=self._ocr_image_paths(),
+            reader=self.reader,
+            pages_per_batch=self.cross_page_batch,
+            settings=self.settings,
+            cache=self.cache,
+            prefetcher=self.prefetcher
+        )
+        self.page_thread.page_finished.connect(self._handle_page_finished)
+        self.page_thread.error_occurred.connect(self._handle_image_error)
+        self.page_thread.finished.connect(self._handle_page_thread_finished)
+        self.page_thread.start()
+
+    def _handle_page_finished(self, index, processed_results, metrics):
+        """Buffers an out-of-order page and commits every page that is now in sequence."""
+        if self._is_stopped:
+            print("Batch Handler: Ignoring page results due to stop request.")
+            return
+        # The thread only saw the pages that are not duplicates
+        self._pending_results[self._ocr_indices[index]] = (processed_results, metrics)
+        while True:
+            self._commit_duplicate_pages()
+            if self.current_image_index not in self._pending_results: break
+            results, page_metrics = self._pending_results.pop(self.current_image_index)
+            self._commit_image_results(self.image_paths[self.current_image_index], results, page_metrics)
+            self.current_image_index += 1
+            self.progress_bar.record_processing_time()
+            self._handle_image_progress(0)
+
+        if self.current_image_index >= len(self.image_paths):
+            print("Batch Handler: All images processed.")
+            self._finish_batch()
+
+    def _handle_page_thread_finished(self):
+        """Called when the pool / cross-page thread exits; reports a stop if the run did not complete."""
+        if self._is_stopped and not self._failed and self.current_image_index < len(self.image_paths):
+            self._save_run_report('stopped')
+            self.processing_stopped.emit()
+
+    def _release_page_thread(self):
+        """Waits for the (already exiting) page thread so it is never destroyed while running."""
+        if self.page_thread:
+            self.page_thread.wait()
+            self.page_thread = None
+
     def _process_next_image(self):
         """Processes a single image or finishes the batch if all are done."""
         if self._is_stopped:
             print("Batch Handler: Process was stopped, not starting next image.")
+            self._save_run_report('stopped')
             self.processing_stopped.emit()
             return
             
+        self._commit_duplicate_pages()
         if self.current_image_index >= len(self.image_paths):
             print("Batch Handler: All images processed.")
             self._finish_batch()
@@ -68,6 +290,8 @@ class BatchOCRHandler(QObject):
         self.ocr_thread = OCRProcessor(
             image_path=image_path,
             reader=self.reader,
+            prefetcher=self.prefetcher,
+            cache=self.cache,
             **self.settings # Unpack the settings dictionary
         )
 
@@ -87,35 +311,15 @@ class BatchOCRHandler(QObject):
         self.progress_bar.update_target_progress(int(overall_progress))
 
     # ... _handle_image_results() remains the same ...
-    def _handle_image_results(self, processed_results):
+    def _handle_image_results(self, processed_results, metrics):
         """Receives results from a single image, updates the model directly, and starts the next."""
         if self._is_stopped:
             print("Batch Handler: Ignoring results from finished image due to stop request.")
             return
 
         current_image_path = self.image_paths[self.current_image_index]
-        filename = os.path.basename(current_image_path)
-        
-        newly_numbered_results = []
-        if processed_results:
-            try:
-                processed_results.sort(key=lambda r: min(p[1] for p in r.get('coordinates', [[0, float('inf')]])))
-            except (ValueError, TypeError, IndexError) as e:
-                print(f"Warning: Could not sort processed results for {filename}: {e}. Using processor order.")
-            
-            for result in processed_results:
-                result['filename'] = filename
-                result['row_number'] = self.next_global_row_number
-                result['is_manual'] = False
-                result['translations'] = {}
-                newly_numbered_results.append(result)
-                self.next_global_row_number += 1
-        
-        # --- UPDATE THE MODEL directly instead of emitting a signal ---
-        if newly_numbered_results:
-            self.model.add_new_ocr_results(newly_numbered_results)
-            print(f"Batch Handler: Added {len(newly_numbered_results)} blocks from {filename} to model.")
-        
+        self._commit_image_results(current_image_path, processed_results, metrics)
+
         # Move to the next image
         self.current_image_index += 1
         self.ocr_thread = None
@@ -123,11 +327,53 @@ class BatchOCRHandler(QObject):
 
         self._process_next_image()
 
+    def _commit_duplicate_pages(self):
+        """Commits the pages at the current position that copy an already committed page."""
+        while self.current_image_index in self._duplicates:
+            source_index, distance = self._duplicates[self.current_image_index]
+            image_path = self.image_paths[self.current_image_index]
+            source_filename = os.path.basename(self.image_paths[source_index])
+            copied_results = copy.deepcopy(self._source_results.get(source_index, []))
+            if self.run_report:
+                self.run_report.add_duplicate_page(os.path.basename(image_path), source_filename, distance, len(copied_results))
+            self._commit_image_results(image_path, copied_results, report=False)
+            self.current_image_index += 1
+            self._handle_image_progress(0)
+
+    def _commit_image_results(self, image_path, processed_results, metrics=None, report=True):
+        """Numbers one image's results top-to-bottom and adds them to the model."""
+        filename = os.path.basename(image_path)
+        if self.run_report and report:
+            self.run_report.add_page(filename, metrics)
+        
+        reserved_rows = self.model.remove_standard_results(filename) if self.replace_existing else None
+        occupied_rows = ()
+        if reserved_rows and len(processed_results) > len(reserved_rows):
+            # Blocks past the freed rows become sub-rows of the page's last one, clear of manual sub-rows
+            occupied_rows = [res.row_number for res in self.model.ocr_results]
+        newly_numbered_results, self.next_global_row_number = number_page_results(
+            processed_results, filename, self.next_global_row_number, reserved_rows, occupied_rows)
+        if any(source == self.current_image_index for source, _ in self._duplicates.values()):
+            # Kept unshared with the model, so later edits of the page do not leak into its copies
+            self._source_results[self.current_image_index] = copy.deepcopy(newly_numbered_results)
+        
+        # --- UPDATE THE MODEL directly instead of emitting a signal ---
+        if newly_numbered_results:
+            self.model.add_new_ocr_results(newly_numbered_results)
+            print(f"Batch Handler: Added {len(newly_numbered_results)} blocks from {filename} to model.")
+        # Pages without text are recorded too, so a resume does not OCR them again.
+        if self.checkpoint:
+            self.checkpoint.record_page(filename, newly_numbered_results, self.next_global_row_number)
+
     # ... _handle_image_error() remains the same ...
     def _handle_image_error(self, message):
         """Handles an error from a worker thread."""
         print(f"Batch Handler: An error occurred: {message}")
         self._is_stopped = True
+        self._failed = True
+        self._stop_prefetcher()
+        self._release_page_thread()
+        self._save_run_report('failed')
         self.error_occurred.emit(message)
 
     def _finish_batch(self):
@@ -135,6 +381,21 @@ class BatchOCRHandler(QObject):
         print("Batch Handler: Finishing run.")
         # --- NEW: Directly set the progress bar to 100% ---
         self.progress_bar.update_target_progress(100)
+        self._stop_prefetcher()
+        self._release_page_thread()
+        # The run is complete; stopped or failed runs keep their checkpoint for resuming.
+        if self.checkpoint:
+            self.checkpoint.clear()
+        self._save_run_report('completed')
         self.batch_finished.emit(self.next_global_row_number)
         self.ocr_thread = None
-        gc.collect()
\ No newline at end of file
+        gc.collect()
+
+    def _save_run_report(self, status):
+        """Closes the run report and writes it next to the project file."""
+        if not self.run_report or self.run_report.status != 'running':
+            return
+        self.run_report.finish(status)
+        print(f"Batch Handler: Run {status}. " + self.run_report.summary_text().replace("\n", "; "))
+        if self.model.mmtl_path:
+            self.run_report.save(OCRRunReport.path_for_project(self.model.mmtl_path))
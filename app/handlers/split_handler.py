@@ -4,6 +4,7 @@ from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLab
 from PyQt5.QtCore import QObject, Qt, QRectF
 from PyQt5.QtGui import QPixmap, QPainter, QPen, QColor
 from app.ui.components import ResizableImageLabel
+from app.core.project_archive import list_project_dir, remove_project_file
 import qtawesome as qta
 import os
 
@@ -132,7 +133,7 @@ class SplitHandler(QObject):
         # Get list of existing files to avoid naming conflicts
         existing_files = set()
         try:
-            existing_files = set(os.listdir(images_dir))
+            existing_files = set(list_project_dir(images_dir))
         except OSError:
             pass
         
@@ -173,40 +174,38 @@ class SplitHandler(QObject):
         print("Updating OCR data model...")
         
         # Process each OCR result that belongs to the source image
-        for result in self.main_window.model.ocr_results:
-            if result.get('filename') == source_filename:
-                try:
-                    # Get the Y coordinate of this OCR result
-                    coords = result.get('coordinates', [])
-                    if not coords:
-                        print(f"Warning: OCR result has no coordinates, skipping: {result}")
-                        continue
+        for result in self.main_window.model.results_for_file(source_filename):
+            try:
+                # Get the Y coordinate of this OCR result
+                if result.box is None:
+                    print(f"Warning: OCR result has no coordinates, skipping: {result}")
+                    continue
                     
-                    # Find the minimum Y coordinate of the coordinates
-                    box_y = min(p[1] for p in coords if len(p) >= 2)
+                # The top of the result's box
+                box_y = result.box[1]
                     
-                    # Determine which split section this OCR result belongs to
-                    assigned = False
-                    for data in new_image_data:
-                        if data['y_start'] <= box_y < data['y_end']:
-                            # Update filename to the correct split part
-                            result['filename'] = data['filename']
+                # Determine which split section this OCR result belongs to
+                assigned = False
+                for data in new_image_data:
+                    if data['y_start'] <= box_y < data['y_end']:
+                        # Update filename to the correct split part
+                        result.filename = data['filename']
                             
-                            # Adjust coordinates relative to the new image
-                            y_offset = data['y_start']
-                            if y_offset > 0:
-                                result['coordinates'] = [[p[0], p[1] - y_offset] for p in coords]
+                        # Adjust coordinates relative to the new image
+                        y_offset = data['y_start']
+                        if y_offset > 0:
+                            result.move(0, -y_offset)
                             
-                            assigned = True
-                            print(f"Assigned OCR result at Y={box_y} to {data['filename']} (offset: {y_offset})")
-                            break
+                        assigned = True
+                        print(f"Assigned OCR result at Y={box_y} to {data['filename']} (offset: {y_offset})")
+                        break
                     
-                    if not assigned:
-                        print(f"Warning: Could not assign OCR result at Y={box_y} to any split section")
+                if not assigned:
+                    print(f"Warning: Could not assign OCR result at Y={box_y} to any split section")
                         
-                except (TypeError, ValueError, IndexError) as e:
-                    print(f"Warning: Skipping an OCR result for '{source_filename}' due to malformed data: {e}")
-                    continue
+            except (TypeError, ValueError, IndexError) as e:
+                print(f"Warning: Skipping an OCR result for '{source_filename}' due to malformed data: {e}")
+                continue
 
         # 6. Clean up old file and model's image path list
         source_path_in_model = next((p for p in self.main_window.model.image_paths if os.path.basename(p) == source_filename), None)
@@ -216,7 +215,7 @@ class SplitHandler(QObject):
             for i, data in enumerate(new_image_data):
                 self.main_window.model.image_paths.insert(index + i, data['path'])
             try:
-                os.remove(source_path_in_model)
+                remove_project_file(source_path_in_model) # On disk or still only in the project archive
                 print(f"Deleted original file: {source_path_in_model}")
             except Exception as e:
                 print(f"Warning: Could not delete old image file {source_path_in_model}. Error: {e}")
@@ -4,6 +4,7 @@ from PyQt5.QtWidgets import QWidget, QHBoxLayout, QPushButton, QMessageBox
 from PyQt5.QtCore import QObject, Qt
 from PyQt5.QtGui import QPixmap, QPainter
 from app.ui.components import ResizableImageLabel
+from app.core.project_archive import remove_project_file
 import qtawesome as qta
 import os
 
@@ -165,20 +166,18 @@ class StitchHandler(QObject):
             
             print(f"Processing results for '{current_filename}' with Y-offset: {height_offset}")
 
-            # Iterate through all OCR results to find matches
-            for result in self.main_window.model.ocr_results:
-                if result.get('filename') == current_filename:
-                    # Update filename to the new combined filename
-                    result['filename'] = new_filename
-                    
-                    # Update bounding box coordinates if an offset is needed
-                    if height_offset > 0:
-                        bbox = result.get('bbox', [])
-                        if bbox:
-                            result['bbox'] = [[p[0], p[1] + height_offset] for p in bbox]
-                        coords = result.get('coordinates', [])
-                        if coords:
-                             result['coordinates'] = [[p[0], p[1] + height_offset] for p in coords]
+            # Move this image's OCR results onto the combined image
+            for result in self.main_window.model.results_for_file(current_filename):
+                # Update filename to the new combined filename
+                result.filename = new_filename
+                
+                # Update bounding box coordinates if an offset is needed
+                if height_offset > 0:
+                    result.move(0, height_offset)
+                    # Results from older projects may still carry a legacy 'bbox' key (kept in the record's extras)
+                    bbox = result.get('bbox', [])
+                    if bbox:
+                        result['bbox'] = [[p[0], p[1] + height_offset] for p in bbox]
 
         # --- 4. Clean up old files and main window's image list ---
         filenames_to_remove = [label.filename for label in labels_to_stitch[1:]]
@@ -193,8 +192,8 @@ class StitchHandler(QObject):
                 self.main_window.model.image_paths.remove(original_full_path)
 
             try:
-                if os.path.exists(full_path_to_remove):
-                    os.remove(full_path_to_remove)
+                # The image may exist only inside the project archive
+                remove_project_file(full_path_to_remove)
             except Exception as e:
                 print(f"Warning: Could not delete old image file {full_path_to_remove}. Error: {e}")
 
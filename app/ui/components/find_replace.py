@@ -213,7 +213,7 @@ class FindReplaceWidget(QWidget):
             self.update_match_count_label(); return
 
         flags = re.NOFLAG if case_sensitive else re.IGNORECASE
-        visible_results = [res for res in self.main_window.ocr_results if not res.get('is_deleted', False)]
+        visible_results = [res for res in self.main_window.model.ocr_results if not res.is_deleted]
 
         try:
             # --- Prepare search pattern based on filters ---
@@ -226,9 +226,9 @@ class FindReplaceWidget(QWidget):
 
             # --- Find matches ---
             for result in visible_results:
-                text = result.get('text', '')
-                row_number = result.get('row_number')
-                filename = result.get('filename')
+                text = result.text
+                row_number = result.row_number
+                filename = result.filename
                 if row_number is None: continue
 
                 # Find all matches using the constructed pattern
@@ -349,13 +349,13 @@ class FindReplaceWidget(QWidget):
         if not (0 <= self.current_match_index < len(self.matches)) or not self.replace_row_widget.isVisible(): return
         match_info = self.matches[self.current_match_index]; row_number = match_info['row_number']
         start = match_info['start']; end = match_info['end']
-        result_to_update, _ = self.main_window._find_result_by_row_number(row_number)
-        if not result_to_update or result_to_update.get('is_deleted', False): self.find_text(); return
-        current_text = result_to_update['text']; search_term_len = end - start; replace_term = self.replace_input.text()
+        result_to_update = self.main_window.model.find_result(row_number)
+        if not result_to_update or result_to_update.is_deleted: self.find_text(); return
+        current_text = result_to_update.text; search_term_len = end - start; replace_term = self.replace_input.text()
         if start < len(current_text) and start + search_term_len <= len(current_text):
             new_text = current_text[:start] + replace_term + current_text[start + search_term_len:]
         else: self.find_text(); return
-        result_to_update['text'] = new_text
+        result_to_update.text = new_text
         self._update_ui_text(row_number, new_text)
         self.find_text() # Re-run find
 
@@ -370,7 +370,7 @@ class FindReplaceWidget(QWidget):
         flags = re.NOFLAG if case_sensitive else re.IGNORECASE
 
         replaced_count = 0; rows_updated = set()
-        visible_results_indices = [idx for idx, res in enumerate(self.main_window.ocr_results) if not res.get('is_deleted', False)]
+        visible_results = [res for res in self.main_window.model.ocr_results if not res.is_deleted]
 
         try:
             # --- Prepare search pattern based on filters ---
@@ -379,15 +379,14 @@ class FindReplaceWidget(QWidget):
             if self._match_whole_word: pattern_to_search = r"\b" + pattern_to_search + r"\b"
 
             # --- Perform replacement ---
-            for data_index in visible_results_indices:
-                 result_to_update = self.main_window.ocr_results[data_index]
-                 original_text = result_to_update['text']; row_number = result_to_update['row_number']
+            for result_to_update in visible_results:
+                 original_text = result_to_update.text; row_number = result_to_update.row_number
 
                  # Use re.subn which counts replacements
                  new_text, num_subs = re.subn(pattern_to_search, replace_term, original_text, flags=flags)
 
                  if num_subs > 0:
-                     result_to_update['text'] = new_text; replaced_count += num_subs; rows_updated.add(row_number)
+                     result_to_update.text = new_text; replaced_count += num_subs; rows_updated.add(row_number)
                      self._update_ui_text(row_number, new_text) # Update UI per row
 
         except re.error as e:
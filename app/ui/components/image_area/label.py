@@ -56,6 +56,9 @@ class ResizableImageLabel(QGraphicsView):
         self._is_dragging_split_line = False
         self._dragged_item = None # The specific visual dict being dragged
 
+        # Manual OCR regions queued or being recognized, shown until their results arrive
+        self.pending_region_items = []
+
     def apply_translation(self, main_window, text_entries_by_row, default_style):
         """
         Applies text and styles to the image.
@@ -63,7 +66,7 @@ class ResizableImageLabel(QGraphicsView):
         """
         processed_default_style = self._ensure_gradient_defaults_for_ril(default_style)
         current_entries = {rn: entry for rn, entry in text_entries_by_row.items()
-                           if not entry.get('is_deleted', False)}
+                           if not entry.is_deleted}
         existing_boxes = {tb.row_number: tb for tb in self.text_boxes}
         rows_to_remove_from_list = []
 
@@ -75,7 +78,7 @@ class ResizableImageLabel(QGraphicsView):
             else:
                 entry = current_entries[row_number]
                 display_text = main_window.get_display_text(entry)
-                combined_style = self._combine_styles(processed_default_style, entry.get('custom_style', {}))
+                combined_style = self._combine_styles(processed_default_style, entry.custom_style or {})
                 
                 text_box.text_item.setPlainText(display_text)
                 text_box.apply_styles(combined_style)
@@ -86,18 +89,13 @@ class ResizableImageLabel(QGraphicsView):
         existing_rows_after_removal = {tb.row_number for tb in self.text_boxes}
         for row_number, entry in current_entries.items():
             if row_number not in existing_rows_after_removal:
-                coords = entry.get('coordinates') or entry.get('bbox')
-                if not coords: continue
-                try:
-                    x = min(p[0] for p in coords); y = min(p[1] for p in coords)
-                    width = max(p[0] for p in coords) - x; height = max(p[1] for p in coords) - y
-                    if width <= 0 or height <= 0: continue
-                except Exception as e:
-                    print(f"Error processing coords for new row {row_number}: {coords} -> {e}")
-                    continue
+                if entry.box is None: continue
+                x, y, x_max, y_max = entry.box
+                width = x_max - x; height = y_max - y
+                if width <= 0 or height <= 0: continue
                 
                 display_text = main_window.get_display_text(entry)
-                combined_style = self._combine_styles(processed_default_style, entry.get('custom_style', {}))
+                combined_style = self._combine_styles(processed_default_style, entry.custom_style or {})
                 
                 text_box = TextBoxItem (QRectF(x, y, width, height),
                                          row_number,
@@ -287,6 +285,25 @@ class ResizableImageLabel(QGraphicsView):
         self._is_selection_active = False
         self.set_manual_selection_enabled(self._is_manual_select_active)
 
+    def add_pending_region(self, rect_scene):
+        """Marks a manual OCR region (scene coordinates) as pending. Returns the overlay item."""
+        item = QGraphicsRectItem(rect_scene)
+        item.setBrush(QColor(255, 152, 0, 60)) # Orange, semi-transparent
+        item.setPen(QPen(QColor(255, 152, 0), 2, Qt.DashLine))
+        item.setZValue(900)
+        self.scene().addItem(item)
+        self.pending_region_items.append(item)
+        return item
+
+    def remove_pending_region(self, item):
+        if item in self.pending_region_items:
+            self.pending_region_items.remove(item)
+            if self.scene(): self.scene().removeItem(item)
+
+    def clear_pending_regions(self):
+        for item in self.pending_region_items[:]:
+            self.remove_pending_region(item)
+
     def hasHeightForWidth(self):
         return True
 
@@ -411,6 +428,7 @@ class ResizableImageLabel(QGraphicsView):
                 self.scene().removeItem(visual['line'])
                 self.scene().removeItem(visual['handle'])
             self.split_visuals = []
+            self.pending_region_items = []
             self.scene().clear()
         self.setScene(None)
 
@@ -101,10 +101,10 @@ class ResultsWidget(QWidget):
     def update_simple_view(self):
         self.main_window._clear_layout(self.simple_scroll_layout)
         # --- FIX: Access ocr_results from the model ---
-        visible_results = [res for res in self.main_window.model.ocr_results if not res.get('is_deleted', False)]
+        visible_results = [res for res in self.main_window.model.ocr_results if not res.is_deleted]
 
         for result in visible_results:
-            original_row_number = result['row_number']
+            original_row_number = result.row_number
             container = QWidget()
             container.setProperty("ocr_row_number", original_row_number)
             container.setObjectName(f"SimpleViewRowContainer_{original_row_number}")
@@ -141,7 +141,7 @@ class ResultsWidget(QWidget):
     def update_results_table(self):
         self.results_table.blockSignals(True)
         # --- FIX: Access ocr_results from the model ---
-        visible_results = [res for res in self.main_window.model.ocr_results if not res.get('is_deleted', False)]
+        visible_results = [res for res in self.main_window.model.ocr_results if not res.is_deleted]
         self.results_table.setRowCount(len(visible_results))
 
         # --- NEW: Update header to show active profile ---
@@ -150,7 +150,7 @@ class ResultsWidget(QWidget):
         self.results_table.setHorizontalHeaderLabels([header_text, "Confidence", "Coordinates", "File", "Row Number", ""])
 
         for visible_row_index, result in enumerate(visible_results):
-            original_row_number = result['row_number']
+            original_row_number = result.row_number
             try:
                  rn_float = float(original_row_number)
                  display_row_number = f"{int(rn_float)}" if rn_float.is_integer() else f"{rn_float:.1f}"
@@ -164,7 +164,7 @@ class ResultsWidget(QWidget):
             text_item.setData(Qt.UserRole, original_row_number)
             self.results_table.setItem(visible_row_index, 0, text_item)
 
-            conf_val = result.get('confidence', float('nan'))
+            conf_val = result.confidence
             conf_str = f"{conf_val:.2f}" if not math.isnan(conf_val) else "N/A"
             confidence_item = QTableWidgetItem(conf_str)
             confidence_item.setTextAlignment(Qt.AlignCenter)
@@ -172,14 +172,14 @@ class ResultsWidget(QWidget):
             confidence_item.setData(Qt.UserRole, original_row_number)
             self.results_table.setItem(visible_row_index, 1, confidence_item)
 
-            coord_str = str(result.get('coordinates', 'N/A'))
+            coord_str = str(result.coordinates) if result.box is not None else 'N/A'
             coord_item = QTableWidgetItem(coord_str)
             coord_item.setTextAlignment(Qt.AlignCenter)
             coord_item.setFlags(coord_item.flags() & ~Qt.ItemIsEditable)
             coord_item.setData(Qt.UserRole, original_row_number)
             self.results_table.setItem(visible_row_index, 2, coord_item)
 
-            file_item = QTableWidgetItem(result.get('filename', 'N/A'))
+            file_item = QTableWidgetItem(result.filename or 'N/A')
             file_item.setTextAlignment(Qt.AlignCenter)
             file_item.setFlags(file_item.flags() & ~Qt.ItemIsEditable)
             file_item.setData(Qt.UserRole, original_row_number)
@@ -367,11 +367,11 @@ class ResultsWidget(QWidget):
 
         selected_results = []; filename_set = set(); contains_float = False
         for rn_float in selected_original_row_numbers:
-            result, _ = self.main_window._find_result_by_row_number(rn_float)
-            if result and not result.get('is_deleted', False):
+            result = self.main_window.model.find_result(rn_float)
+            if result and not result.is_deleted:
                 selected_results.append(result)
-                filename_set.add(result.get('filename'))
-                rn_orig = result.get('row_number')
+                filename_set.add(result.filename)
+                rn_orig = result.row_number
                 if isinstance(rn_orig, float) and not rn_orig.is_integer(): contains_float = True
             else: QMessageBox.critical(self, "Error", f"Result {rn_float} not found/deleted."); return
 
@@ -381,15 +381,15 @@ class ResultsWidget(QWidget):
         is_adjacent = all(math.isclose(selected_original_row_numbers[i+1] - selected_original_row_numbers[i], 1.0) for i in range(len(selected_original_row_numbers) - 1))
         if not is_adjacent: QMessageBox.warning(self, "Warning", "Selected standard rows must be a contiguous sequence."); return
 
-        selected_results.sort(key=lambda x: float(x.get('row_number', float('inf'))))
+        selected_results.sort(key=lambda x: float(x.row_number))
         # --- MODIFIED: Combine the currently displayed text, not the original OCR text ---
         combined_text_list = [self.main_window.get_display_text(res) for res in selected_results]
-        min_confidence = min(res.get('confidence', 0.0) for res in selected_results)
+        min_confidence = min(res.confidence for res in selected_results)
         first_result = selected_results[0]
-        rows_to_delete = [res['row_number'] for res in selected_results[1:]]
+        rows_to_delete = [res.row_number for res in selected_results[1:]]
 
         self.main_window.combine_rows_in_model(
-            first_result['row_number'],
+            first_result.row_number,
             '\n'.join(combined_text_list),
             min_confidence,
             rows_to_delete
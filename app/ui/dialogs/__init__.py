@@ -1,3 +1,4 @@
 from app.ui.dialogs.project_dialog import NewProjectDialog, ImportWFWFDialog
 from app.ui.dialogs.settings_dialog import SettingsDialog, GEMINI_MODELS_WITH_INFO
+from app.ui.dialogs.page_select_dialog import PageSelectDialog
 from app.ui.dialogs.BetterColorDialog.MainDialog import CustomColorDialog
\ No newline at end of file
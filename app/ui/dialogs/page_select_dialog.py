@@ -0,0 +1,65 @@
+from PyQt5.QtWidgets import QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QListWidget, QListWidgetItem, QDialog
+from PyQt5.QtCore import Qt
+from assets import WFWF_STYLES
+
+class PageSelectDialog(QDialog):
+    """
+    Lets the user tick the pages of the project to OCR again.
+    Pages that already have OCR results show their block count.
+    """
+    def __init__(self, filenames, block_counts=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Re-OCR Pages")
+        self.setMinimumSize(420, 480)
+        block_counts = block_counts or {}
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        layout.addWidget(QLabel("Select the pages to OCR again.\n"
+                                "Their automatic results are replaced, manual results and other pages are kept."))
+
+        self.page_list = QListWidget()
+        for filename in filenames:
+            count = block_counts.get(filename, 0)
+            item = QListWidgetItem(f"{filename}  ({count} blocks)" if count else f"{filename}  (no text)")
+            item.setData(Qt.UserRole, filename)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            self.page_list.addItem(item)
+        self.page_list.itemChanged.connect(self._update_ok_button)
+        layout.addWidget(self.page_list)
+
+        selection_layout = QHBoxLayout()
+        btn_all = QPushButton("Select All")
+        btn_all.clicked.connect(lambda: self._set_all(Qt.Checked))
+        btn_none = QPushButton("Select None")
+        btn_none.clicked.connect(lambda: self._set_all(Qt.Unchecked))
+        selection_layout.addWidget(btn_all)
+        selection_layout.addWidget(btn_none)
+        selection_layout.addStretch()
+        layout.addLayout(selection_layout)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.ok_btn = QPushButton("Re-OCR")
+        self.ok_btn.setEnabled(False)
+        self.ok_btn.clicked.connect(self.accept)
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(self.ok_btn)
+        button_layout.addWidget(cancel_btn)
+        layout.addLayout(button_layout)
+
+        self.setStyleSheet(WFWF_STYLES)
+
+    def _set_all(self, state):
+        for i in range(self.page_list.count()):
+            self.page_list.item(i).setCheckState(state)
+
+    def _update_ok_button(self):
+        self.ok_btn.setEnabled(bool(self.selected_filenames()))
+
+    def selected_filenames(self):
+        """Returns the ticked filenames, in page order."""
+        return [self.page_list.item(i).data(Qt.UserRole) for i in range(self.page_list.count())
+                if self.page_list.item(i).checkState() == Qt.Checked]
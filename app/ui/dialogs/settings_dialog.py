@@ -2,6 +2,7 @@ from PyQt5.QtWidgets import (QDialog, QDoubleSpinBox, QVBoxLayout, QFormLayout,
                              QComboBox, QSpinBox, QDialogButtonBox, QTabWidget,
                              QWidget, QLineEdit, QKeySequenceEdit, QCheckBox) # Added QLabel
 from PyQt5.QtGui import QKeySequence
+import os
 
 GEMINI_MODELS_WITH_INFO = [
     ("gemini-2.5-flash", "500 req/day (free tier)"),
@@ -91,11 +92,25 @@ class SettingsDialog(QDialog):
 
         # Decoder
         self.decoder_combo = QComboBox()
-        self.decoder_combo.addItems(["beamsearch", "greedy"])
+        self.decoder_combo.addItems(["beamsearch", "greedy", "adaptive"])
         self.decoder_combo.setCurrentText(self.settings.value("ocr_decoder", "beamsearch")) # Default beamsearch
-        self.decoder_combo.setToolTip("'beamsearch' is generally more accurate but slower. 'greedy' is faster.")
+        self.decoder_combo.setToolTip("'beamsearch' is generally more accurate but slower. 'greedy' is faster. "
+                                      "'adaptive' reads greedily and re-reads only low-confidence text with beam search.")
         form_layout.addRow("OCR Decoder:", self.decoder_combo)
 
+        # Adaptive Decoder Threshold
+        self.adaptive_threshold_spin = QDoubleSpinBox()
+        self.adaptive_threshold_spin.setRange(0.0, 1.0)
+        self.adaptive_threshold_spin.setSingleStep(0.05)
+        self.adaptive_threshold_spin.setDecimals(2)
+        self.adaptive_threshold_spin.setValue(float(self.settings.value("ocr_adaptive_threshold", 0.5))) # Default 0.5
+        self.adaptive_threshold_spin.setToolTip("With the 'adaptive' decoder, text read with less confidence than this (or close to the "
+                                                "minimum confidence filter) is read again with beam search.")
+        self.adaptive_threshold_spin.setEnabled(self.decoder_combo.currentText() == "adaptive")
+        self.decoder_combo.currentTextChanged.connect(
+            lambda decoder: self.adaptive_threshold_spin.setEnabled(decoder == "adaptive"))
+        form_layout.addRow("Beam Search Below Confidence:", self.adaptive_threshold_spin)
+
         # Adjust Contrast
         self.contrast_spin = QDoubleSpinBox()
         self.contrast_spin.setRange(0.0, 1.0)
@@ -114,11 +129,121 @@ class SettingsDialog(QDialog):
         self.resize_threshold_spin.setToolTip("Resize images wider than this before OCR. Set to 0 to disable resizing.")
         form_layout.addRow("OCR Resize Threshold (Max Width):", self.resize_threshold_spin)
 
+        # Detection Resize Threshold (Max Width)
+        self.detect_resize_threshold_spin = QSpinBox()
+        self.detect_resize_threshold_spin.setRange(0, 8192) # 0 for disable
+        self.detect_resize_threshold_spin.setSuffix(" px")
+        self.detect_resize_threshold_spin.setSpecialValueText("Same as OCR") # Show text when value is 0
+        self.detect_resize_threshold_spin.setValue(int(self.settings.value("ocr_detect_resize_threshold", 0))) # Default disabled
+        self.detect_resize_threshold_spin.setToolTip("Find text on a copy of the image shrunk to this width, then read it from the image at the OCR resize threshold above. "
+                                                     "A small value (e.g. 512) speeds up detection; combine with a large or disabled resize threshold to read small fonts at full resolution.")
+        form_layout.addRow("Text Detection Max Width:", self.detect_resize_threshold_spin)
+
         # --- END NEW EASYOCR SETTINGS ---
 
         processing_tab.setLayout(form_layout)
         self.tab_widget.addTab(processing_tab, "OCR Processing")
 
+        # --- Performance Settings Tab ---
+        performance_tab = QWidget()
+        performance_layout = QFormLayout()
+
+        # Worker Processes
+        self.worker_processes_spin = QSpinBox()
+        self.worker_processes_spin.setRange(1, max(1, os.cpu_count() or 1))
+        self.worker_processes_spin.setValue(int(self.settings.value("ocr_worker_processes", 1))) # Default 1 (in-process)
+        self.worker_processes_spin.setToolTip("Number of OCR worker processes, each with its own reader. 1 runs OCR in the app itself.")
+        performance_layout.addRow("OCR Worker Processes:", self.worker_processes_spin)
+
+        # Torch Threads per Worker
+        self.torch_threads_spin = QSpinBox()
+        self.torch_threads_spin.setRange(0, max(1, os.cpu_count() or 1))
+        self.torch_threads_spin.setSpecialValueText("Auto") # Show text when value is 0
+        self.torch_threads_spin.setValue(int(self.settings.value("ocr_torch_threads", 0))) # Default Auto
+        self.torch_threads_spin.setToolTip("CPU threads used by each worker process. Auto splits the cores evenly between workers.")
+        performance_layout.addRow("Threads per Worker:", self.torch_threads_spin)
+
+        # Prefetch Queue Depth
+        self.prefetch_depth_spin = QSpinBox()
+        self.prefetch_depth_spin.setRange(0, 16)
+        self.prefetch_depth_spin.setSpecialValueText("Disabled") # Show text when value is 0
+        self.prefetch_depth_spin.setValue(int(self.settings.value("ocr_prefetch_depth", 2))) # Default 2
+        self.prefetch_depth_spin.setToolTip("Number of upcoming pages decoded and preprocessed in the background while OCR runs. Higher uses more memory.")
+        performance_layout.addRow("Prefetch Queue Depth:", self.prefetch_depth_spin)
+
+        # Tile Height
+        self.tile_height_spin = QSpinBox()
+        self.tile_height_spin.setRange(0, 20000) # 0 for disable
+        self.tile_height_spin.setSuffix(" px")
+        self.tile_height_spin.setSpecialValueText("Disabled") # Show text when value is 0
+        self.tile_height_spin.setValue(int(self.settings.value("ocr_tile_height", 0))) # Default disabled
+        self.tile_height_spin.setToolTip("OCR very tall images in horizontal bands of this height (after resizing) to bound memory use. Set to 0 to disable.")
+        performance_layout.addRow("OCR Tile Height:", self.tile_height_spin)
+
+        # Tile Overlap
+        self.tile_overlap_spin = QSpinBox()
+        self.tile_overlap_spin.setRange(0, 5000)
+        self.tile_overlap_spin.setSuffix(" px")
+        self.tile_overlap_spin.setValue(int(self.settings.value("ocr_tile_overlap", 200))) # Default 200
+        self.tile_overlap_spin.setToolTip("Overlap between consecutive tiles. Should be larger than the tallest text line so no line is cut in every tile.")
+        performance_layout.addRow("OCR Tile Overlap:", self.tile_overlap_spin)
+
+        # Cross-Page Recognition Batches
+        self.cross_page_batch_spin = QSpinBox()
+        self.cross_page_batch_spin.setRange(0, 64) # 0 for disable
+        self.cross_page_batch_spin.setSpecialValueText("Disabled") # Show text when value is 0
+        self.cross_page_batch_spin.setValue(int(self.settings.value("ocr_cross_page_batch", 0))) # Default disabled
+        self.cross_page_batch_spin.setToolTip("Detect text on this many pages first, then recognize all their text regions together in full batches. Helps most on GPU. Ignored with several worker processes.")
+        performance_layout.addRow("Pages per Recognition Batch:", self.cross_page_batch_spin)
+
+        # Blank-Band Skipping
+        self.skip_blank_bands_check = QCheckBox()
+        self.skip_blank_bands_check.setChecked(
+            self.settings.value("ocr_skip_blank_bands", "false").lower() == "true" # Default to False
+        )
+        self.skip_blank_bands_check.setToolTip("Skip flat background between panels and only run text detection on the parts of the page with content. "
+                                               "Faster, but faint or low-contrast text on a near-flat background can be missed.")
+        performance_layout.addRow("Skip blank bands:", self.skip_blank_bands_check)
+
+        # Duplicate Page Detection
+        self.duplicate_distance_spin = QSpinBox()
+        self.duplicate_distance_spin.setRange(-1, 16) # -1 for disable
+        self.duplicate_distance_spin.setSpecialValueText("Disabled") # Show text when value is -1
+        self.duplicate_distance_spin.setValue(int(self.settings.value("ocr_duplicate_max_distance", -1))) # Default disabled
+        self.duplicate_distance_spin.setToolTip("Pages whose pixels are identical to an earlier page of the batch (credits, repeated recaps, duplicate downloads) "
+                                                "get a copy of its text instead of being OCRed. Pages within this perceptual hash distance "
+                                                "are compared pixel by pixel; higher values check more pairs. "
+                                                "Near-identical pages, e.g. re-saved as JPEG, are never copied.")
+        performance_layout.addRow("Duplicate Page Tolerance:", self.duplicate_distance_spin)
+
+        # OCR Result Cache
+        self.cache_enabled_check = QCheckBox()
+        self.cache_enabled_check.setChecked(
+            self.settings.value("ocr_cache_enabled", "true").lower() == "true" # Default to True
+        )
+        self.cache_enabled_check.setToolTip("Reuse OCR results for unchanged images. Changing only filter or merge settings skips recognition entirely.")
+        performance_layout.addRow("Cache OCR results:", self.cache_enabled_check)
+
+        # Cache Size Limit
+        self.cache_size_spin = QSpinBox()
+        self.cache_size_spin.setRange(16, 16384)
+        self.cache_size_spin.setSuffix(" MB")
+        self.cache_size_spin.setValue(int(self.settings.value("ocr_cache_max_mb", 512))) # Default 512 MB
+        self.cache_size_spin.setToolTip("Least recently used entries are removed when the cache grows past this size.")
+        performance_layout.addRow("OCR Cache Size Limit:", self.cache_size_spin)
+
+        # OCR Engine
+        self.engine_combo = QComboBox()
+        self.engine_combo.addItem("EasyOCR", "easyocr")
+        self.engine_combo.addItem("Fake (offline benchmark)", "fake")
+        engine_index = self.engine_combo.findData(self.settings.value("ocr_engine", "easyocr")) # Default EasyOCR
+        self.engine_combo.setCurrentIndex(max(0, engine_index))
+        self.engine_combo.setToolTip("The fake engine returns scripted text instantly, to measure the rest of the pipeline without OCR models.")
+        performance_layout.addRow("OCR Engine:", self.engine_combo)
+
+        performance_tab.setLayout(performance_layout)
+        self.tab_widget.addTab(performance_tab, "Performance")
+
         # --- API Settings Tab ---
         api_tab = QWidget()
         api_layout = QFormLayout()
@@ -208,8 +333,25 @@ class SettingsDialog(QDialog):
         # Save new EasyOCR settings
         self.settings.setValue("ocr_batch_size", self.batch_size_spin.value())
         self.settings.setValue("ocr_decoder", self.decoder_combo.currentText())
+        self.settings.setValue("ocr_adaptive_threshold", self.adaptive_threshold_spin.value())
         self.settings.setValue("ocr_adjust_contrast", self.contrast_spin.value())
         self.settings.setValue("ocr_resize_threshold", self.resize_threshold_spin.value())
+        self.settings.setValue("ocr_detect_resize_threshold", self.detect_resize_threshold_spin.value())
+
+        # Save Performance settings
+        self.settings.setValue("ocr_worker_processes", self.worker_processes_spin.value())
+        self.settings.setValue("ocr_torch_threads", self.torch_threads_spin.value())
+        self.settings.setValue("ocr_prefetch_depth", self.prefetch_depth_spin.value())
+        self.settings.setValue("ocr_tile_height", self.tile_height_spin.value())
+        self.settings.setValue("ocr_tile_overlap", self.tile_overlap_spin.value())
+        self.settings.setValue("ocr_cross_page_batch", self.cross_page_batch_spin.value())
+        self.settings.setValue("ocr_skip_blank_bands",
+            "true" if self.skip_blank_bands_check.isChecked() else "false")
+        self.settings.setValue("ocr_duplicate_max_distance", self.duplicate_distance_spin.value())
+        self.settings.setValue("ocr_cache_enabled",
+            "true" if self.cache_enabled_check.isChecked() else "false")
+        self.settings.setValue("ocr_cache_max_mb", self.cache_size_spin.value())
+        self.settings.setValue("ocr_engine", self.engine_combo.currentData())
 
         # Save API settings
         self.settings.setValue("gemini_api_key", self.api_key_edit.text())
@@ -107,9 +107,14 @@ class ActionMenu(QWidget):
         btn_stitch_images.clicked.connect(lambda: (self.main_window.stitch_images(), self.close()))
         layout.addWidget(btn_stitch_images)
 
+        btn_reocr_pages = QPushButton(qta.icon('fa5s.redo', color='white'), " Re-OCR Pages")
+        btn_reocr_pages.clicked.connect(lambda: (self.close(), self.main_window.reocr_pages()))
+        layout.addWidget(btn_reocr_pages)
+
         # Placeholders
         btn_hide_text.setEnabled(False)
         btn_split_images.setEnabled(True)
         btn_stitch_images.setEnabled(True)
+        btn_reocr_pages.setEnabled(bool(self.main_window.model.image_paths) and not self.main_window.batch_handler)
 
         self.setFixedSize(self.sizeHint())
\ No newline at end of file
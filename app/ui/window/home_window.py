@@ -3,9 +3,7 @@
 
 import sys
 import os
-import zipfile
 import tempfile
-import time
 from shutil import rmtree
 import traceback
 
@@ -16,6 +14,7 @@ from app.utils import new_project, open_project, import_from_wfwf, correct_filen
 from assets.styles import (HOME_STYLES, HOME_LEFT_LAYOUT_STYLES)
 from app.ui.window import CustomTitleBar, WindowResizer
 from app.ui.widgets import TitleBarState
+from app.core.project_archive import extract_project_metadata
 
 
 class ProjectItemWidget(QFrame):
@@ -173,21 +172,17 @@ class ProjectLoaderThread(QThread):
         try:
             self.progress_update.emit("Creating secure temporary workspace...")
             temp_dir = tempfile.mkdtemp()
-            time.sleep(0.5)
 
-            self.progress_update.emit(f"Extracting '{os.path.basename(self.mmtl_path)}'...")
-            with zipfile.ZipFile(self.mmtl_path, 'r') as zipf:
-                zipf.extractall(temp_dir)
-            time.sleep(0.5)
+            # Page images stay in the archive and are read from it on demand (see ProjectArchive)
+            self.progress_update.emit(f"Reading '{os.path.basename(self.mmtl_path)}'...")
+            extract_project_metadata(self.mmtl_path, temp_dir)
 
             self.progress_update.emit("Verifying project structure...")
             required = ['meta.json', 'master.json', 'images/']
             if not all(os.path.exists(os.path.join(temp_dir, p)) for p in required):
                 raise Exception("Invalid .mmtl file structure.")
-            time.sleep(0.5)
 
             self.progress_update.emit("Loading main application...")
-            time.sleep(0.7)
 
             self.finished.emit(self.mmtl_path, temp_dir)
         except Exception as e:
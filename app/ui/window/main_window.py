@@ -1,6 +1,6 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QSizePolicy, QCheckBox, QPushButton,
-                             QMessageBox, QSplitter, QAction, QLabel, QComboBox)
-from PyQt5.QtCore import Qt, QSettings, QPoint
+                             QMessageBox, QSplitter, QAction, QLabel, QComboBox, QApplication, QDialog)
+from PyQt5.QtCore import Qt, QSettings, QPoint, QStandardPaths, QTimer
 from PyQt5.QtGui import QPixmap, QKeySequence, QColor
 import qtawesome as qta
 from app.utils.file_io import export_ocr_results, import_translation_file, export_rendered_images
@@ -8,11 +8,15 @@ from app.ui.components import ResizableImageLabel, CustomScrollArea, ResultsWidg
 from app.ui.widgets import CustomProgressBar, MenuBar, ImportExportMenu, SaveMenu, ActionMenu
 from app.handlers import BatchOCRHandler, ManualOCRHandler, StitchHandler, SplitHandler
 from app.core import ProjectModel
-from app.ui.dialogs import SettingsDialog
+from app.core.ocr_cache import OCRResultCache
+from app.core.ocr_checkpoint import OCRCheckpoint
+from app.core.reader_registry import ReaderRegistry
+from app.core.project_archive import read_project_file
+from app.ui.dialogs import SettingsDialog, PageSelectDialog
 from app.ui.window.translation_window import TranslationWindow
 from assets import (COLORS, MAIN_STYLESHEET, IV_BUTTON_STYLES, ADVANCED_CHECK_STYLES, RIGHT_WIDGET_STYLES,
                     DEFAULT_TEXT_STYLE, DELETE_ROW_STYLES, get_style_diff, MANUALOCR_STYLES)
-import easyocr, os, gc, json, traceback
+import os, gc, json, traceback
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -290,6 +294,8 @@ class MainWindow(QMainWindow):
         if dialog.exec_():
             self._load_filter_settings()
             self.update_shortcut()
+            if self.model.image_paths:
+                self._preload_ocr_reader() # The GPU setting may have changed
 
     def toggle_find_widget(self):
         if self.find_replace_widget.isVisible():
@@ -338,7 +344,8 @@ class MainWindow(QMainWindow):
 
         for image_path in image_paths:
             try:
-                 pixmap = QPixmap(image_path)
+                 pixmap = QPixmap()
+                 pixmap.loadFromData(read_project_file(image_path)) # Usually straight from the archive
                  if pixmap.isNull(): continue
                  filename = os.path.basename(image_path)
                  label = ResizableImageLabel(pixmap, filename)
@@ -353,6 +360,38 @@ class MainWindow(QMainWindow):
         self.update_profile_selector()
         self.on_model_updated(None) # None signifies a full refresh
         print(f"Project '{self.model.project_name}' loaded and UI populated.")
+        # The project language is known now; warm up the reader while the user looks around
+        self._preload_ocr_reader()
+        # Let the window paint before asking about an interrupted run
+        QTimer.singleShot(0, self._offer_ocr_resume)
+
+    def _offer_ocr_resume(self):
+        """Offers to continue an OCR run that was interrupted (stopped, crashed or closed)."""
+        checkpoint = self._create_ocr_checkpoint()
+        state = checkpoint.load() if checkpoint else None
+        if not state or not state['completed'] or self.batch_handler:
+            return
+
+        filenames = [os.path.basename(p) for p in self.model.image_paths]
+        completed = set(state['completed'])
+        remaining = [i for i, f in enumerate(filenames) if f not in completed]
+        done_count = len(filenames) - len(remaining)
+        if remaining:
+            question = (f"An unfinished OCR run was found for this project ({done_count} of {len(filenames)} pages done).\n\n"
+                        f"Resume from page {remaining[0] + 1}? Choosing 'No' discards the saved progress.")
+        else:
+            question = ("An OCR run for this project completed all pages but its results were not kept.\n\n"
+                        "Restore those results? Choosing 'No' discards them.")
+        reply = QMessageBox.question(self, "Resume OCR", question, QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+        if reply != QMessageBox.Yes:
+            checkpoint.clear()
+            return
+
+        if remaining:
+            self._start_ocr_run(resume_state=state)
+        else:
+            self.model.restore_checkpoint_results(state['results'], state['next_global_row_number'])
+            checkpoint.clear()
     
     def on_model_updated(self, affected_filenames):
         """ SLOT: Handles the model_updated signal. Refreshes all relevant views. """
@@ -368,11 +407,11 @@ class MainWindow(QMainWindow):
 
         self._is_handling_selection = True
         try:
-            target_result, _ = self.model._find_result_by_row_number(row_number)
+            target_result = self.model.find_result(row_number)
             if not target_result:
                 return
 
-            filename = target_result.get('filename')
+            filename = target_result.filename
             if not filename:
                 return
             
@@ -472,9 +511,9 @@ class MainWindow(QMainWindow):
              else:
                  style[k] = v
 
-        target_result, _ = self.model._find_result_by_row_number(row_number)
+        target_result = self.model.find_result(row_number)
         if target_result:
-            custom_style = target_result.get('custom_style', {})
+            custom_style = target_result.custom_style or {}
             for k, v in custom_style.items():
                  if k in ['bg_color', 'border_color', 'text_color']:
                      style[k] = QColor(v)
@@ -488,13 +527,13 @@ class MainWindow(QMainWindow):
             return
 
         row_number = self.selected_text_box_item.row_number
-        target_result, _ = self.model._find_result_by_row_number(row_number)
+        target_result = self.model.find_result(row_number)
 
         if not target_result:
             print(f"Error: Could not find result for row {row_number} to apply style.")
             return
 
-        if target_result.get('is_deleted', False):
+        if target_result.is_deleted:
              print(f"Warning: Attempting to style a deleted row ({row_number}). Ignoring.")
              return
         
@@ -502,26 +541,40 @@ class MainWindow(QMainWindow):
 
         # The model doesn't need to be updated here unless styling is part of the save data
         if style_diff:
-            target_result['custom_style'] = style_diff
+            target_result.custom_style = style_diff
             print(f"Stored custom style diff for row {row_number}: {style_diff}")
-        elif 'custom_style' in target_result:
-            del target_result['custom_style']
+        elif target_result.custom_style is not None:
+            target_result.custom_style = None
             print(f"Removed custom style for row {row_number} (back to default).")
 
         self.selected_text_box_item.apply_styles(new_style_dict)
 
+    def _reader_key(self):
+        """Returns the (language code, GPU flag, engine name) of the reader this project needs."""
+        # Get language from the model
+        lang_code = self.language_map.get(self.model.original_language, 'ko')
+        use_gpu = self.settings.value("use_gpu", "true").lower() == "true"
+        engine_name = self.settings.value("ocr_engine", "easyocr")
+        return lang_code, use_gpu, engine_name
+
+    def _preload_ocr_reader(self):
+        """Starts loading the shared OCR reader in the background, so the first OCR starts instantly."""
+        ReaderRegistry.instance().preload(*self._reader_key())
+
     def _initialize_ocr_reader(self, context="OCR"):
-        """Initializes the EasyOCR reader if it doesn't exist."""
-        if self.reader:
-            print("EasyOCR reader already initialized.")
-            return True
+        """Fetches the shared OCR reader, waiting for it only if it is still loading."""
+        reader_key = self._reader_key()
+        registry = ReaderRegistry.instance()
         try:
-            # Get language from the model
-            lang_code = self.language_map.get(self.model.original_language, 'ko')
-            use_gpu = self.settings.value("use_gpu", "true").lower() == "true"
-            print(f"Initializing EasyOCR reader for {context}: Lang='{lang_code}', GPU={use_gpu}")
-            self.reader = easyocr.Reader([lang_code], gpu=use_gpu)
-            print("EasyOCR reader initialized successfully.")
+            if not registry.is_ready(*reader_key):
+                print(f"Waiting for OCR reader for {context}: Lang='{reader_key[0]}', GPU={reader_key[1]}, Engine='{reader_key[2]}'")
+                QApplication.setOverrideCursor(Qt.WaitCursor)
+                try:
+                    self.reader = registry.get(*reader_key)
+                finally:
+                    QApplication.restoreOverrideCursor()
+            else:
+                self.reader = registry.get(*reader_key)
             return True
         except Exception as e:
             error_msg = f"Failed to initialize OCR reader for {context}: {str(e)}\n\n" \
@@ -535,9 +588,38 @@ class MainWindow(QMainWindow):
             self.reader = None
             return False
 
-    def _find_result_by_row_number(self, row_number_to_find):
-        """ DELEGATED: Asks the model to find the result. """
-        return self.model._find_result_by_row_number(row_number_to_find)
+    def _get_pool_settings(self):
+        """Reads the multi-process OCR settings (1 worker = classic single-thread path)."""
+        return {
+            "num_workers": int(self.settings.value("ocr_worker_processes", 1)),
+            "torch_threads": int(self.settings.value("ocr_torch_threads", 0)),
+            "lang_code": self.language_map.get(self.model.original_language, 'ko'),
+            "use_gpu": self.settings.value("use_gpu", "true").lower() == "true",
+            "engine_name": self.settings.value("ocr_engine", "easyocr"),
+        }
+
+    def _create_ocr_cache(self):
+        """Returns the per-user OCR result cache, or None if it is disabled or unavailable."""
+        if self.settings.value("ocr_cache_enabled", "true").lower() != "true":
+            return None
+        try:
+            cache_root = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+            max_mb = int(self.settings.value("ocr_cache_max_mb", 512))
+            return OCRResultCache(
+                os.path.join(cache_root, "ocr_cache"),
+                language=self.language_map.get(self.model.original_language, 'ko'),
+                engine_name=self.settings.value("ocr_engine", "easyocr"),
+                max_bytes=max_mb * 1024 * 1024
+            )
+        except OSError as e:
+            print(f"Warning: OCR cache unavailable, continuing without it: {e}")
+            return None
+
+    def _create_ocr_checkpoint(self):
+        """Returns the checkpoint stored next to the project file, or None for an unsaved project."""
+        if not self.model.mmtl_path:
+            return None
+        return OCRCheckpoint(OCRCheckpoint.path_for_project(self.model.mmtl_path))
 
     def _clear_layout(self, layout):
         if layout is not None:
@@ -556,16 +638,12 @@ class MainWindow(QMainWindow):
 
         # 2. Update the text boxes on the images in the left panel.
         # Group all relevant results from the model by filename for efficient lookup.
+        # The model keeps its results bucketed per file, so a filtered update only reads the affected pages.
+        filenames = affected_filenames if affected_filenames else self.model.ocr_results.filenames()
         grouped_results = {}
-        for result in self.model.ocr_results:
-            filename = result.get('filename')
+        for filename in filenames:
             if filename:
-                # If a filter is active, skip files not in the list.
-                if affected_filenames and filename not in affected_filenames:
-                    continue
-                if filename not in grouped_results:
-                    grouped_results[filename] = {}
-                grouped_results[filename][result.get('row_number')] = result
+                grouped_results[filename] = {result.row_number: result for result in self.model.results_for_file(filename)}
 
         # 3. Iterate through the image widgets and update their displayed text.
         for i in range(self.scroll_layout.count()):
@@ -582,6 +660,30 @@ class MainWindow(QMainWindow):
 
     # --- METHOD MODIFIED (Simplified) ---
     def start_ocr(self):
+        self._start_ocr_run()
+
+    def reocr_pages(self):
+        """Lets the user pick pages and OCRs only those again, keeping the rest of the project."""
+        if not self.model.image_paths:
+            QMessageBox.warning(self, "Warning", "No images loaded to process.")
+            return
+        if self.batch_handler:
+            QMessageBox.warning(self, "Warning", "OCR is already running.")
+            return
+        block_counts = {}
+        for result in self.model.ocr_results:
+            if not result.is_manual and not result.is_deleted:
+                block_counts[result.filename] = block_counts.get(result.filename, 0) + 1
+        filenames = [os.path.basename(p) for p in self.model.image_paths]
+        dialog = PageSelectDialog(filenames, block_counts, self)
+        if dialog.exec_() == QDialog.Accepted:
+            self._start_ocr_run(reocr_filenames=dialog.selected_filenames())
+
+    def _start_ocr_run(self, resume_state=None, reocr_filenames=None):
+        """
+        Starts a full OCR run, continues the one described by a loaded checkpoint state,
+        or OCRs only the pages in reocr_filenames again.
+        """
         if not self.model.image_paths:
             QMessageBox.warning(self, "Warning", "No images loaded to process.")
             return
@@ -591,16 +693,39 @@ class MainWindow(QMainWindow):
         if self.manual_ocr_handler.is_active:
             QMessageBox.warning(self, "Warning", "Cannot start standard OCR while in Manual OCR mode.")
             return
+        if self.manual_ocr_handler.is_recognizing():
+            # A cancelled manual batch may still be running on the shared reader, which is not thread-safe
+            QMessageBox.warning(self, "Warning", "Manual OCR is still recognizing a selection. Try again in a moment.")
+            return
 
         print("Starting standard OCR process...")
-        if not self._initialize_ocr_reader("Standard OCR"):
+        pool_settings = self._get_pool_settings()
+        # Worker processes build their own readers, so only the in-process path needs one here.
+        # A pool run left with fewer than two pages to OCR fetches the reader itself (see BatchOCRHandler).
+        if pool_settings['num_workers'] <= 1 and not self._initialize_ocr_reader("Standard OCR"):
             return
 
         self.btn_process.setVisible(False)
         self.btn_stop_ocr.setVisible(True)
 
-        self.model.clear_standard_results()
-        self.on_model_updated(None)
+        checkpoint = self._create_ocr_checkpoint()
+        image_paths = self.model.image_paths
+        if reocr_filenames:
+            # The checkpoint describes full runs; a partial run neither writes nor clears it.
+            checkpoint = None
+            selected = set(reocr_filenames)
+            image_paths = [p for p in image_paths if os.path.basename(p) in selected]
+            print(f"Re-OCR of {len(image_paths)} selected pages; other pages and manual results are kept.")
+        elif resume_state:
+            self.model.restore_checkpoint_results(resume_state['results'], resume_state['next_global_row_number'])
+            completed = set(resume_state['completed'])
+            image_paths = [p for p in image_paths if os.path.basename(p) not in completed]
+            print(f"Resuming OCR: {len(completed)} pages restored from checkpoint, {len(image_paths)} remaining.")
+        else:
+            self.model.clear_standard_results()
+            self.on_model_updated(None)
+            if checkpoint:
+                checkpoint.begin(self.model.next_global_row_number)
         
         self._load_filter_settings()
         ocr_settings = {
@@ -608,16 +733,27 @@ class MainWindow(QMainWindow):
             "min_confidence": self.min_confidence, "distance_threshold": self.distance_threshold,
             "batch_size": int(self.settings.value("ocr_batch_size", 8)), "decoder": self.settings.value("ocr_decoder", "beamsearch"),
             "adjust_contrast": float(self.settings.value("ocr_adjust_contrast", 0.5)), "resize_threshold": int(self.settings.value("ocr_resize_threshold", 1024)),
+            "detect_resize_threshold": int(self.settings.value("ocr_detect_resize_threshold", 0)),
+            "adaptive_threshold": float(self.settings.value("ocr_adaptive_threshold", 0.5)),
+            "tile_height": int(self.settings.value("ocr_tile_height", 0)), "tile_overlap": int(self.settings.value("ocr_tile_overlap", 200)),
+            "skip_blank_bands": self.settings.value("ocr_skip_blank_bands", "false").lower() == "true",
         }
         
         # --- MODIFIED: Pass the progress bar widget directly to the handler ---
         self.batch_handler = BatchOCRHandler(
-            image_paths=self.model.image_paths, 
+            image_paths=image_paths, 
             reader=self.reader, 
             settings=ocr_settings, 
             starting_row_number=self.model.next_global_row_number,
             model=self.model,
-            progress_bar=self.ocr_progress # Pass the reference here
+            progress_bar=self.ocr_progress, # Pass the reference here
+            pool_settings=pool_settings,
+            prefetch_depth=int(self.settings.value("ocr_prefetch_depth", 2)),
+            cache=self._create_ocr_cache(),
+            checkpoint=checkpoint,
+            cross_page_batch=int(self.settings.value("ocr_cross_page_batch", 0)),
+            duplicate_distance=int(self.settings.value("ocr_duplicate_max_distance", -1)),
+            replace_existing=bool(reocr_filenames)
         )
 
         self.batch_handler.batch_finished.connect(self.on_batch_finished)
@@ -635,8 +771,13 @@ class MainWindow(QMainWindow):
         """Handles the successful completion of the entire batch."""
         print("MainWindow: Batch finished.")
         self.model.next_global_row_number = next_row_number
+        run_report = self.batch_handler.run_report if self.batch_handler else None
+        reocr_pages = len(self.batch_handler.image_paths) if self.batch_handler and self.batch_handler.replace_existing else 0
         self.cleanup_ocr_session()
-        QMessageBox.information(self, "Finished", "OCR processing completed for all images.")
+        message = f"OCR processing completed for the {reocr_pages} selected pages." if reocr_pages else "OCR processing completed for all images."
+        if run_report:
+            message += "\n\n" + run_report.summary_text()
+        QMessageBox.information(self, "Finished", message)
     
     # ... (rest of the file is the same) ...
     def on_batch_error(self, message):
@@ -675,10 +816,10 @@ class MainWindow(QMainWindow):
 
     def update_image_text_box(self, row_number, new_text):
         """Finds a specific TextBoxItem by its row number and updates its text directly."""
-        target_result, _ = self.model._find_result_by_row_number(row_number)
+        target_result = self.model.find_result(row_number)
         if not target_result: return
 
-        filename = target_result.get('filename')
+        filename = target_result.filename
         if not filename: return
 
         for i in range(self.scroll_layout.count()):
@@ -836,6 +977,9 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Save Error", result_message)
 
     def closeEvent(self, event):
+        self.manual_ocr_handler.shutdown() # Before the temp dir (and its images) goes away
+        if self.model.archive is not None:
+            self.model.archive.close()
         # This now reads from self.model
         if hasattr(self.model, 'temp_dir') and self.model.temp_dir and os.path.exists(self.model.temp_dir):
             try:
@@ -22,7 +22,7 @@ class TranslationWindow(QDialog):
         super().__init__(parent)
         self.api_key = api_key
         self.model_name = model_name
-        self.ocr_results = [res for res in ocr_results if not res.get('is_deleted', False)]
+        self.ocr_results = [res for res in ocr_results if not res.is_deleted]
         self.profiles = profiles
         self.thread = None
         self.select_all_checkbox = None # For header checkbox
@@ -248,9 +248,9 @@ class TranslationWindow(QDialog):
         """ Gathers all translation data for a specific profile from the ocr_results. """
         profile_data = {}
         for result in self.ocr_results:
-            filename = result.get('filename')
-            row_number = str(result.get('row_number'))
-            translated_text = result.get('translations', {}).get(profile_name)
+            filename = result.filename
+            row_number = str(result.row_number)
+            translated_text = result.translation(profile_name)
 
             if all([filename, row_number, translated_text]):
                 if filename not in profile_data:
@@ -340,8 +340,8 @@ class TranslationWindow(QDialog):
         # --- Grid Rows ---
         current_source_profile = self.source_profile_combo.currentText()
         for row_idx, result in enumerate(self.ocr_results, start=1):
-            filename = result.get('filename')
-            row_number = str(result.get('row_number'))
+            filename = result.filename
+            row_number = str(result.row_number)
             row_key = (filename, row_number)
             
             self.all_row_keys_in_order.append(row_key)
@@ -758,8 +758,8 @@ class TranslationWindow(QDialog):
                 column_has_valid_translations_to_apply = False # Flag for this column
 
                 for result in self.ocr_results:
-                    filename = result.get('filename')
-                    row_number = str(result.get('row_number'))
+                    filename = result.filename
+                    row_number = str(result.row_number)
                     key = (filename, row_number)
 
                     if filename not in complete_profile_translations:
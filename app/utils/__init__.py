@@ -1,2 +1,21 @@
-from app.utils.file_io import export_ocr_results, export_rendered_images, import_translation_file, export_translated_images_to_zip
-from app.utils.project_processing import new_project, import_from_wfwf, open_project, launch_project, correct_filenames
\ No newline at end of file
+# The GUI helpers below import widgets and dialogs, so they are loaded on first access.
+# This keeps `app.utils.data_processing` (used by the OCR pipeline, its worker processes
+# and the headless CLI) free of any QtWidgets import.
+_LAZY_EXPORTS = {
+    'export_ocr_results': 'app.utils.file_io',
+    'export_rendered_images': 'app.utils.file_io',
+    'import_translation_file': 'app.utils.file_io',
+    'export_translated_images_to_zip': 'app.utils.file_io',
+    'new_project': 'app.utils.project_processing',
+    'import_from_wfwf': 'app.utils.project_processing',
+    'open_project': 'app.utils.project_processing',
+    'launch_project': 'app.utils.project_processing',
+    'correct_filenames': 'app.utils.project_processing',
+}
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'app.utils' has no attribute '{name}'")
+    import importlib
+    return getattr(importlib.import_module(module_name), name)
@@ -104,12 +104,127 @@ def merge_ocr_entries(entries_to_merge):
     return merged_entry
 
 
+def _bounding_rect(coords):
+    """Returns (x_min, y_min, x_max, y_max) for a list of [x, y] points."""
+    xs = [p[0] for p in coords]
+    ys = [p[1] for p in coords]
+    return min(xs), min(ys), max(xs), max(ys)
+
+def remove_overlap_duplicates(results, min_overlap=0.5):
+    """
+    Drops duplicate detections produced by overlapping OCR tiles.
+    Two results are duplicates when they come from different tiles ('tile' key) and their
+    intersection covers at least `min_overlap` of the smaller box. The larger box is kept,
+    since the smaller one is usually a line cut off at a tile edge; ties go to confidence.
+    The 'tile' key is removed from the surviving results.
+
+    :param results: List of OCR result dicts with page-space 'coordinates' and a 'tile' index.
+    :param min_overlap: Fraction of the smaller box that must be covered to count as a duplicate.
+    :return: List of de-duplicated OCR result dicts, in their original order.
+    """
+    rects = []
+    for result in results:
+        try:
+            rects.append(_bounding_rect(result['coordinates']))
+        except (KeyError, ValueError, TypeError, IndexError):
+            rects.append(None)
+
+    def area(rect):
+        return max(0, rect[2] - rect[0]) * max(0, rect[3] - rect[1])
+
+    def rank(index):
+        return (area(rects[index]), results[index].get('confidence', 0.0))
+
+    # Sweep top-to-bottom so only vertically overlapping boxes are compared.
+    order = sorted((i for i, rect in enumerate(rects) if rect is not None), key=lambda i: rects[i][1])
+    dropped = set()
+    for pos, i in enumerate(order):
+        if i in dropped: continue
+        for j in order[pos + 1:]:
+            if rects[j][1] > rects[i][3]: break # No later box can overlap box i
+            if j in dropped or results[i].get('tile') == results[j].get('tile'): continue
+            ix = min(rects[i][2], rects[j][2]) - max(rects[i][0], rects[j][0])
+            iy = min(rects[i][3], rects[j][3]) - max(rects[i][1], rects[j][1])
+            if ix <= 0 or iy <= 0: continue
+            smaller_area = min(area(rects[i]), area(rects[j]))
+            if smaller_area > 0 and (ix * iy) / smaller_area >= min_overlap:
+                if rank(j) > rank(i):
+                    dropped.add(i)
+                    break
+                dropped.add(j)
+
+    deduplicated = []
+    for i, result in enumerate(results):
+        if i in dropped: continue
+        result.pop('tile', None)
+        deduplicated.append(result)
+    return deduplicated
+
+def _box_center(coords):
+    """Returns the (x, y) mean of a box's points (the center used by distance()), or None if invalid."""
+    try:
+        if not coords: return None
+        cx = sum(p[0] for p in coords) / len(coords)
+        cy = sum(p[1] for p in coords) / len(coords)
+        if math.isnan(cx) or math.isnan(cy): return None
+        return cx, cy
+    except (ValueError, TypeError, IndexError) as e:
+        print(f"Warning: Could not calculate center of {coords}. Error: {e}")
+        return None
+
+def _cluster_by_center_distance(centers, distance_threshold):
+    """
+    Single-linkage clustering: two boxes end up in the same cluster if they are connected by a
+    chain of boxes whose centers are closer than `distance_threshold`.
+    Centers are bucketed into a uniform grid with cells of threshold size, so each box is only
+    compared with the boxes in its own and the 8 neighbouring cells, and linked with union-find.
+
+    :param centers: List of (x, y) tuples or None (None never joins a cluster).
+    :return: List of clusters (lists of indices), ordered by their first index, indices ascending.
+    """
+    parent = list(range(len(centers)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]] # Path halving
+            i = parent[i]
+        return i
+
+    if distance_threshold > 0:
+        cell_size = float(distance_threshold)
+        threshold_sq = cell_size * cell_size
+        grid = {}
+        for i, center in enumerate(centers):
+            if center is None: continue
+            cell = (math.floor(center[0] / cell_size), math.floor(center[1] / cell_size))
+            # Link with every earlier box in the surrounding cells; any pair closer than the
+            # threshold is at most one cell apart on each axis.
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for j in grid.get((cell[0] + dx, cell[1] + dy), ()):
+                        other = centers[j]
+                        if (center[0] - other[0]) ** 2 + (center[1] - other[1]) ** 2 < threshold_sq:
+                            root_i, root_j = find(i), find(j)
+                            if root_i != root_j:
+                                # Lower index becomes the root, keeping the output order stable
+                                parent[max(root_i, root_j)] = min(root_i, root_j)
+            grid.setdefault(cell, []).append(i)
+
+    clusters = {}
+    for i in range(len(centers)):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
+
 def group_and_merge_text(results, distance_threshold):
     """
     Groups and merges text regions that are close to each other using spatial proximity.
     Returns ONLY the merged results. Original constituents are discarded implicitly.
     Row number assignment is handled externally after sorting.
 
+    Grouping is transitive and independent of the input order: regions whose bounding box
+    centers are closer than `distance_threshold`, directly or through a chain of other
+    regions, always end up in the same group.
+
     :param results: List of OCR results (each containing 'coordinates', 'text', 'confidence', 'filename').
     :param distance_threshold: Maximum distance between bounding box centers to consider them part of the same group.
     :return: List of merged OCR results (dictionaries) without final 'row_number'.
@@ -122,31 +237,16 @@ def group_and_merge_text(results, distance_threshold):
     if not valid_results:
         return []
 
-    grouped_results_by_file = {} # Group by filename first
-
-    # --- Grouping Logic ---
+    results_by_file = {} # Group by filename first; only results of the same file can merge
     for result in valid_results:
-        filename = result['filename']
-        if filename not in grouped_results_by_file:
-             grouped_results_by_file[filename] = [] # Stores lists of groups for this file
-
-        added_to_existing_group = False
-        # Check groups ONLY within the same file
-        for group in grouped_results_by_file[filename]:
-            # Check if this result is close to any result ALREADY in the group
-            if any(distance(result['coordinates'], existing['coordinates']) < distance_threshold for existing in group):
-                group.append(result) # Add the original result to the group list
-                added_to_existing_group = True
-                break # Added to a group, move to next result
-
-        if not added_to_existing_group:
-             # Start a new group for this file, containing only this result so far
-             grouped_results_by_file[filename].append([result])
-
-    # --- Merging Logic ---
+        results_by_file.setdefault(result['filename'], []).append(result)
+
+    # --- Grouping + Merging Logic ---
     merged_results_final = []
-    for filename, groups_in_file in grouped_results_by_file.items():
-        for group in groups_in_file: # group is a list of original result dicts
+    for filename, file_results in results_by_file.items():
+        centers = [_box_center(r['coordinates']) for r in file_results]
+        for cluster in _cluster_by_center_distance(centers, distance_threshold):
+            group = [file_results[i] for i in cluster] # list of original result dicts
             merged_entry = merge_ocr_entries(group) # Use the helper to combine them
             if merged_entry: # Only add if merging was successful (returned a dict)
                  merged_results_final.append(merged_entry)
@@ -154,4 +254,66 @@ def group_and_merge_text(results, distance_threshold):
     # Note: The final list is NOT sorted globally here. Sorting happens later in MainWindow.
     return merged_results_final
 
+def sub_row_numbers(base_row, count, occupied_rows=()):
+    """
+    Returns `count` fractional row numbers right after a row (base.1, base.2, ...), past the
+    highest sub-row already in use. Used for manually added blocks and for the extra blocks of
+    a page OCRed again, so both always agree on which sub-rows are taken.
+    Finer steps (base.01, base.02, ...) are used when tenths would reach the next row; the
+    numbers only ever grow, so they never collide with or sort before existing sub-rows.
+
+    :param base_row: Row to number after; only its integer part is used.
+    :param occupied_rows: Row numbers already taken (any page); invalid ones are ignored.
+    """
+    base = math.floor(float(base_row))
+    last = 0.0
+    for row in occupied_rows:
+        try:
+            row = float(row)
+        except (ValueError, TypeError):
+            continue
+        if math.floor(row) == base:
+            last = max(last, row - base)
+    step = 0.1
+    while last + step * count > 1 - 1e-9:
+        step /= 10
+    return [round(base + last + step * (i + 1), 9) for i in range(count)]
+
+def number_page_results(processed_results, filename, first_row_number, reserved_rows=None, occupied_rows=()):
+    """
+    Sorts one page's merged results top-to-bottom and gives them consecutive row numbers.
+
+    :param processed_results: List of merged result dicts for a single image (modified in place).
+    :param filename: Image filename stored on every result.
+    :param first_row_number: Row number of the topmost result (used when no rows are reserved).
+    :param reserved_rows: Optional row numbers to hand out first, in ascending order, e.g. those
+                          freed by the page's previous results when it is OCRed again. Results past
+                          them get sub-rows of the last reserved row (see sub_row_numbers()), so the
+                          page keeps its place in the numbering.
+    :param occupied_rows: Row numbers still in use, checked when sub-rows are handed out.
+    :return: (numbered_results, next_row_number)
+    """
+    if not processed_results:
+        return [], first_row_number
+    try:
+        processed_results.sort(key=lambda r: min(p[1] for p in r.get('coordinates', [[0, float('inf')]])))
+    except (ValueError, TypeError, IndexError) as e:
+        print(f"Warning: Could not sort processed results for {filename}: {e}. Using processor order.")
+
+    reserved = sorted(reserved_rows or [])
+    if reserved and len(processed_results) > len(reserved):
+        reserved += sub_row_numbers(reserved[-1], len(processed_results) - len(reserved),
+                                    list(occupied_rows) + reserved)
+    row_number = first_row_number
+    for index, result in enumerate(processed_results):
+        result['filename'] = filename
+        if index < len(reserved):
+            result['row_number'] = reserved[index]
+        else:
+            result['row_number'] = row_number
+            row_number += 1
+        result['is_manual'] = False
+        result['translations'] = {}
+    return processed_results, row_number
+
 # --- END OF FILE data_processing.py ---
\ No newline at end of file
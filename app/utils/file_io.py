@@ -51,7 +51,7 @@ def export_ocr_results(self):
             if not file_path:
                 return
             with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(self.ocr_results, f, ensure_ascii=False, indent=4)
+                json.dump([result.to_dict() for result in self.model.ocr_results], f, ensure_ascii=False, indent=4)
             QMessageBox.information(self, "Success", "OCR results exported successfully in JSON format.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to export: {str(e)}")
@@ -62,12 +62,12 @@ def export_ocr_results(self):
         extensions = set()
 
         # Group results by filename while preserving row numbers
-        for result in self.ocr_results:
-            filename = result['filename']
+        for result in self.model.ocr_results:
+            filename = result.filename
             ext = os.path.splitext(filename)[1].lstrip('.').lower()
             extensions.add(ext)
-            text = result['text']
-            row_number = result['row_number']  # This will now always have a value
+            text = result.text
+            row_number = result.row_number  # This will now always have a value
             
             if filename not in grouped_results:
                 grouped_results[filename] = []
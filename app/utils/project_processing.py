@@ -5,6 +5,7 @@ import tempfile
 import re
 from shutil import copyfile, rmtree
 from app.ui.dialogs import NewProjectDialog, ImportWFWFDialog
+from app.core.project_archive import compression_for
 from PyQt5.QtWidgets import QMessageBox, QFileDialog, QDialog, QApplication
 from PyQt5.QtCore import QDateTime, QDir, Qt
 
@@ -33,7 +34,7 @@ def new_project(self):
                 images_dir = 'images/'
                 if os.path.isfile(source_path):
                     # If it's a single file, just add it
-                    zipf.write(source_path, os.path.join(images_dir, os.path.basename(source_path)))
+                    zipf.write(source_path, os.path.join(images_dir, os.path.basename(source_path)), compress_type=compression_for(source_path))
                 elif os.path.isdir(source_path):
                     # --- START OF MODIFIED SECTION ---
                     # If it's a directory, correct the filenames to ensure sequential order
@@ -46,7 +47,7 @@ def new_project(self):
                             src_path = os.path.join(source_path, original_name)
                             # Destination path inside the zip uses the new, standardized filename
                             dst_path_in_zip = os.path.join(images_dir, new_name)
-                            zipf.write(src_path, dst_path_in_zip)
+                            zipf.write(src_path, dst_path_in_zip, compress_type=compression_for(dst_path_in_zip))
                     # --- END OF MODIFIED SECTION ---
                 
                 # Create empty OCR results
@@ -103,7 +104,7 @@ def import_from_wfwf(self):
                 images_dir = 'images/'
                 for img in os.listdir(corrected_dir):
                     if img.lower().endswith(('png', 'jpg', 'jpeg')):
-                        zipf.write(os.path.join(corrected_dir, img), os.path.join(images_dir, img))
+                        zipf.write(os.path.join(corrected_dir, img), os.path.join(images_dir, img), compress_type=compression_for(img))
                 
                 zipf.writestr('master.json', json.dumps([]))
             